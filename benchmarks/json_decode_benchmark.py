@@ -0,0 +1,67 @@
+"""
+Decode throughput of the JSON decoders supported by ``pyavrio.json_codec`` on the
+recorded statement pages of ``tests/unit/conftest.py``.
+
+The recorded pages only hold a few rows, so their ``data`` is repeated to the size
+of a regular result page as well. Run from the repository root::
+
+    python benchmarks/json_decode_benchmark.py
+"""
+import inspect
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests", "unit"))
+
+import conftest  # noqa: E402
+
+from pyavrio import json_codec  # noqa: E402
+
+PAGE_ROWS = 10_000
+
+
+def fixture_data(fixture):
+    return next(inspect.unwrap(fixture)())
+
+
+def pages():
+    post = fixture_data(conftest.sample_post_response_data)
+    get = fixture_data(conftest.sample_get_response_data)
+    error = fixture_data(conftest.sample_get_error_response_data)
+    full_page = dict(get, data=[row for _ in range(PAGE_ROWS // len(get["data"])) for row in get["data"]])
+    return [
+        ("POST response", post),
+        ("GET response", get),
+        ("error response", error),
+        ("{} row page".format(len(full_page["data"])), full_page),
+    ]
+
+
+def decoders():
+    for name in json_codec.DECODERS[1:]:
+        try:
+            yield name, json_codec.get_decoder(name)
+        except ModuleNotFoundError:
+            continue
+    yield "json (streaming)", lambda body: json_codec.decode_streaming([body], lambda members: None)[0]
+
+
+def main():
+    available = list(decoders())
+    print("auto selects: {}".format(json_codec.get_decoder("auto").__module__))
+    print("{:<18} {:>10}  ".format("page", "bytes") + "".join("{:>18}".format(name) for name, _ in available))
+    for name, page in pages():
+        body = json.dumps(page).encode("utf-8")
+        number = max(1, 2_000_000 // len(body))
+        results = []
+        for _, decoder in available:
+            assert decoder(body) == page
+            elapsed = min(timeit.repeat(lambda: decoder(body), number=number, repeat=3)) / number
+            results.append("{:>14.1f}MB/s".format(len(body) / elapsed / 1e6))
+        print("{:<18} {:>10}  ".format(name, len(body)) + "".join("{:>18}".format(result) for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark of ``parse_sqltype`` against the previous implementation, which matched a
+regex and re-split the options with ``aware_split`` at every level of nesting.
+
+The corpus holds type signatures as returned by Trino for the columns of real
+tables, from flat scalar types to deeply nested rows. Run from the repository root::
+
+    python benchmarks/parse_sqltype_benchmark.py
+"""
+import re
+import timeit
+from typing import List, Optional, Tuple
+
+from sqlalchemy import util
+from sqlalchemy.sql import sqltypes
+
+from pyavrio.sqlalchemy import datatype
+from pyavrio.sqlalchemy.datatype import MAP, ROW, _type_map, aware_split, parse_sqltype, unquote
+
+COLUMNS = 500
+
+
+def legacy_parse_sqltype(type_str):
+    type_str = type_str.strip().lower()
+    match = re.match(r"^(?P<type>\w+)\s*(?:\((?P<options>.*)\))?", type_str)
+    if not match:
+        util.warn(f"Could not parse type name '{type_str}'")
+        return sqltypes.NULLTYPE
+    type_name = match.group("type")
+    type_opts = match.group("options")
+
+    if type_name == "array":
+        item_type = legacy_parse_sqltype(type_opts)
+        if isinstance(item_type, sqltypes.ARRAY):
+            dimensions = (item_type.dimensions or 1) + 1
+            return sqltypes.ARRAY(item_type.item_type, dimensions=dimensions)
+        return sqltypes.ARRAY(item_type)
+    elif type_name == "map":
+        key_type_str, value_type_str = aware_split(type_opts)
+        return MAP(legacy_parse_sqltype(key_type_str), legacy_parse_sqltype(value_type_str))
+    elif type_name == "row":
+        attr_types: List[Tuple[Optional[str], sqltypes.TypeEngine]] = []
+        for attr in aware_split(type_opts):
+            attr_name, attr_type_str = aware_split(attr.strip(), delimiter=" ", maxsplit=1)
+            attr_types.append((unquote(attr_name), legacy_parse_sqltype(attr_type_str)))
+        return ROW(attr_types)
+
+    if type_name not in _type_map:
+        util.warn(f"Did not recognize type '{type_name}'")
+        return sqltypes.NULLTYPE
+    type_class = _type_map[type_name]
+    type_args = [int(o.strip()) for o in type_opts.split(",")] if type_opts else []
+    if type_name in ("time", "timestamp"):
+        type_kwargs = dict()
+        if type_str.endswith("with time zone"):
+            type_kwargs["timezone"] = True
+        if type_opts is not None:
+            type_kwargs["precision"] = int(type_opts)
+        return type_class(**type_kwargs)
+    return type_class(*type_args)
+
+
+def corpora():
+    scalar = [
+        "bigint", "integer", "varchar", "varchar(255)", "decimal(38, 10)", "double", "boolean", "date",
+        "timestamp(3)", "timestamp(6) with time zone", "char(2)", "varbinary", "json", "real", "smallint",
+    ]
+    nested = [
+        "array(varchar)",
+        "map(varchar, bigint)",
+        "array(row(sku varchar, quantity integer, price decimal(12, 2)))",
+        "row(street varchar, city varchar, zip varchar(10), geo row(lat double, lon double))",
+        "map(varchar, array(row(ts timestamp(3) with time zone, value double)))",
+    ]
+    deep = [
+        'row("event id" varchar, payload row(device row(id bigint, os row(name varchar, version varchar), '
+        'tags array(varchar)), metrics map(varchar, array(row(name varchar, value double))), '
+        'session row(id varchar, started timestamp(3) with time zone, pages array(row(url varchar, '
+        'referrer varchar, duration_ms bigint, events array(map(varchar, varchar)))))))',
+    ]
+    return [
+        ("scalar", [scalar[i % len(scalar)] for i in range(COLUMNS)]),
+        ("nested", [nested[i % len(nested)] for i in range(COLUMNS)]),
+        ("deeply nested", [deep[i % len(deep)] for i in range(COLUMNS)]),
+    ]
+
+
+def cold(type_strs):
+    datatype._parse_interned.cache_clear()
+    return [parse_sqltype(type_str) for type_str in type_strs]
+
+
+def measure(function, type_strs, number=20):
+    elapsed = min(timeit.repeat(lambda: [function(t) for t in type_strs], number=number, repeat=3)) / number
+    return f"{elapsed * 1000:.3f}ms"
+
+
+def main():
+    print(f"{COLUMNS} columns per table")
+    print(f"{'corpus':<16} {'legacy':>12} {'single pass':>12} {'interned':>12}")
+    for name, type_strs in corpora():
+        for type_str in set(type_strs):
+            assert repr(legacy_parse_sqltype(type_str)) == repr(parse_sqltype(type_str)), type_str
+        results = [
+            measure(legacy_parse_sqltype, type_strs),
+            measure(lambda t: datatype._TypeParser(t.strip().lower()).parse(), type_strs),
+            measure(parse_sqltype, type_strs),
+        ]
+        print(f"{name:<16} {results[0]:>12} {results[1]:>12} {results[2]:>12}")
+
+
+if __name__ == "__main__":
+    main()
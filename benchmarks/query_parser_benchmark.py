@@ -0,0 +1,112 @@
+"""
+Benchmark of the single pass ``QueryParser`` against the previous implementation,
+which combined a comment regex, ``sql_metadata.Parser`` and per-table regexes.
+
+Run from the repository root::
+
+    python benchmarks/query_parser_benchmark.py
+"""
+import re
+import timeit
+
+from sql_metadata import Parser
+
+from pyavrio.query_parser import QueryParser, _cached_parse_statement
+
+PLATFORM = "data_products"
+
+
+def legacy_parse_query(query):
+    query = query.strip().lower()
+    if not query:
+        return False
+    query = re.sub(r'(/\*.*?\*/|--.*?$)', '', query, flags=re.DOTALL | re.MULTILINE).strip()
+    if query.startswith('select'):
+        return ' '.join(query.split()) in {'select 1', 'select 2', 'select 3'}
+    return query.startswith('alter')
+
+
+def legacy_remove_schema_from_query(_query, platform):
+    parsed_query = Parser(_query)
+    if platform == "data_products" and parsed_query.tables:
+        for table in parsed_query.tables:
+            parts = table.split('.')
+            if len(parts) == 2:
+                part_1, part_2 = parts
+                _query = re.compile(rf'"{re.escape(part_1)}"\."{re.escape(part_2)}"').sub(part_2, _query)
+                _query = re.compile(rf'"{re.escape(part_1)}"\.{re.escape(part_2)}').sub(part_2, _query)
+                _query = re.compile(rf'{re.escape(part_1)}\."{re.escape(part_2)}"').sub(part_2, _query)
+                _query = re.compile(rf'{re.escape(part_1)}\.{re.escape(part_2)}').sub(part_2, _query)
+    return _query
+
+
+def legacy_split_query(query):
+    match = re.compile(r'(Prepare .*?FROM)(.*SELECT.*)', re.IGNORECASE | re.DOTALL).match(query)
+    return (match.group(1), match.group(2)) if match else (None, query)
+
+
+def legacy_is_show_query(query):
+    return bool(re.compile(r'\bSHOW\b', re.IGNORECASE).search(query))
+
+
+def legacy(query):
+    legacy_parse_query(query)
+    legacy_split_query(query)
+    legacy_is_show_query(query)
+    return legacy_remove_schema_from_query(query, PLATFORM)
+
+
+def single_pass(query):
+    QueryParser.parse_query(query, PLATFORM)
+    QueryParser.split_prepare_query(query)
+    QueryParser.is_show_query(query)
+    return QueryParser.remove_schema_from_query(query, PLATFORM)
+
+
+def single_pass_cold(query):
+    _cached_parse_statement.cache_clear()
+    return single_pass(query)
+
+
+def statements():
+    small = (
+        "SELECT o.id, c.name FROM sales.orders o JOIN sales.customers c ON o.customer_id = c.id "
+        "WHERE o.status = 'OPEN' -- open orders only\nORDER BY o.id LIMIT 100"
+    )
+    in_list = ", ".join(str(i) for i in range(2_000))
+    large_in = f"SELECT * FROM sales.orders WHERE id IN ({in_list})"
+    strings = ", ".join(f"'customer-{i}'" for i in range(2_000))
+    large_strings = f"SELECT * FROM sales.customers WHERE name IN ({strings})"
+    # sqlparse, used by sql_metadata, refuses statements of more than 10000 tokens
+    huge_in = ", ".join(str(i) for i in range(50_000))
+    huge = f"SELECT * FROM sales.orders WHERE id IN ({huge_in})"
+    unions = " UNION ALL ".join(
+        f"SELECT id, amount FROM sales.orders_{i} WHERE amount > {i}" for i in range(200)
+    )
+    return [
+        ("small join", small),
+        ("2k integer IN list", large_in),
+        ("2k string IN list", large_strings),
+        ("200 table UNION", unions),
+        ("50k integer IN list", huge),
+    ]
+
+
+def measure(function, query, number):
+    try:
+        elapsed = min(timeit.repeat(lambda: function(query), number=number, repeat=3)) / number
+    except Exception as exc:
+        return type(exc).__name__
+    return f"{elapsed * 1000:.3f}ms"
+
+
+def main():
+    print(f"{'statement':<22} {'size':>10} {'legacy':>12} {'single pass':>12} {'memoized':>12}")
+    for name, query in statements():
+        number = 3 if len(query) > 10_000 else 50
+        results = [measure(function, query, number) for function in (legacy, single_pass_cold, single_pass)]
+        print(f"{name:<22} {len(query):>10} {results[0]:>12} {results[1]:>12} {results[2]:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,692 @@
+"""
+
+This module implements an asyncio client for queries and the streaming of their results.
+
+Statements are rewritten through ``getModifiedQuery``, submitted and polled with an
+``httpx.AsyncClient``, so a single event loop drives many queries at once, each one
+waiting on its own requests instead of holding a thread. Responses are processed by
+:meth:`pyavrio.client.TrinoRequest.process`: session updates, errors, row mapping and
+the query rewrite and metadata caches behave as with :mod:`pyavrio.dbapi`.
+
+The main interface is :class:`AsyncConnection`: ::
+
+    >> async with aio.connect(host, user=user, auth=AvrioAuthentication(token), platform=platform) as conn:
+    >>     cursor = conn.cursor()
+    >>     await cursor.execute("SELECT * FROM orders")
+    >>     async for row in cursor:
+    >>         ...
+
+A cursor runs one query at a time, use a cursor per concurrent query. When the task
+awaiting a query is cancelled, e.g. by ``asyncio.wait_for``, the query is cancelled on
+the coordinator too.
+
+httpx is an optional dependency, install ``pyavrio[async]`` to use this module.
+"""
+import asyncio
+import functools
+import importlib.util
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+try:
+    import httpx
+except ModuleNotFoundError as e:
+    raise ModuleNotFoundError("The asyncio client requires the 'httpx' package, install pyavrio[async]") from e
+
+import pyavrio.logging
+from pyavrio import compression, constants, dbapi, exceptions
+from pyavrio.auth import AvrioAuthentication
+from pyavrio.client import MAX_ATTEMPTS, ClientSession, TrinoQuery, TrinoRequest, _DelayExponential
+from pyavrio.transaction import IsolationLevel
+
+__all__ = ["connect", "AsyncConnection", "AsyncCursor", "AsyncTrinoQuery", "AsyncTrinoRequest", "AsyncTrinoResult"]
+
+logger = pyavrio.logging.get_logger(__name__)
+
+
+# Optional modules httpx decodes a content coding with, gzip and deflate only need zlib
+_CODING_MODULES = {"br": ("brotli", "brotlicffi"), "zstd": ("zstandard",)}
+
+
+@functools.lru_cache(maxsize=None)
+def _decodable_codings() -> Tuple[str, ...]:
+    """Content codings httpx can decode, in order of preference."""
+    return tuple(
+        coding
+        for coding in compression.CONTENT_CODINGS
+        if any(importlib.util.find_spec(module) is not None for module in _CODING_MODULES.get(coding, ("zlib",)))
+    )
+
+
+def _accept_encoding(http_compression: Union[None, bool, str, List[str]]) -> str:
+    """The ``Accept-Encoding`` header of requests, restricted to the content codings httpx can decode."""
+    decodable = _decodable_codings()
+    codings = [coding for coding in compression.accept_encoding(http_compression).split(",") if coding in decodable]
+    return ",".join(codings) or compression.IDENTITY
+
+
+def _timeout(request_timeout: Union[float, Tuple[float, float]]) -> "httpx.Timeout":
+    if isinstance(request_timeout, tuple):
+        connect_timeout, read_timeout = request_timeout
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+    return httpx.Timeout(request_timeout)
+
+
+class _Response:
+    """A read ``httpx.Response`` with the attributes of a ``requests.Response`` used by
+    :meth:`TrinoRequest.process` and :func:`pyavrio.compression.response_sizes`."""
+
+    def __init__(self, http_response: "httpx.Response"):
+        self._http_response = http_response
+        self.status_code = http_response.status_code
+        self.headers = http_response.headers
+        self.content = http_response.content
+        self.encoding = "utf-8"
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def raw(self) -> "_Response":
+        # The size of a response read from the network is given by raw.tell()
+        return self
+
+    def tell(self) -> int:
+        return self._http_response.num_bytes_downloaded
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncTrinoRequest(TrinoRequest):
+    """
+    Manage the HTTP requests of a Trino query with an ``httpx.AsyncClient``.
+
+    Requests failing with a transport error or HTTP 502, 503 or 504 are sent again up to
+    ``max_attempts`` attempts, after ``retry_delay(attempt)`` seconds. Access tokens about
+    to expire, or rejected with HTTP 401, are renewed in a thread of the default executor.
+
+    Responses are not decoded incrementally and the spooled protocol is not requested.
+    """
+
+    HTTP_EXCEPTIONS = (httpx.TransportError,)
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        client_session: ClientSession,
+        http_client: "httpx.AsyncClient",
+        http_scheme: Optional[str] = None,
+        auth: Optional[AvrioAuthentication] = constants.DEFAULT_AUTH,
+        max_attempts: int = MAX_ATTEMPTS,
+        request_timeout: Union[float, Tuple[float, float]] = constants.DEFAULT_REQUEST_TIMEOUT,
+        retry_delay: Callable[[int], float] = _DelayExponential(),
+        json_decoder: Optional[Callable[[bytes], Any]] = None,
+        http_compression: Union[None, bool, str, List[str]] = "auto",
+    ) -> None:
+        # TrinoRequest.__init__ is not called as it creates the requests sessions of the synchronous client
+        self._init_query_state(
+            host,
+            port,
+            client_session,
+            http_scheme,
+            auth,
+            request_timeout,
+            _accept_encoding(http_compression),
+            encodings=None,
+            streaming_decode=False,
+            json_decoder=json_decoder,
+        )
+        self._http_client = http_client
+        self._exceptions = self.HTTP_EXCEPTIONS
+        self._timeout = _timeout(request_timeout)
+        self._retry_delay = retry_delay
+        self.max_attempts = max_attempts
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    @max_attempts.setter
+    def max_attempts(self, value: int) -> None:
+        # Retries are handled by send, not by wrapping the methods of a requests session
+        self._max_attempts = value
+
+    async def access_token(self) -> Optional[str]:
+        """The token sent in the ``Authorization`` header, ``None`` without authentication."""
+        if not isinstance(self._auth, AvrioAuthentication):
+            return None
+        if self._auth.expiring:
+            # Renewing the token signs in again, which must not block the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, getattr, self._auth, "token")
+        return self._auth.token
+
+    async def _refresh(self, stale_token: Optional[str]) -> bool:
+        auth = self._auth
+        if stale_token is None or not isinstance(auth, AvrioAuthentication) or not auth.can_refresh:
+            return False
+        return await asyncio.get_running_loop().run_in_executor(None, auth.refresh, stale_token)
+
+    def _headers(self, additional_http_headers: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        # Unlike requests, httpx does not leave out headers set to None
+        headers = {name: value for name, value in self.http_headers.items() if value is not None}
+        headers.update(additional_http_headers or {})
+        return headers
+
+    async def send(self, method: str, url: str, headers: Dict[str, str], **kwargs: Any) -> _Response:
+        """Send a request with retries, returns its read response."""
+        attempt = 1
+        refreshed = False
+        while True:
+            access_token = await self.access_token()
+            if access_token is not None:
+                headers["Authorization"] = "Bearer " + access_token
+            try:
+                http_response = await self._http_client.request(
+                    method, url, headers=headers, timeout=self._timeout, **kwargs
+                )
+            except self._exceptions as err:
+                if attempt >= self._max_attempts:
+                    logger.info("failed after %s attempts", attempt)
+                    raise
+                logger.debug("attempt %s of %s %s failed: %s", attempt, method, url, err)
+            else:
+                if http_response.status_code == 401 and not refreshed and await self._refresh(access_token):
+                    refreshed = True
+                    continue
+                if http_response.status_code not in (502, 503, 504) or attempt >= self._max_attempts:
+                    return _Response(http_response)
+            await asyncio.sleep(self._retry_delay(attempt))
+            attempt += 1
+
+    async def post(self, sql: str, additional_http_headers: Optional[Dict[str, Any]] = None) -> _Response:
+        return await self.send("POST", self.statement_url, self._headers(additional_http_headers),
+                               content=sql.encode("utf-8"))
+
+    async def get(self, url: str) -> _Response:
+        return await self.send("GET", url, self._headers())
+
+    async def delete(self, url: str) -> _Response:
+        return await self.send("DELETE", url, self._headers())
+
+
+class AsyncTrinoResult:
+    """
+    Represent the result of a Trino query as an asynchronous iterator on rows.
+
+    Like :class:`pyavrio.client.TrinoResult`, the next page is requested before the rows
+    of the current page are returned, acknowledging their reception.
+    """
+
+    def __init__(self, query: "AsyncTrinoQuery", rows: List[Any]) -> None:
+        self._query = query
+        # Initial rows from the first POST request, None once the last page was returned
+        self._rows: Optional[List[Any]] = rows
+        self._rownumber = 0
+
+    @property
+    def rows(self) -> Optional[List[Any]]:
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows: Optional[List[Any]]) -> None:
+        self._rows = rows
+
+    @property
+    def rownumber(self) -> int:
+        return self._rownumber
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iter_rows()
+
+    async def _iter_rows(self) -> AsyncIterator[Any]:
+        async for rows in self._pages():
+            for row in rows:
+                self._rownumber += 1
+                yield row
+
+    async def iter_pages(self) -> AsyncIterator[List[Any]]:
+        """Iterate over the result page by page, see :meth:`pyavrio.client.TrinoResult.iter_pages`."""
+        if self._rownumber:
+            raise exceptions.ProgrammingError("Result pages cannot be iterated after rows were read")
+        async for rows in self._pages():
+            self._rownumber += len(rows)
+            yield rows
+
+    async def _pages(self) -> AsyncIterator[List[Any]]:
+        # The rows received by execute are converted when the result is read
+        rows = self._rows = self._query._state._start_mapping_rows(self._rows)
+        while rows is not None:
+            next_rows = await self._query.fetch() if not self._query.finished else None
+            yield rows
+            self._rows = rows = next_rows
+
+
+class AsyncTrinoQuery:
+    """
+    Represent the execution of a SQL statement by Trino, sending requests with an :class:`AsyncTrinoRequest`.
+
+    The state of the query, its rewrite and the processing of its responses are those of a
+    :class:`pyavrio.client.TrinoQuery`, whose methods sending requests are never called.
+    """
+
+    def __init__(self, request: AsyncTrinoRequest, query: str, **kwargs: Any) -> None:
+        self._request = request
+        self._state = TrinoQuery(request, query, **kwargs)
+        self._result: Optional[AsyncTrinoResult] = None
+        # Serializes fetches, which may be awaited by different tasks
+        self._fetch_lock = asyncio.Lock()
+
+    @property
+    def query_id(self) -> Optional[str]:
+        return self._state.query_id
+
+    @property
+    def query(self) -> Optional[str]:
+        return self._state.query
+
+    @property
+    def columns(self) -> Optional[List[Any]]:
+        # Known once execute returned, as it waits for the first rows or the end of the query
+        return self._state._columns
+
+    @property
+    def stats(self) -> Dict[Any, Any]:
+        return self._state.stats
+
+    @property
+    def update_type(self) -> Optional[str]:
+        return self._state.update_type
+
+    @property
+    def update_count(self) -> Optional[int]:
+        return self._state.update_count
+
+    @property
+    def warnings(self) -> List[Dict[Any, Any]]:
+        return self._state.warnings
+
+    @property
+    def result(self) -> Optional[AsyncTrinoResult]:
+        return self._result
+
+    @property
+    def info_uri(self) -> Optional[str]:
+        return self._state.info_uri
+
+    @property
+    def finished(self) -> bool:
+        return self._state.finished
+
+    @property
+    def cancelled(self) -> bool:
+        return self._state.cancelled
+
+    async def execute(self, additional_http_headers: Optional[Dict[str, Any]] = None) -> AsyncTrinoResult:
+        """Rewrite and submit the statement, returns once rows were received or the query finished."""
+        state = self._state
+        if state.cancelled:
+            raise exceptions.TrinoUserError({"message": "Query has been cancelled"}, state.query_id)
+
+        try:
+            session = self._request._client_session
+            modified_avrio_query: Optional[str]
+            if state._modified_query is not None:
+                modified_avrio_query = state._modified_query
+            elif state._query_parser.parse_query(state._query, session.platform):
+                modified_avrio_query = state._query
+            else:
+                metadata_cache_key = state._metadata_query_cache_key(session)
+                metadata_result = state._cached_metadata_result(metadata_cache_key)
+                if metadata_result is None:
+                    modified_avrio_query, metadata_result = await self._rewrite_query(session)
+                    state._cache_metadata_result(metadata_cache_key, metadata_result)
+                if metadata_result is not None:
+                    self._result = AsyncTrinoResult(self, state.trinoResult(*metadata_result).rows)
+                    return self._result
+            if modified_avrio_query is None:
+                raise exceptions.DatabaseError("The query rewrite returned no statement")
+
+            response = await self._request.post(modified_avrio_query, additional_http_headers)
+        except httpx.HTTPError as e:
+            raise exceptions.TrinoConnectionError("failed to execute: {}".format(e))
+        status = self._request.process(response)
+        rows = state._update_submitted(status)
+        while not state.finished and not state.cancelled and len(rows) == 0:
+            rows += await self.fetch()
+        self._result = AsyncTrinoResult(self, rows)
+        return self._result
+
+    async def rewrite(self) -> Optional[str]:
+        """Rewrite the statement without executing it, see :meth:`pyavrio.client.TrinoQuery.rewrite`."""
+        state = self._state
+        session = self._request._client_session
+        if state._query_parser.parse_query(state._query, session.platform):
+            return state._query
+        try:
+            modified_avrio_query, metadata_result = await self._rewrite_query(session)
+        except httpx.HTTPError as e:
+            raise exceptions.TrinoConnectionError("failed to rewrite: {}".format(e))
+        return modified_avrio_query if metadata_result is None else None
+
+    async def _rewrite_query(
+        self, session: ClientSession
+    ) -> Tuple[Optional[str], Optional[Tuple[List[str], List[Any]]]]:
+        state = self._state
+        cache_key, modified_avrio_query = state._cached_rewrite(session)
+        if modified_avrio_query is not None:
+            return modified_avrio_query, None
+
+        url, headers, payload = state._avrio_http_handler._modified_query_request(
+            session.user, state._query, session.access_token, session.catalog)
+        modified_response = await self._request.send("POST", url, headers, json=payload)
+        return state._process_rewrite(modified_response, cache_key)
+
+    async def fetch(self) -> List[Any]:
+        """Continue fetching data for the current query_id"""
+        try:
+            async with self._fetch_lock:
+                next_uri = self._request.next_uri
+                assert next_uri is not None, "the query has no next page"
+                try:
+                    response = await self._request.get(next_uri)
+                except httpx.HTTPError as e:
+                    raise exceptions.TrinoConnectionError("failed to fetch: {}".format(e))
+                status = self._request.process(response)
+                self._state._update_fetched(status)
+        except asyncio.CancelledError:
+            # The task reading the result was cancelled, so is the query
+            await self._cancel_abandoned()
+            raise
+        return self._state._fetched_rows(status)
+
+    async def cancel(self) -> None:
+        """Cancel the current query"""
+        # Not serialized with fetch on purpose: the DELETE must not wait for a GET of the
+        # next page in flight, and any next URI of the query cancels it.
+        next_uri = self._state._next_uri
+        if next_uri is None:
+            return
+
+        logger.debug("cancelling query: %s", self.query_id)
+        try:
+            response = await self._request.delete(next_uri)
+        except httpx.HTTPError as e:
+            raise exceptions.TrinoConnectionError("failed to cancel query: {}".format(e))
+        logger.debug(response)
+        if response.status_code == httpx.codes.NO_CONTENT:
+            self._state._cancelled = True
+            logger.debug("query cancelled: %s", self.query_id)
+            return
+
+        self._request.raise_response_error(response)
+
+    async def _cancel_abandoned(self) -> None:
+        try:
+            await asyncio.shield(self.cancel())
+        except Exception as e:
+            # The cancellation of the task is raised rather than this error
+            logger.warning("Failed to cancel query %s: %s", self.query_id, e)
+
+
+class AsyncCursor:
+    """
+    Database cursor of an :class:`AsyncConnection`.
+
+    The methods of :class:`pyavrio.dbapi.Cursor` sending requests are coroutines here,
+    and the rows of the last executed statement are iterated with ``async for``.
+    """
+
+    def __init__(
+            self,
+            connection: "AsyncConnection",
+            request: AsyncTrinoRequest,
+            legacy_primitive_types: bool = False,
+            lazy_rows: bool = False) -> None:
+        self._connection = connection
+        self._request = request
+
+        self.arraysize = 1
+        self._iterator: Optional[AsyncIterator[Any]] = None
+        self._query: Optional[AsyncTrinoQuery] = None
+        self._legacy_primitive_types = legacy_primitive_types
+        self._lazy_rows = lazy_rows
+
+    def __aiter__(self) -> Optional[AsyncIterator[Any]]:
+        return self._iterator
+
+    async def __aenter__(self) -> "AsyncCursor":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        await self.close()
+
+    @property
+    def connection(self) -> "AsyncConnection":
+        return self._connection
+
+    @property
+    def info_uri(self) -> Optional[str]:
+        if self._query is not None:
+            return self._query.info_uri
+        return None
+
+    @property
+    def update_type(self) -> Optional[str]:
+        if self._query is not None:
+            return self._query.update_type
+        return None
+
+    @property
+    def description(self) -> Optional[List[dbapi.ColumnDescription]]:
+        if self._query is None or self._query.columns is None:
+            return None
+
+        return [
+            dbapi.ColumnDescription.from_column(col) for col in self._query.columns
+        ]
+
+    @property
+    def rowcount(self) -> int:
+        """See :attr:`pyavrio.dbapi.Cursor.rowcount`."""
+        if self._query is not None and self._query.update_count is not None:
+            return self._query.update_count
+        return -1
+
+    @property
+    def stats(self) -> Optional[Dict[Any, Any]]:
+        if self._query is not None:
+            return self._query.stats
+        return None
+
+    @property
+    def query_id(self) -> Optional[str]:
+        if self._query is not None:
+            return self._query.query_id
+        return None
+
+    @property
+    def query(self) -> Optional[str]:
+        if self._query is not None:
+            return self._query.query
+        return None
+
+    @property
+    def warnings(self) -> Optional[List[Dict[Any, Any]]]:
+        if self._query is not None:
+            return self._query.warnings
+        return None
+
+    def _format_prepared_param(self, param: Any) -> str:
+        # Parameters are bound with EXECUTE IMMEDIATE, formatted as by the DBAPI cursor,
+        # whose method only uses the cursor to format nested values with this method
+        return dbapi.Cursor._format_prepared_param(cast(dbapi.Cursor, self), param)
+
+    async def execute(self, operation: str, params: Optional[Sequence[Any]] = None) -> "AsyncCursor":
+        if params:
+            assert isinstance(params, (list, tuple)), (
+                'params must be a list or tuple containing the query '
+                'parameter values'
+            )
+            operation = "EXECUTE IMMEDIATE '" + operation.replace("'", "''") + \
+                        "' USING " + ",".join(map(self._format_prepared_param, params))
+
+        # Renew an access token about to expire before the query reads it
+        await self._request.access_token()
+        self._query = AsyncTrinoQuery(
+            self._request,
+            query=operation,
+            legacy_primitive_types=self._legacy_primitive_types,
+            modified_query_cache=self.connection.modified_query_cache,
+            metadata_query_cache=self.connection.metadata_query_cache,
+            json_decoder=self.connection.json_decoder,
+            lazy_rows=self._lazy_rows,
+        )
+        self._iterator = (await self._query.execute()).__aiter__()
+        return self
+
+    async def fetchone(self) -> Optional[List[Any]]:
+        try:
+            assert self._iterator is not None
+            return await self._iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+        except exceptions.HttpError as err:
+            raise exceptions.OperationalError(str(err))
+
+    async def fetchmany(self, size: Optional[int] = None) -> List[List[Any]]:
+        if size is None:
+            size = self.arraysize
+
+        rows: List[List[Any]] = []
+        while len(rows) < size:
+            row = await self.fetchone()
+            if row is None:
+                break
+            rows.append(row)
+        return rows
+
+    async def fetchall(self) -> List[List[Any]]:
+        rows: List[List[Any]] = []
+        row = await self.fetchone()
+        while row is not None:
+            rows.append(row)
+            row = await self.fetchone()
+        return rows
+
+    async def cancel(self) -> None:
+        if self._query is None:
+            return
+        await self._query.cancel()
+
+    async def close(self) -> None:
+        await self.cancel()
+
+
+def connect(*args: Any, **kwargs: Any) -> "AsyncConnection":
+    """Constructor for creating an asyncio connection to the database.
+
+    See class :py:class:`AsyncConnection` for arguments.
+    """
+    return AsyncConnection(*args, **kwargs)
+
+
+class AsyncConnection(dbapi.Connection):
+    """
+    Connection of the asyncio client, taking the options of :class:`pyavrio.dbapi.Connection`.
+
+    Statements run in autocommit mode and their parameters are bound with ``EXECUTE
+    IMMEDIATE``. Transactions, page prefetching, streaming decoding and the spooled
+    protocol are not supported, and ``auth`` must be an :class:`pyavrio.auth.AvrioAuthentication`.
+
+    :param http_client: ``httpx.AsyncClient`` sending the requests of every cursor. If
+        ``None``, a client with up to ``max_connections`` pooled connections is created
+        and closed with the connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        max_connections: Optional[int] = constants.DEFAULT_ASYNC_MAX_CONNECTIONS,
+        **kwargs: Any,
+    ) -> None:
+        if kwargs.get("isolation_level", IsolationLevel.AUTOCOMMIT) != IsolationLevel.AUTOCOMMIT:
+            raise exceptions.NotSupportedError("Transactions are not supported by the asyncio client")
+        for option in ("prefetch_pages", "streaming_decode", "encoding"):
+            if kwargs.get(option):
+                raise exceptions.NotSupportedError(f"'{option}' is not supported by the asyncio client")
+        if kwargs.get("http_session") is not None:
+            raise exceptions.NotSupportedError(
+                "'http_session' is not supported by the asyncio client, use 'http_client'"
+            )
+        auth = kwargs.get("auth", constants.DEFAULT_AUTH)
+        if auth is not None and not isinstance(auth, AvrioAuthentication):
+            # Requests are authenticated with the bearer token of AvrioAuthentication only
+            raise ValueError(
+                "The asyncio client only supports AvrioAuthentication, got {}".format(type(auth).__name__)
+            )
+        super().__init__(host, **kwargs)
+        self._owns_http_client = http_client is None
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                verify=kwargs.get("verify", True),
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            )
+        self._http_client = http_client
+
+    def __enter__(self) -> "AsyncConnection":
+        raise TypeError("AsyncConnection must be used with 'async with'")
+
+    async def __aenter__(self) -> "AsyncConnection":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_http_client:
+            await self._http_client.aclose()
+
+    def start_transaction(self) -> None:
+        raise exceptions.NotSupportedError("Transactions are not supported by the asyncio client")
+
+    def _create_http_session(self, verify: Union[bool, str]) -> None:
+        # Requests are sent by the httpx client, no requests session is needed
+        return None
+
+    def _create_request(self) -> AsyncTrinoRequest:
+        return AsyncTrinoRequest(
+            self.host,
+            self.port,
+            self._client_session,
+            self._http_client,
+            self.http_scheme,
+            self.auth,
+            self.max_attempts,
+            self.request_timeout,
+            json_decoder=self.json_decoder,
+            http_compression=self.http_compression,
+        )
+
+    def cursor(
+        self,
+        legacy_primitive_types: Optional[bool] = None,
+        prefetch_pages: Optional[int] = None,
+        lazy_rows: Optional[bool] = None,
+    ) -> AsyncCursor:
+        """Return a new :py:class:`AsyncCursor` object using the connection."""
+        if prefetch_pages:
+            raise exceptions.NotSupportedError("'prefetch_pages' is not supported by the asyncio client")
+        return AsyncCursor(
+            self,
+            self._create_request(),
+            legacy_primitive_types if legacy_primitive_types is not None else self.legacy_primitive_types,
+            lazy_rows if lazy_rows is not None else self.lazy_rows,
+        )
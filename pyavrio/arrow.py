@@ -0,0 +1,213 @@
+"""
+
+This module converts pages of result rows into Apache Arrow record batches.
+
+The Arrow type of a column is mapped from its Trino ``typeSignature``:
+
+==================================  ===================================
+Trino type                          Arrow type
+==================================  ===================================
+boolean                             bool
+tinyint, smallint, integer, bigint  int8, int16, int32, int64
+real, double                        float32, float64
+decimal(p, s)                       decimal128(p, s), decimal256(p, s)
+varchar, char                       string
+varbinary                           binary
+date                                date32
+time(p)                             time64[us|ns]
+timestamp(p)                        timestamp[s|ms|us|ns]
+timestamp(p) with time zone         timestamp[s|ms|us|ns, tz=UTC]
+array(T)                            list<T>
+map(K, V)                           map<K, V>
+row(...)                            struct<...>
+other types                         string
+==================================  ===================================
+
+Columns of flat types holding values as returned by Trino (``raw=True``, as passed by
+the cursor methods) are built by Arrow from the page values at once, including the
+parsing of decimals, dates and timestamps. Other columns are built from the Python
+objects returned by the value mappers.
+
+pyarrow is an optional dependency, install ``pyavrio[pyarrow]`` to use this module.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from pyavrio import columnar
+from pyavrio.client import ValueMapper
+from pyavrio.exceptions import TrinoDataError
+
+__all__ = ["arrow_type", "arrow_schema", "to_record_batch", "iter_record_batches", "to_table"]
+
+_PRIMITIVE_TYPES = {
+    "boolean": "bool_",
+    "tinyint": "int8",
+    "smallint": "int16",
+    "integer": "int32",
+    "bigint": "int64",
+    "real": "float32",
+    "double": "float64",
+    "varchar": "string",
+    "char": "string",
+}
+
+# Types parsed by Arrow from the strings returned by Trino
+_CAST_TYPES = frozenset({"decimal", "date", "timestamp"})
+
+_DECIMAL128_MAX_PRECISION = 38
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError("Arrow results require the 'pyarrow' package, install pyavrio[pyarrow]") from e
+    return pyarrow
+
+
+def _precision(type_signature: Dict[str, Any], default: int = 3) -> int:
+    arguments = type_signature.get("arguments") or []
+    return arguments[0]["value"] if arguments else default
+
+
+def _timestamp_unit(precision: int) -> str:
+    if precision == 0:
+        return "s"
+    if precision <= 3:
+        return "ms"
+    if precision <= 6:
+        return "us"
+    return "ns"
+
+
+def arrow_type(type_signature: Dict[str, Any]) -> Any:
+    """Arrow type of a column, from its Trino ``typeSignature``."""
+    pa = _import_pyarrow()
+    raw_type = type_signature["rawType"]
+    arguments = type_signature.get("arguments") or []
+    if raw_type in _PRIMITIVE_TYPES:
+        return getattr(pa, _PRIMITIVE_TYPES[raw_type])()
+    if raw_type == "decimal":
+        precision, scale = arguments[0]["value"], arguments[1]["value"]
+        if precision <= _DECIMAL128_MAX_PRECISION:
+            return pa.decimal128(precision, scale)
+        return pa.decimal256(precision, scale)
+    if raw_type == "varbinary":
+        return pa.binary()
+    if raw_type == "date":
+        return pa.date32()
+    if raw_type == "time":
+        return pa.time64("us" if _precision(type_signature) <= 6 else "ns")
+    if raw_type == "timestamp":
+        return pa.timestamp(_timestamp_unit(_precision(type_signature)))
+    if raw_type == "timestamp with time zone":
+        return pa.timestamp(_timestamp_unit(_precision(type_signature)), tz="UTC")
+    if raw_type == "array":
+        return pa.list_(arrow_type(arguments[0]["value"]))
+    if raw_type == "map":
+        return pa.map_(arrow_type(arguments[0]["value"]), arrow_type(arguments[1]["value"]))
+    if raw_type == "row":
+        return pa.struct([
+            pa.field(
+                argument["value"]["fieldName"]["name"] if "fieldName" in argument["value"] else "",
+                arrow_type(argument["value"]["typeSignature"]),
+            )
+            for argument in arguments
+        ])
+    return pa.string()
+
+
+def arrow_schema(columns: List[Dict[str, Any]]) -> Any:
+    """Arrow schema of a result, from its columns as returned by Trino."""
+    pa = _import_pyarrow()
+    return pa.schema([pa.field(column["name"], arrow_type(column["typeSignature"])) for column in columns])
+
+
+def _utc_timestamps(pa: Any, values: Sequence[Any], timestamp_type: Any) -> Any:
+    """Parses timestamps sharing a single fixed offset at once, ``None`` for other values."""
+    split = columnar._split_fixed_offset(values)
+    if split is None:
+        return None
+    local_values, offset = split
+    local = pa.array(local_values, pa.string()).cast(pa.timestamp(timestamp_type.unit))
+    if offset:
+        import pyarrow.compute as pc
+
+        local = pc.subtract(local, pa.scalar(offset, pa.duration(timestamp_type.unit)))
+    return local.cast(timestamp_type)
+
+
+def _to_array(pa: Any, column: Dict[str, Any], values: Sequence[Any], value_mapper: ValueMapper[Any], raw: bool) -> Any:
+    raw_type = column["typeSignature"]["rawType"]
+    column_type = arrow_type(column["typeSignature"])
+    if raw:
+        try:
+            if raw_type in _CAST_TYPES:
+                return pa.array(values, pa.string()).cast(column_type)
+            if raw_type == "timestamp with time zone":
+                array = _utc_timestamps(pa, values, column_type)
+                if array is not None:
+                    return array
+            elif raw_type in _PRIMITIVE_TYPES or pa.types.is_string(column_type):
+                return pa.array(values, column_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # e.g. "NaN" doubles or timestamps finer than nanoseconds, converted by the value mapper
+            pass
+        values = columnar._map_raw_values(values, value_mapper)
+    if pa.types.is_string(column_type):
+        values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+    try:
+        return pa.array(values, column_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        if not raw:
+            raise
+        raise TrinoDataError("Could not convert column '{}' to {}: {}".format(column["name"], column_type, e)) from e
+
+
+def to_record_batch(columns: List[Dict[str, Any]], rows: Sequence[Sequence[Any]], raw: bool = False) -> Any:
+    """
+    Convert a page of rows to an Arrow record batch.
+
+    :param columns: columns of the result, as returned by Trino, with their ``typeSignature``.
+    :param rows: rows of the page.
+    :param raw: whether the rows hold the values as returned by Trino instead of Python objects.
+    """
+    pa = _import_pyarrow()
+    value_mappers = columnar._value_mappers(columns)
+    column_values = list(zip(*rows)) if rows else [()] * len(columns)
+    return pa.RecordBatch.from_arrays(
+        [
+            _to_array(pa, column, values, value_mapper, raw)
+            for column, values, value_mapper in zip(columns, column_values, value_mappers)
+        ],
+        schema=arrow_schema(columns),
+    )
+
+
+def iter_record_batches(
+        columns: List[Dict[str, Any]],
+        pages: Iterable[Sequence[Sequence[Any]]],
+        max_rows: Optional[int] = None,
+        raw: bool = False,
+) -> Iterator[Any]:
+    """
+    Convert pages of rows to Arrow record batches, one per page.
+
+    :param max_rows: if set, the batch of a page with more rows is split in zero-copy slices of up to ``max_rows`` rows.
+    """
+    if max_rows is not None and max_rows <= 0:
+        raise ValueError("max_rows must be a positive integer")
+    for rows in pages:
+        if not rows:
+            continue
+        batch = to_record_batch(columns, rows, raw=raw)
+        if max_rows is None or batch.num_rows <= max_rows:
+            yield batch
+            continue
+        for offset in range(0, batch.num_rows, max_rows):
+            yield batch.slice(offset, max_rows)
+
+
+def to_table(columns: List[Dict[str, Any]], batches: Iterable[Any]) -> Any:
+    """Build an Arrow table from the record batches of a result."""
+    pa = _import_pyarrow()
+    return pa.Table.from_batches(list(batches), schema=arrow_schema(columns))
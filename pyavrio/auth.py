@@ -1,10 +1,26 @@
 import abc
-from typing import Any, Tuple
+import base64
+import binascii
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Tuple
 
-from requests import PreparedRequest, Session
+from requests import PreparedRequest, Response, Session
 from requests.auth import AuthBase
 
 import pyavrio.logging
+from pyavrio import constants
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows
+    fcntl = None  # type: ignore
 
 logger = pyavrio.logging.get_logger(__name__)
 
@@ -24,9 +40,62 @@ class Authentication(metaclass=abc.ABCMeta):
 class AvrioAuthentication(Authentication):
     """
     Implementation of Authentication class for Avrio authentication.
+
+    With a ``refresh`` function returning a new token, e.g. signing in again, the token
+    is renewed shortly before the expiry of its JWT ``exp`` claim, and requests rejected
+    with HTTP 401 are sent again once with a renewed token. ``refresh`` is called with
+    the token to replace.
     """
-    def __init__(self, token: str):
-        self.token = token
+    def __init__(
+        self,
+        token: str,
+        refresh: Optional[Callable[[str], str]] = None,
+        expiry_margin: float = constants.DEFAULT_ACCESS_TOKEN_EXPIRY_MARGIN,
+    ):
+        self._token = token
+        self._refresh = refresh
+        self._expiry_margin = expiry_margin
+        self._lock = threading.Lock()
+
+    @property
+    def token(self) -> str:
+        """Current token, renewed first if it is about to expire."""
+        token = self._token
+        if self.expiring:
+            self.refresh(token)
+        return self._token
+
+    @property
+    def can_refresh(self) -> bool:
+        return self._refresh is not None
+
+    @property
+    def expiring(self) -> bool:
+        """Whether the token is about to expire, so it is renewed when next read."""
+        if self._refresh is None:
+            return False
+        expires_at = _jwt_expiry(self._token)
+        return expires_at is not None and expires_at - self._expiry_margin <= time.time()
+
+    def refresh(self, stale_token: Optional[str] = None) -> bool:
+        """
+        Replace the token by one returned by the ``refresh`` function.
+
+        :param stale_token: token found expired or rejected, nothing is done if it was
+            already replaced, e.g. by another thread.
+        :returns: whether a new token is available.
+        """
+        if self._refresh is None:
+            return False
+        with self._lock:
+            if stale_token is not None and self._token != stale_token:
+                return True
+            try:
+                self._token = self._refresh(self._token)
+            except Exception as e:
+                logger.warning("Failed to refresh the access token: %s", e)
+                return False
+            return True
 
     def set_http_session(self, http_session: Session) -> Session:
         """
@@ -38,7 +107,7 @@ class AvrioAuthentication(Authentication):
         Returns:
             Session: The HTTP session with Avrio authentication set.
         """
-        http_session.auth = _BearerAuth(self.token)
+        http_session.auth = _BearerAuth(self.token, authentication=self)
         return http_session
 
     def get_exceptions(self) -> Tuple[Any, ...]:
@@ -56,7 +125,7 @@ class AvrioAuthentication(Authentication):
         """
         if not isinstance(other, AvrioAuthentication):
             return False
-        return self.token == other.token
+        return self._token == other._token
 
 
 class _BearerAuth(AuthBase):
@@ -64,9 +133,311 @@ class _BearerAuth(AuthBase):
     Custom implementation of Authentication class for bearer token
     """
 
-    def __init__(self, token: str):
-        self.token = token
+    def __init__(self, token: str, authentication: Optional[AvrioAuthentication] = None):
+        self._token = token
+        self._authentication = authentication
+
+    @property
+    def token(self) -> str:
+        return self._authentication.token if self._authentication is not None else self._token
 
     def __call__(self, r: PreparedRequest) -> PreparedRequest:
-        r.headers["Authorization"] = "Bearer " + self.token
+        token = self.token
+        r.headers["Authorization"] = "Bearer " + token
+        if self._authentication is not None and self._authentication.can_refresh:
+            r.register_hook("response", functools.partial(self._retry_unauthorized, token))
         return r
+
+    def _retry_unauthorized(self, token: str, response: Response, **kwargs: Any) -> Response:
+        """Send a request rejected with HTTP 401 again with a renewed token, e.g. to fetch the
+        same ``nextUri`` of a query whose token expired while its results were read."""
+        authentication = self._authentication
+        if response.status_code != 401 or authentication is None or not authentication.refresh(token):
+            return response
+        # Consume the rejected response so its connection is returned to the pool
+        response.content
+        response.close()
+        prepared = response.request.copy()
+        prepared.headers["Authorization"] = "Bearer " + authentication.token
+        retried = response.connection.send(prepared, **kwargs)
+        retried.history.append(response)
+        retried.request = prepared
+        return retried
+
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    """Expiry time of a JWT from its ``exp`` claim, ``None`` if the token is not a JWT or has none."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        exp = json.loads(payload).get("exp")
+    except (binascii.Error, ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _password_digest(host: str, user: str, password: str) -> str:
+    """Digest checked before a cached token is returned, so a token is only reused with the password it was issued
+    for. Salted and stretched as it is stored along with the token."""
+    salt = "{}/{}".format(host, user).encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 10_000).hex()
+
+
+class _TokenStorage(metaclass=abc.ABCMeta):
+    """
+    Storage of the cached access tokens, shared by the processes of a host.
+
+    Entries are dictionaries with the ``token``, its ``expires_at`` time and the
+    ``digest`` of the password it was issued for.
+    """
+    @abc.abstractmethod
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abc.abstractmethod
+    def store(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        pass
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Serialize sign-ins between processes, where the storage supports it."""
+        yield
+
+
+class _FileTokenStorage(_TokenStorage):
+    """
+    Stores the tokens in a JSON file readable by the current user only, created with
+    mode 0o600 in a directory created with mode 0o700.
+
+    Sign-ins and writes are serialized between processes with a lock file on POSIX
+    systems, so a fleet of workers starting together signs in once and no write of
+    the file drops the entry written by another process.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".cache", "pyavrio", "access_tokens.json")
+        # Re-entrant, as store is called by a thread holding lock during a sign-in
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file: Optional[IO[str]] = None
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read().get(key)
+
+    def store(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.path)
+        with self.lock():
+            entries = self._read()
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+            now = time.time()
+            entries = {k: e for k, e in entries.items() if e.get("expires_at", 0) > now}
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".access_tokens")
+            try:
+                # mkstemp already creates the file for the current user only, whatever the umask
+                os.chmod(tmp_path, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        with self._lock:
+            if self._lock_depth == 0:
+                os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+                if fcntl is not None:
+                    # flock locks of two open files conflict even within a process, so the
+                    # lock file is only locked by the outermost lock of the holding thread
+                    lock_fd = os.open(self.path + ".lock", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+                    lock_file = os.fdopen(lock_fd, "a")
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    except BaseException:
+                        lock_file.close()
+                        raise
+                    self._lock_file = lock_file
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+
+class _KeyringTokenStorage(_TokenStorage):
+    """Stores the tokens in the system keyring."""
+    SERVICE = "pyavrio"
+
+    def __init__(self) -> None:
+        try:
+            import keyring
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "The keyring token cache requires the 'keyring' package, "
+                "install pyavrio[external-authentication-token-cache]"
+            ) from e
+        self._keyring = keyring
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self._keyring.get_password(self.SERVICE, key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning("Failed to read the access token of %s from the keyring: %s", key, e)
+            return None
+
+    def store(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        try:
+            if entry is None:
+                self._keyring.delete_password(self.SERVICE, key)
+            else:
+                self._keyring.set_password(self.SERVICE, key, json.dumps(entry))
+        except Exception as e:
+            logger.warning("Failed to store the access token of %s in the keyring: %s", key, e)
+
+
+class AccessTokenCache:
+    """
+    Access tokens of password sign-ins, keyed by host and user.
+
+    Tokens are kept in memory and, with a ``"file"`` or ``"keyring"`` storage, shared
+    with the other processes of the host. A token is reused until it is about to
+    expire, from the ``exp`` claim of JWTs or ``default_ttl`` seconds after the
+    sign-in otherwise, and only for the password it was issued for.
+    """
+    def __init__(
+        self,
+        storage: Optional[_TokenStorage] = None,
+        default_ttl: float = constants.DEFAULT_ACCESS_TOKEN_TTL,
+        expiry_margin: float = constants.DEFAULT_ACCESS_TOKEN_EXPIRY_MARGIN,
+    ):
+        self._storage = storage
+        self._default_ttl = default_ttl
+        self._expiry_margin = expiry_margin
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _key(host: str, user: str) -> str:
+        return "{}/{}".format(host, user)
+
+    def _valid(self, entry: Dict[str, Any], digest: str) -> bool:
+        return (
+            entry.get("digest") == digest
+            and entry.get("expires_at", 0) - self._expiry_margin > time.time()
+        )
+
+    def get(self, host: str, user: str, password: str) -> Optional[str]:
+        """Return the cached token of ``user``, ``None`` if there is none valid for ``password``."""
+        key = self._key(host, user)
+        digest = _password_digest(host, user, password)
+        entry = self._entries.get(key)
+        if entry is not None and self._valid(entry, digest):
+            return entry["token"]
+        if self._storage is not None:
+            stored = self._storage.load(key)
+            if stored is not None and self._valid(stored, digest):
+                self._entries[key] = stored
+                return stored["token"]
+        return None
+
+    def put(self, host: str, user: str, password: str, token: str) -> None:
+        key = self._key(host, user)
+        expires_at = _jwt_expiry(token)
+        entry = {
+            "token": token,
+            "expires_at": expires_at if expires_at is not None else time.time() + self._default_ttl,
+            "digest": _password_digest(host, user, password),
+        }
+        self._entries[key] = entry
+        if self._storage is not None:
+            self._storage.store(key, entry)
+
+    def invalidate(self, host: str, user: str) -> None:
+        """Drop the token of ``user``, e.g. after it was rejected."""
+        key = self._key(host, user)
+        self._entries.pop(key, None)
+        if self._storage is not None:
+            self._storage.store(key, None)
+
+    def get_or_sign_in(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        sign_in: Callable[[], str],
+        stale_token: Optional[str] = None,
+    ) -> str:
+        """Return the cached token of ``user`` or the one returned by ``sign_in``, called once
+        at a time per user across the threads, and processes with a file storage, sharing the cache.
+
+        :param stale_token: token rejected by the server, signed in again unless another
+            token was cached in the meantime.
+        """
+        token = self.get(host, user, password)
+        if token is not None and token != stale_token:
+            return token
+        key = self._key(host, user)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._storage.lock() if self._storage is not None else nullcontext():
+                # Signed in by another thread or process while waiting
+                token = self.get(host, user, password)
+                if token is None or token == stale_token:
+                    token = sign_in()
+                    self.put(host, user, password, token)
+                return token
+
+    def clear(self) -> None:
+        """Drop the tokens kept in memory."""
+        self._entries.clear()
+
+
+_token_caches: Dict[str, AccessTokenCache] = {}
+_token_caches_lock = threading.Lock()
+
+
+def get_token_cache(storage: str = "memory") -> Optional[AccessTokenCache]:
+    """
+    Return the token cache of the process for ``storage``.
+
+    :param storage: ``"memory"``, ``"file"`` to share tokens between the processes of the
+        user through ``~/.cache/pyavrio/access_tokens.json``, ``"keyring"`` to share them
+        through the system keyring, or ``"none"`` to sign in for every connection.
+    """
+    if storage == "none":
+        return None
+    with _token_caches_lock:
+        cache = _token_caches.get(storage)
+        if cache is None:
+            if storage == "memory":
+                cache = AccessTokenCache()
+            elif storage == "file":
+                cache = AccessTokenCache(_FileTokenStorage())
+            elif storage == "keyring":
+                cache = AccessTokenCache(_KeyringTokenStorage())
+            else:
+                raise ValueError(
+                    "Unknown token cache '{}', expected one of memory, file, keyring, none".format(storage)
+                )
+            _token_caches[storage] = cache
+        return cache
@@ -1,18 +1,120 @@
 import json
+import threading
+from http.cookiejar import DefaultCookiePolicy
 from urllib.parse import quote
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pyavrio import constants, json_codec
 from pyavrio.sqlalchemy import datatype
 from .endpoints import AvrioEndpoints
 from .exceptions import AvrioAuthenticationError, AvrioRequestError
 
-__all__ = ["AvrioHTTPHandler"]
+__all__ = ["AvrioHTTPHandler", "SessionRegistry", "sessions"]
+
+
+class SessionRegistry:
+    """Pooled, keep-alive HTTP sessions shared by every :class:`AvrioHTTPHandler` of the
+    process, one per base URL, so rewrite and metadata calls reuse open TCP and TLS
+    connections across queries, connections and engines.
+
+    Sessions carry no credentials nor cookies, the headers of each user are sent with
+    every request. Options apply to the sessions created after :meth:`configure`, which
+    closes the current ones.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = constants.DEFAULT_REST_POOL_CONNECTIONS,
+        pool_maxsize: int = constants.DEFAULT_REST_POOL_MAXSIZE,
+        max_retries: int = constants.DEFAULT_REST_MAX_RETRIES,
+        backoff_factor: float = constants.DEFAULT_REST_BACKOFF_FACTOR,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float]] = constants.DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **options: Any) -> None:
+        """Set the options of the sessions, e.g. ``configure(pool_maxsize=32, max_retries=5)``."""
+        for name in options:
+            if name.startswith("_") or not hasattr(self, name) or callable(getattr(self, name)):
+                raise ValueError(f"Unknown session option '{name}'")
+        with self._lock:
+            for name, value in options.items():
+                setattr(self, name, value)
+        self.close()
+
+    def get(self, base_url: str) -> requests.Session:
+        """Return the session of ``base_url``, creating it on first use."""
+        session = self._sessions.get(base_url)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = self._sessions[base_url] = self._create_session()
+            return session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # Sessions are shared by users, cookies set for one of them must not be sent for another
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                              max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        """Close the sessions and their pooled connections."""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+sessions = SessionRegistry()
+
 
 class AvrioHTTPHandler:
 
-    def __init__(self, base_url, access_token):
+    def __init__(self, base_url, access_token, json_decoder=None, accept_encoding=None, session=None, timeout=None):
         self._base_url = base_url
         self._access_token = access_token
+        # Function decoding response bodies, see pyavrio.json_codec.get_decoder
+        self._json_decoder = json_decoder
+        # Value of the Accept-Encoding header, see pyavrio.compression, None for the requests default
+        self._accept_encoding = accept_encoding
+        # Pooled session of the base URL from the process-wide registry unless given
+        self._session = session if session is not None else sessions.get(base_url)
+        self._timeout = timeout if timeout is not None else sessions.timeout
+
+    def _decode(self, response: requests.Response) -> Any:
+        return json_codec.decode_response(response, self._json_decoder)
+
+    def _headers(self, headers: Dict[str, str]) -> Dict[str, str]:
+        if self._accept_encoding is not None:
+            headers[constants.HEADER_ACCEPT_ENCODING] = self._accept_encoding
+        return headers
         
     def _get(self,  endpoint, params=None):
         """
@@ -27,8 +129,8 @@ class AvrioHTTPHandler:
         """
         encoded_params = "&".join([f"{key}={quote(str(value))}" for key, value in params.items()])
         url_with_params = f"{self._base_url}{endpoint}?{encoded_params}"
-        headers = {'Authorization': 'Bearer '+self._access_token}
-        response = requests.get(url=url_with_params,headers=headers)
+        headers = self._headers({'Authorization': 'Bearer '+self._access_token})
+        response = self._session.get(url=url_with_params, headers=headers, timeout=self._timeout)
         return response
     
     def _get_modified_query(self, email, sql,access_token, catalog):
@@ -43,19 +145,24 @@ class AvrioHTTPHandler:
         :param access_token: The access token for authorization.
         :return: The response object returned by the POST request.
         """
-        payload = {"inputQuerySql": sql, "email": email, "catalog": catalog}
-        endpoint = AvrioEndpoints.MODIFIED_QUERY
-        url_with_params = f"{self._base_url}{endpoint}"
-        headers = {'Authorization': 'Bearer '+access_token, 'Content-Type': 'application/json'}
+        url_with_params, headers, payload = self._modified_query_request(email, sql, access_token, catalog)
 
         try:
-            response = requests.post(url=url_with_params, headers=headers, json=payload)
+            response = self._session.post(url=url_with_params, headers=headers, json=payload, timeout=self._timeout)
             return response
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to get response: {str(e)}")
 
-       
-            
+    def _modified_query_request(
+            self, email: str, sql: str, access_token: str, catalog: Optional[str]
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """URL, headers and JSON body of a ``getModifiedQuery`` request, also sent by :mod:`pyavrio.aio`."""
+        payload = {"inputQuerySql": sql, "email": email, "catalog": catalog}
+        endpoint = AvrioEndpoints.MODIFIED_QUERY
+        url_with_params = f"{self._base_url}{endpoint}"
+        headers = self._headers({'Authorization': 'Bearer ' + access_token, 'Content-Type': 'application/json'})
+        return url_with_params, headers, payload
+
     def _generate_token(self, username, password, host) -> str:
         """
         Function to generate authentication token by calling an Avrio API.
@@ -74,11 +181,11 @@ class AvrioHTTPHandler:
         payload = {"email": username, "password": password,"host":host}
         url = AvrioEndpoints.IAM_SIGNIN
         url_with_params = f"{self._base_url}{url}"
-        headers = {'Content-Type': 'application/json'}
+        headers = self._headers({'Content-Type': 'application/json'})
         try:
-            response = requests.post(url=url_with_params, headers=headers, json=payload)
+            response = self._session.post(url=url_with_params, headers=headers, json=payload, timeout=self._timeout)
             response.raise_for_status()
-            token = response.json().get("accessToken")
+            token = self._decode(response).get("accessToken")
             if not token:
                 raise AvrioAuthenticationError("No access token in response")
             return token
@@ -102,11 +209,11 @@ class AvrioHTTPHandler:
 
         url = AvrioEndpoints.DATASETS_BASE.format(email=userEmail)
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             return [item['domain'] for item in data]
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to fetch catalogs: {str(e)}")
@@ -128,12 +235,12 @@ class AvrioHTTPHandler:
         """
         url = AvrioEndpoints.DATASETS_DOMAIN.format(email=userEmail, domain=domain)
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             schemas = [item['domain'] for item in data]
             return schemas
         except requests.exceptions.RequestException as e:
@@ -144,12 +251,12 @@ class AvrioHTTPHandler:
         url = AvrioEndpoints.PYTHON_SCHEMAS.format(email=email)
         encoded_params = "&".join([f"{key}={quote(str(value))}" for key, value in params.items()])
         url_with_params = f"{self._base_url}{url}?{encoded_params}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
 
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             if "data" not in data:
                 raise AvrioRequestError("No data field in response")
             return data["data"]
@@ -186,14 +293,14 @@ class AvrioHTTPHandler:
             url = f"{self._base_url}{endpoint}"
             
             # Set up headers with authentication token
-            headers = {"Authorization": f"Bearer {token}"}
+            headers = self._headers({"Authorization": f"Bearer {token}"})
             
             # Make the request
-            response = requests.get(url, headers=headers)
+            response = self._session.get(url, headers=headers, timeout=self._timeout)
             response.raise_for_status()
             
             # Parse and return the data
-            data = response.json()
+            data = self._decode(response)
             tables = []
             for key in data:
                 tables.extend(data[key])
@@ -227,12 +334,12 @@ class AvrioHTTPHandler:
         else:
             url_with_params = f"{self._base_url}{url}"
             
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             return data["data"]
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to fetch tables: {str(e)}")
@@ -256,12 +363,12 @@ class AvrioHTTPHandler:
         
         url = AvrioEndpoints.DATASETS_COLUMNS.format(email=userEmail, dataproduct=dataproduct)
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        headers = self._headers({"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             columns = data.get('columns', [])
             return [
                 {'name': column.get('colName'), 
@@ -290,12 +397,12 @@ class AvrioHTTPHandler:
 
         url = AvrioEndpoints.JDBC_DATASOURCES.format(email=userEmail)
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             return [item['name'] for item in data]
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to fetch catalogs: {str(e)}")
@@ -317,12 +424,12 @@ class AvrioHTTPHandler:
         """
         url = AvrioEndpoints.JDBC_SCHEMAS.format(email=emailAddress, datasource=datasource)
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             return [schema['schemaName'] for schema in data]
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to fetch schemas: {str(e)}")
@@ -350,12 +457,12 @@ class AvrioHTTPHandler:
             schema=schema
         )
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             return [table['tableName'] for table in data]
         except requests.exceptions.RequestException as e:
             raise AvrioRequestError(f"Failed to fetch tables: {str(e)}")
@@ -384,12 +491,12 @@ class AvrioHTTPHandler:
             table=table
             )
         url_with_params = f"{self._base_url}{url}"
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = self._headers({"Authorization": f"Bearer {token}"})
         
         try:
-            response = requests.get(url_with_params, headers=headers)
+            response = self._session.get(url_with_params, headers=headers, timeout=self._timeout)
             response.raise_for_status()
-            data = response.json()
+            data = self._decode(response)
             
             columns_info = []
             for column_data in data:
@@ -27,18 +27,23 @@ import abc
 import base64
 import copy
 import functools
+import json
+import operator
 import os
+import queue
 import random
 import re
 import threading
 import urllib.parse
 import uuid
 import warnings
+from collections import OrderedDict
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone, tzinfo
 from decimal import Decimal
 from time import sleep
-from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Union
 
 try:
     from zoneinfo import ZoneInfo
@@ -49,9 +54,10 @@ import requests
 from dateutil import tz
 from tzlocal import get_localzone_name 
 
+from pyavrio.auth import AvrioAuthentication
 from pyavrio.avrio_rest_handler import AvrioHTTPHandler
 import pyavrio.logging
-from pyavrio import constants, exceptions
+from pyavrio import compression, constants, exceptions, json_codec, spooling
 from pyavrio._version import __version__
 from pyavrio.query_parser import QueryParser
 
@@ -112,6 +118,9 @@ class ClientSession(object):
     :param roles: roles for the current session. Some connectors do not
                  support role management. See connector documentation for more details.
     :param timezone: The timezone for query processing. Defaults to the system's local timezone.
+
+    Listeners registered with :meth:`add_session_change_listener` are called with the
+    session whenever its catalog or schema changes, e.g. after a ``USE`` statement.
     """
 
     def __init__(
@@ -128,7 +137,7 @@ class ClientSession(object):
         roles: Union[Dict[str, str], str] = None,
         timezone: str = None,
         platform: str = None,
-        access_token: str = None
+        access_token: Union[str, Callable[[], str]] = None
     ):
         self._user = user
         self._catalog = catalog
@@ -147,6 +156,7 @@ class ClientSession(object):
             ZoneInfo(timezone)
         self._platform = platform
         self._access_token = access_token
+        self._session_change_listeners: List[Callable[[ClientSession], None]] = []
 
     @property
     def user(self):
@@ -154,6 +164,9 @@ class ClientSession(object):
     
     @property
     def access_token(self):
+        # A function returns the current token of credentials which are renewed
+        if callable(self._access_token):
+            return self._access_token()
         return self._access_token
 
     @property
@@ -164,7 +177,10 @@ class ClientSession(object):
     @catalog.setter
     def catalog(self, catalog):
         with self._object_lock:
+            changed = self._catalog != catalog
             self._catalog = catalog
+        if changed:
+            self._notify_session_change()
 
     @property
     def schema(self):
@@ -174,7 +190,10 @@ class ClientSession(object):
     @schema.setter
     def schema(self, schema):
         with self._object_lock:
+            changed = self._schema != schema
             self._schema = schema
+        if changed:
+            self._notify_session_change()
 
     @property
     def source(self):
@@ -240,6 +259,16 @@ class ClientSession(object):
     def platform(self):
         return self._platform
 
+    def add_session_change_listener(self, listener: Callable[[ClientSession], None]) -> None:
+        with self._object_lock:
+            self._session_change_listeners.append(listener)
+
+    def _notify_session_change(self):
+        with self._object_lock:
+            listeners = list(self._session_change_listeners)
+        for listener in listeners:
+            listener(self)
+
     def _format_roles(self, roles):
         if isinstance(roles, str):
             roles = {"system": roles}
@@ -260,11 +289,14 @@ class ClientSession(object):
     def __getstate__(self):
         state = self.__dict__.copy()
         del state["_object_lock"]
+        # Listeners are bound to objects of the local process
+        state["_session_change_listeners"] = []
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         self._object_lock = threading.Lock()
+        self._session_change_listeners = state.get("_session_change_listeners", [])
 
 
 def get_header_values(headers, header):
@@ -295,6 +327,13 @@ def get_roles_values(headers, header):
     ]
 
 
+def _counted_chunks(chunks: Iterable[bytes], sizes: List[int]) -> Iterator[bytes]:
+    """Yields ``chunks``, appending the size of each of them to ``sizes``."""
+    for chunk in chunks:
+        sizes.append(len(chunk))
+        yield chunk
+
+
 @dataclass
 class TrinoStatus:
     id: str
@@ -306,6 +345,11 @@ class TrinoStatus:
     update_count: Optional[int]
     rows: List[Any]
     columns: List[Any]
+    # Whether ``rows`` were already mapped while the response was decoded
+    rows_mapped: bool = False
+    # Size of the response, and of its spooled segments, read from the network and after its decoding
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
 
     def __repr__(self):
         return (
@@ -323,14 +367,18 @@ class TrinoStatus:
 
 class _DelayExponential(object):
     def __init__(
-            self, base=0.1, exponent=2, jitter=True, max_delay=2 * 3600  # 100ms  # 2 hours
-    ):
+            self,
+            base: float = 0.1,  # 100ms
+            exponent: float = 2,
+            jitter: bool = True,
+            max_delay: float = 2 * 3600,  # 2 hours
+    ) -> None:
         self._base = base
         self._exponent = exponent
         self._jitter = jitter
         self._max_delay = max_delay
 
-    def __call__(self, attempt):
+    def __call__(self, attempt: int) -> float:
         delay = float(self._base) * (self._exponent ** attempt)
         if self._jitter:
             delay *= random.random()
@@ -392,7 +440,7 @@ class TrinoRequest(object):
 
     http = requests
 
-    HTTP_EXCEPTIONS = (
+    HTTP_EXCEPTIONS: Tuple[Type[Exception], ...] = (
         http.ConnectionError,
         http.Timeout,
     )
@@ -409,11 +457,69 @@ class TrinoRequest(object):
         request_timeout: Union[float, Tuple[float, float]] = constants.DEFAULT_REQUEST_TIMEOUT,
         handle_retry=_RetryWithExponentialBackoff(),
         verify: bool = True,
+        streaming_decode: bool = False,
+        json_decoder: Optional[Callable[[bytes], Any]] = None,
+        encoding: Optional[Union[str, List[str]]] = None,
+        spooling_max_workers: int = constants.DEFAULT_SPOOLING_MAX_WORKERS,
+        http_compression: Union[None, bool, str, List[str]] = "auto",
     ) -> None:
+        self._init_query_state(
+            host,
+            port,
+            client_session,
+            http_scheme,
+            auth,
+            request_timeout,
+            compression.accept_encoding(http_compression),
+            spooling.supported_encodings(encoding) if encoding is not None else None,
+            streaming_decode,
+            json_decoder,
+        )
+        self._spooling_max_workers = spooling_max_workers
+
+        if http_session is not None:
+            self._http_session = http_session
+        else:
+            self._http_session = self.http.Session()
+            self._http_session.verify = verify
+        self._http_session.headers.update(self.http_headers)
+        # Spooled segments stored outside of the coordinator, e.g. behind pre-signed URLs,
+        # are downloaded without the client credentials
+        self._spooling_session = None
+        if self._encodings is not None:
+            self._spooling_session = self.http.Session()
+            self._spooling_session.verify = self._http_session.verify
+        self._exceptions = self.HTTP_EXCEPTIONS
+        if self._auth:
+            self._auth.set_http_session(self._http_session)
+            self._exceptions += self._auth.get_exceptions()
+
+        self._handle_retry = handle_retry
+        self.max_attempts = max_attempts
+
+    def _init_query_state(
+        self,
+        host: str,
+        port: int,
+        client_session: ClientSession,
+        http_scheme: Optional[str],
+        auth: Optional[Any],
+        request_timeout: Union[float, Tuple[float, float]],
+        accept_encoding: str,
+        encodings: Optional[List[str]],
+        streaming_decode: bool,
+        json_decoder: Optional[Callable[[bytes], Any]],
+    ) -> None:
+        """Set the state read by the protocol methods, e.g. :attr:`http_headers` and :meth:`process`,
+        independently of the HTTP client sending the requests."""
         self._client_session = client_session
         self._host = host
         self._port = port
         self._next_uri: Optional[str] = None
+        # Value of the Accept-Encoding header, see pyavrio.compression
+        self._accept_encoding = accept_encoding
+        # Query data encodings advertised for the spooled protocol, None for inline JSON rows only
+        self._encodings = encodings
 
         if http_scheme is None:
             if self._port == constants.DEFAULT_TLS_PORT:
@@ -423,23 +529,13 @@ class TrinoRequest(object):
         else:
             self._http_scheme = http_scheme
 
-        if http_session is not None:
-            self._http_session = http_session
-        else:
-            self._http_session = self.http.Session()
-            self._http_session.verify = verify
-        self._http_session.headers.update(self.http_headers)
-        self._exceptions = self.HTTP_EXCEPTIONS
         self._auth = auth
-        if self._auth:
-            if self._http_scheme == constants.HTTP:
-                raise ValueError("cannot use authentication with HTTP")
-            self._auth.set_http_session(self._http_session)
-            self._exceptions += self._auth.get_exceptions()
+        if self._auth and self._http_scheme == constants.HTTP:
+            raise ValueError("cannot use authentication with HTTP")
 
         self._request_timeout = request_timeout
-        self._handle_retry = handle_retry
-        self.max_attempts = max_attempts
+        self._streaming_decode = streaming_decode
+        self._json_decoder = json_decoder
 
     @property
     def transaction_id(self):
@@ -458,7 +554,10 @@ class TrinoRequest(object):
         headers[constants.HEADER_SOURCE] = self._client_session.source
         headers[constants.HEADER_TIMEZONE] = self._client_session.timezone
         headers[constants.HEADER_CLIENT_CAPABILITIES] = 'PARAMETRIC_DATETIME'
+        if self._encodings:
+            headers[constants.HEADER_QUERY_DATA_ENCODING] = ",".join(self._encodings)
         headers["user-agent"] = f"{constants.CLIENT_NAME}/{__version__}"
+        headers[constants.HEADER_ACCEPT_ENCODING] = self._accept_encoding
         if len(self._client_session.roles.values()):
             headers[constants.HEADER_ROLE] = ",".join(
                 # ``name`` must not contain ``=``
@@ -512,10 +611,12 @@ class TrinoRequest(object):
     @max_attempts.setter
     def max_attempts(self, value) -> None:
         self._max_attempts = value
+        spooling_get = self._spooling_session.get if self._spooling_session is not None else None
         if value == 1:  # No retry
             self._get = self._http_session.get
             self._post = self._http_session.post
             self._delete = self._http_session.delete
+            self._spooling_get = spooling_get
             return
 
         with_retry = _retry_with(
@@ -531,6 +632,7 @@ class TrinoRequest(object):
         self._get = with_retry(self._http_session.get)
         self._post = with_retry(self._http_session.post)
         self._delete = with_retry(self._http_session.delete)
+        self._spooling_get = with_retry(spooling_get) if spooling_get is not None else None
 
     def get_url(self, path) -> str:
         return "{protocol}://{host}:{port}{path}".format(
@@ -545,6 +647,10 @@ class TrinoRequest(object):
     def next_uri(self) -> Optional[str]:
         return self._next_uri
 
+    @property
+    def json_decoder(self) -> Optional[Callable[[bytes], Any]]:
+        return self._json_decoder
+
     def post(self, sql: str, additional_http_headers: Optional[Dict[str, Any]] = None):
         data = sql.encode("utf-8")
         # Deep copy of the http_headers dict since they may be modified for this
@@ -560,6 +666,7 @@ class TrinoRequest(object):
             headers=http_headers,
             timeout=self._request_timeout,
             proxies=PROXIES,
+            **self._stream_kwargs,
         )
         return http_response
 
@@ -569,11 +676,59 @@ class TrinoRequest(object):
             headers=self.http_headers,
             timeout=self._request_timeout,
             proxies=PROXIES,
+            **self._stream_kwargs,
         )
 
+    @property
+    def _stream_kwargs(self) -> Dict[str, Any]:
+        # The body is only read by process() when decoding it incrementally
+        return {"stream": True} if self._streaming_decode else {}
+
     def delete(self, url):
         return self._delete(url, timeout=self._request_timeout, proxies=PROXIES)
 
+    def _get_spooled(self, uri: str, headers: Dict[str, str]):
+        if urllib.parse.urlparse(uri).hostname == self._host:
+            # Segments served by the coordinator need the client credentials
+            return self._get(uri, headers={**self.http_headers, **headers}, timeout=self._request_timeout,
+                             proxies=PROXIES)
+        return self._spooling_get(uri, headers=headers, timeout=self._request_timeout, proxies=PROXIES)
+
+    @property
+    def accept_encoding(self) -> str:
+        return self._accept_encoding
+
+    @staticmethod
+    def _segment_headers(segment: Dict[str, Any]) -> Dict[str, str]:
+        """Headers the segment must be downloaded and acknowledged with, e.g. for server side encryption."""
+        return {name: ", ".join(values) for name, values in (segment.get("headers") or {}).items()}
+
+    def _download_segment(self, segment: Dict[str, Any], sizes: Optional[List[Tuple[int, int]]] = None) -> bytes:
+        http_response = self._get_spooled(segment["uri"], self._segment_headers(segment))
+        if not http_response.ok:
+            self.raise_response_error(http_response)
+        if sizes is not None:
+            sizes.append(compression.response_sizes(http_response))
+        return http_response.content
+
+    def _acknowledge_segment(self, segment: Dict[str, Any]) -> None:
+        ack_uri = segment.get("ackUri")
+        if ack_uri is None:
+            return
+        http_response = self._get_spooled(ack_uri, self._segment_headers(segment))
+        if not http_response.ok:
+            self.raise_response_error(http_response)
+
+    def _decode_segments(self, data: Dict[str, Any], sizes: List[Tuple[int, int]]) -> List[List[Any]]:
+        """Rows of the segments of a spooled protocol response, see :mod:`pyavrio.spooling`."""
+        return spooling.decode_segments(
+            data,
+            functools.partial(self._download_segment, sizes=sizes),
+            self._acknowledge_segment,
+            decoder=self._json_decoder,
+            max_workers=self._spooling_max_workers,
+        )
+
     def _process_error(self, error, query_id):
         error_type = error["errorType"]
         if error_type == "EXTERNAL":
@@ -583,7 +738,7 @@ class TrinoRequest(object):
 
         return exceptions.TrinoQueryError(error, query_id)
 
-    def raise_response_error(self, http_response):
+    def raise_response_error(self, http_response: Any) -> None:
         if http_response.status_code == 502:
             raise exceptions.Http502Error("error 502: bad gateway")
 
@@ -600,13 +755,35 @@ class TrinoRequest(object):
             )
         )
 
-    def process(self, http_response) -> TrinoStatus:
+    def process(self, http_response, row_mapper_factory=None) -> TrinoStatus:
+        """
+        Process a statement response.
+
+        :param row_mapper_factory: called with the columns of the response, returns the row
+            mapper used to map the rows while the response is decoded incrementally.
+        """
         if not http_response.ok:
             self.raise_response_error(http_response)
 
         http_response.encoding = "utf-8"
-        response = http_response.json()
-        logger.debug("HTTP %s: %s", http_response.status_code, response)
+        rows_mapped = False
+        if self._streaming_decode:
+            chunk_sizes: List[int] = []
+            try:
+                response, rows_mapped = json_codec.decode_streaming(
+                    _counted_chunks(
+                        http_response.iter_content(chunk_size=constants.STREAMING_DECODE_CHUNK_SIZE), chunk_sizes,
+                    ),
+                    functools.partial(self._streaming_row_mapping, row_mapper_factory),
+                )
+            finally:
+                http_response.close()
+            wire_bytes, decoded_bytes = compression.response_sizes(http_response, decoded_bytes=sum(chunk_sizes))
+            logger.debug("HTTP %s: %s rows", http_response.status_code, len(response.get("data", [])))
+        else:
+            response = json_codec.decode_response(http_response, self._json_decoder)
+            wire_bytes, decoded_bytes = compression.response_sizes(http_response)
+            logger.debug("HTTP %s: %s", http_response.status_code, response)
         if "error" in response:
             raise self._process_error(response["error"], response.get("id"))
 
@@ -648,6 +825,13 @@ class TrinoRequest(object):
 
         self._next_uri = response.get("nextUri")
 
+        rows = response.get("data", [])
+        if isinstance(rows, dict):
+            segment_sizes: List[Tuple[int, int]] = []
+            rows = self._decode_segments(rows, segment_sizes)
+            wire_bytes += sum(size[0] for size in segment_sizes)
+            decoded_bytes += sum(size[1] for size in segment_sizes)
+
         return TrinoStatus(
             id=response["id"],
             stats=response["stats"],
@@ -656,10 +840,22 @@ class TrinoRequest(object):
             next_uri=self._next_uri,
             update_type=response.get("updateType"),
             update_count=response.get("updateCount"),
-            rows=response.get("data", []),
+            rows=rows,
             columns=response.get("columns"),
+            rows_mapped=rows_mapped,
+            wire_bytes=wire_bytes,
+            decoded_bytes=decoded_bytes,
         )
 
+    @staticmethod
+    def _streaming_row_mapping(row_mapper_factory, response):
+        if row_mapper_factory is None:
+            return None
+        row_mapper = row_mapper_factory(response.get("columns"))
+        if row_mapper is None:
+            return None
+        return lambda row: row_mapper.map([row])[0]
+
     def _verify_extra_credential(self, header):
         """
         Verifies that key has ASCII only and non-whitespace characters.
@@ -675,19 +871,65 @@ class TrinoRequest(object):
             raise ValueError(f"only ASCII characters are allowed in extra credential '{key}'")
 
 
+class _PagePrefetcher(threading.Thread):
+    """Fetches and maps the next pages of a query in the background into a bounded queue."""
+
+    def __init__(self, query, max_pages: int):
+        super().__init__(name="pyavrio-prefetch-{}".format(query.query_id), daemon=True)
+        self._query = query
+        self._pages: queue.Queue = queue.Queue(maxsize=max_pages)
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._query.finished and not self._query.cancelled and not self._stopped.is_set():
+                self._put(("rows", self._query.fetch()))
+        except BaseException as err:
+            self._put(("error", err))
+        self._put(("done", None))
+
+    def _put(self, item):
+        # Poll so a consumer that stopped early does not leave the thread blocked on a full queue
+        while not self._stopped.is_set():
+            try:
+                self._pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def pages(self):
+        while True:
+            kind, value = self._pages.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+
+    def stop(self):
+        self._stopped.set()
+
+
 class TrinoResult(object):
     """
     Represent the result of a Trino query as an iterator on rows.
 
     This class implements the iterator protocol as a generator type
     https://docs.python.org/3/library/stdtypes.html#generator-types
+
+    With ``prefetch_pages`` set, up to that many next pages are fetched and mapped by a
+    background thread while the current page is consumed. A result closed, or whose
+    iterator is closed or garbage collected, before its last page stops prefetching
+    and cancels the query.
     """
 
-    def __init__(self, query, rows: List[Any]):
+    def __init__(self, query, rows: List[Any], prefetch_pages: int = 0):
         self._query = query
         # Initial rows from the first POST request
         self._rows = rows
         self._rownumber = 0
+        self._prefetch_pages = prefetch_pages
+        self._prefetcher: Optional[_PagePrefetcher] = None
 
     @property
     def rows(self):
@@ -701,18 +943,85 @@ class TrinoResult(object):
     def rownumber(self) -> int:
         return self._rownumber
 
+    @property
+    def lazy_rows(self) -> bool:
+        """Whether rows are :class:`LazyRow` objects converting their values on first access."""
+        return self._query.lazy_rows
+
     def __iter__(self):
+        pages = self._pages()
+        try:
+            for rows in pages:
+                for row in rows:
+                    self._rownumber += 1
+                    logger.debug("row %s", row)
+                    yield row
+        finally:
+            # Also reached when the consumer closes the generator before the last page
+            pages.close()
+
+    def iter_pages(self, raw: bool = False):
+        """
+        Iterate over the result page by page, each page being the list of rows returned by one request.
+
+        Pages are an alternative to iterating over the rows of the result, they cannot be
+        iterated once rows were read.
+
+        :param raw: whether rows hold the values as returned by Trino, without converting
+            them to Python objects, e.g. to build typed columns from them.
+        """
+        if self._rownumber:
+            raise exceptions.ProgrammingError("Result pages cannot be iterated after rows were read")
+        if raw and self._query._map_rows:
+            raise exceptions.ProgrammingError("Raw result pages cannot be iterated after rows were converted")
+        for rows in self._pages(raw):
+            self._rownumber += len(rows)
+            yield rows
+
+    def _pages(self, raw: bool = False):
+        if not raw:
+            # The rows received by execute are converted when the result is read
+            self._rows = self._query._start_mapping_rows(self._rows)
+        if self._prefetch_pages > 0 and not self._query.finished:
+            yield from self._prefetched_pages()
+            return
         # A query only transitions to a FINISHED state when the results are fully consumed:
         # The reception of the data is acknowledged by calling the next_uri before exposing the data through dbapi.
         while not self._query.finished or self._rows is not None:
             next_rows = self._query.fetch() if not self._query.finished else None
-            for row in self._rows:
-                self._rownumber += 1
-                logger.debug("row %s", row)
-                yield row
-
+            yield self._rows
             self._rows = next_rows
 
+    def _prefetched_pages(self):
+        prefetcher = self._prefetcher = _PagePrefetcher(self._query, self._prefetch_pages)
+        prefetcher.start()
+        try:
+            yield self._rows
+            for rows in prefetcher.pages():
+                self._rows = rows
+                yield rows
+            self._rows = None
+        except GeneratorExit:
+            # The consumer stopped reading before the last page
+            self._close_abandoned()
+            raise
+        finally:
+            prefetcher.stop()
+
+    def close(self) -> None:
+        """Stop prefetching pages and cancel the query if its result was not fully fetched."""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+        if not self._query.finished and not self._query.cancelled:
+            self._query.cancel()
+
+    def _close_abandoned(self) -> None:
+        try:
+            self.close()
+        except Exception as e:
+            # Also reached while the iterator is garbage collected, where errors can not be raised
+            logger.warning("Failed to cancel query %s: %s", self._query.query_id, e)
+
 
 class TrinoQuery(object):
     """Represent the execution of a SQL statement by Trino."""
@@ -722,6 +1031,12 @@ class TrinoQuery(object):
             request: TrinoRequest,
             query: str,
             legacy_primitive_types: bool = False,
+            modified_query_cache: Optional[Any] = None,
+            metadata_query_cache: Optional[Any] = None,
+            modified_query: Optional[str] = None,
+            prefetch_pages: int = 0,
+            json_decoder: Optional[Callable[[bytes], Any]] = None,
+            lazy_rows: bool = False,
     ) -> None:
         self._query_id: Optional[str] = None
         self._stats: Dict[Any, Any] = {}
@@ -733,13 +1048,32 @@ class TrinoQuery(object):
         self._request = request
         self._update_type = None
         self._update_count = None
-        self._next_uri = None
+        self._next_uri: Optional[str] = None
         self._query = query
         self._result: Optional[TrinoResult] = None
         self._legacy_primitive_types = legacy_primitive_types
         self._row_mapper: Optional[RowMapper] = None
-        self._avrio_http_handler = AvrioHTTPHandler("https://"+request._host, self._request._client_session.access_token)
+        self._json_decoder = json_decoder
+        self._avrio_http_handler = AvrioHTTPHandler(
+            "https://" + request._host,
+            self._request._client_session.access_token,
+            json_decoder=json_decoder,
+            accept_encoding=getattr(request, "accept_encoding", None),
+        )
         self._query_parser = QueryParser()
+        self._modified_query_cache = modified_query_cache
+        self._metadata_query_cache = metadata_query_cache
+        self._normalized_query_text: Optional[str] = None
+        # Already rewritten statement, e.g. a bound query template, sent without calling getModifiedQuery
+        self._modified_query = modified_query
+        self._prefetch_pages = prefetch_pages
+        # Keep the decoded values of result rows and convert them when first read
+        self._lazy_rows = lazy_rows
+        # Rows are kept as returned by Trino until the result is read, as rows converted by the row
+        # mapper or as pages of raw values, see TrinoResult.iter_pages
+        self._map_rows = False
+        # Serializes fetch and cancel, which may be called from a prefetch thread
+        self._fetch_lock = threading.Lock()
 
     @property
     def query_id(self) -> Optional[str]:
@@ -762,6 +1096,10 @@ class TrinoQuery(object):
     def stats(self):
         return self._stats
 
+    @property
+    def lazy_rows(self) -> bool:
+        return self._lazy_rows
+
     @property
     def update_type(self):
         return self._update_type
@@ -782,7 +1120,7 @@ class TrinoQuery(object):
     def info_uri(self):
         return self._info_uri
 
-    def trinoResult(self, columns_metadata, rows):
+    def trinoResult(self, columns_metadata: List[str], rows: List[Any]) -> TrinoResult:
         columns = []
         for col_name in columns_metadata:
             column = {
@@ -814,7 +1152,7 @@ class TrinoQuery(object):
             )
         self._update_state(status)
         self._finished= True
-        rows = self._row_mapper.map(status.rows) if self._row_mapper else status.rows
+        rows = self._page_rows(status)
         self._result = TrinoResult(self, rows)
         return self._result
 
@@ -830,99 +1168,230 @@ class TrinoQuery(object):
 
         try:
             session = self._request._client_session
-            is_capability_query = self._query_parser.parse_query(self._query, session.platform)
-            if not is_capability_query:
-                self._query = self._query_parser.remove_schema_from_query(self._query, session.platform)
-                modified_response = self._avrio_http_handler._get_modified_query(session.user, self._query,session.access_token, session.catalog)
-                if not modified_response.ok:
-                    self._request.raise_response_error(modified_response)
-
-                data = modified_response.json()
-
-                # Check if isMetadataQuery is false
-                if not data.get("isMetadataQuery"):
-                    final_modified_sql = data.get("finalModifiedSQL")
-                    modified_avrio_query = final_modified_sql
-                else:
-                    resp = data["trinoResultSet"]
-                    result = resp["allRowsData"]
-                    column_metadata = resp["columnMetaData"]
-                    return self.trinoResult(column_metadata, result)
-            else:
+            if self._modified_query is not None:
+                modified_avrio_query = self._modified_query
+            elif self._query_parser.parse_query(self._query, session.platform):
                 modified_avrio_query = self._query
-                
+            else:
+                metadata_cache_key = self._metadata_query_cache_key(session)
+                metadata_result = self._cached_metadata_result(metadata_cache_key)
+                if metadata_result is None:
+                    modified_avrio_query, metadata_result = self._rewrite_query(session)
+                    self._cache_metadata_result(metadata_cache_key, metadata_result)
+                if metadata_result is not None:
+                    return self.trinoResult(*metadata_result)
+
             response = self._request.post(modified_avrio_query, additional_http_headers)
 
         except requests.exceptions.RequestException as e:
             raise pyavrio.exceptions.TrinoConnectionError("failed to execute: {}".format(e))
-        status = self._request.process(response)
-        self._info_uri = status.info_uri
-        self._query_id = status.id
-        self._stats.update({"queryId": self.query_id})
-        self._update_state(status)
-        self._warnings = getattr(status, "warnings", [])
-        if status.next_uri is None:
-            self._finished = True
-
-        rows = self._row_mapper.map(status.rows) if self._row_mapper else status.rows
-        self._result = TrinoResult(self, rows)
+        status = self._request.process(response, row_mapper_factory=self._streaming_row_mapper)
+        rows = self._update_submitted(status)
+        self._result = TrinoResult(self, rows, prefetch_pages=self._prefetch_pages)
         # Execute should block until at least one row is received or query is finished or cancelled
         while not self.finished and not self.cancelled and len(self._result.rows) == 0:
             self._result.rows += self.fetch()
         return self._result
+
+    def rewrite(self) -> Optional[str]:
+        """Rewrite the statement through ``getModifiedQuery`` without executing it.
+
+        Returns the statement to send to Trino, or ``None`` when the rewrite service
+        answers the statement itself as a metadata query.
+        """
+        session = self._request._client_session
+        if self._query_parser.parse_query(self._query, session.platform):
+            return self._query
+        try:
+            modified_avrio_query, metadata_result = self._rewrite_query(session)
+        except requests.exceptions.RequestException as e:
+            raise pyavrio.exceptions.TrinoConnectionError("failed to rewrite: {}".format(e))
+        return modified_avrio_query if metadata_result is None else None
+
+    def _rewrite_query(self, session):
+        """Returns the rewritten statement and ``None``, or ``None`` and the
+        ``(columnMetaData, allRowsData)`` result set of a metadata query."""
+        cache_key, modified_avrio_query = self._cached_rewrite(session)
+        if modified_avrio_query is not None:
+            return modified_avrio_query, None
+
+        access_token = session.access_token
+        modified_response = self._avrio_http_handler._get_modified_query(
+            session.user, self._query, access_token, session.catalog)
+        auth = getattr(self._request, "_auth", None)
+        if (modified_response.status_code == 401 and isinstance(auth, AvrioAuthentication)
+                and auth.refresh(access_token)):
+            modified_response = self._avrio_http_handler._get_modified_query(
+                session.user, self._query, session.access_token, session.catalog)
+        return self._process_rewrite(modified_response, cache_key)
+
+    def _cached_rewrite(self, session: ClientSession) -> Tuple[Optional[Tuple[Any, ...]], Optional[str]]:
+        """Returns the cache key of the rewrite of this query and the cached rewritten
+        statement, ``None`` when it is not cached."""
+        cache_key = self._modified_query_cache_key(session)
+        cached = self._modified_query_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            self._query, modified_avrio_query = cached
+            return cache_key, modified_avrio_query
+
+        self._query = self._query_parser.remove_schema_from_query(self._query, session.platform)
+        return cache_key, None
+
+    def _process_rewrite(
+            self, modified_response: Any, cache_key: Optional[Tuple[Any, ...]]
+    ) -> Tuple[Optional[str], Optional[Tuple[List[str], List[Any]]]]:
+        """Returns the rewritten statement and ``None``, or ``None`` and the metadata
+        query result set, from a ``getModifiedQuery`` response."""
+        if not modified_response.ok:
+            self._request.raise_response_error(modified_response)
+
+        data = json_codec.decode_response(modified_response, self._json_decoder)
+        self._add_transfer_sizes(*compression.response_sizes(modified_response))
+
+        # Check if isMetadataQuery is false
+        if not data.get("isMetadataQuery"):
+            final_modified_sql = data.get("finalModifiedSQL")
+            if cache_key is not None and final_modified_sql:
+                self._modified_query_cache.put(cache_key, (self._query, final_modified_sql))
+            return final_modified_sql, None
+
+        resp = data["trinoResultSet"]
+        return None, (resp["columnMetaData"], resp["allRowsData"])
+
+    def _cached_metadata_result(
+            self, cache_key: Optional[Tuple[Any, ...]]
+    ) -> Optional[Tuple[List[str], List[Any]]]:
+        """The ``(columnMetaData, allRowsData)`` result set cached for ``cache_key``, ``None`` if not cached."""
+        cached_result = self._metadata_query_cache.get(cache_key) if cache_key is not None else None
+        if cached_result is None:
+            return None
+        column_metadata, result = cached_result
+        return column_metadata, [list(row) for row in result]
+
+    def _cache_metadata_result(self, cache_key, metadata_result) -> None:
+        if cache_key is None or metadata_result is None:
+            return
+        column_metadata, result = metadata_result
+        self._metadata_query_cache.put(cache_key, (column_metadata, [tuple(row) for row in result]))
+
+    def _modified_query_cache_key(self, session: ClientSession) -> Optional[Tuple[Any, ...]]:
+        """Key of the ``getModifiedQuery`` rewrite of this query, ``None`` when rewrites are not cached."""
+        if self._modified_query_cache is None:
+            return None
+        return (
+            session.user,
+            session.catalog,
+            session.platform,
+            self._normalized_query(),
+        )
+
+    def _metadata_query_cache_key(self, session: ClientSession) -> Optional[Tuple[Any, ...]]:
+        """Key of the metadata result set of this query, ``None`` when metadata results are not cached."""
+        if self._metadata_query_cache is None:
+            return None
+        return (
+            session.user,
+            session.catalog,
+            session.schema,
+            session.platform,
+            self._normalized_query(),
+        )
+
+    def _normalized_query(self):
+        if self._normalized_query_text is None:
+            self._normalized_query_text = self._query_parser.normalize_query(self._query)
+        return self._normalized_query_text
     
     def split_query(self, actualQuery):
-        pattern = re.compile(r'(Prepare .*?FROM)(.*SELECT.*)', re.IGNORECASE | re.DOTALL)
-        
-        match = pattern.match(actualQuery)
-        
-        if match:
-            part1 = match.group(1)
-            part2 = match.group(2)
-            return part1, part2
-        else:
-            return None, actualQuery
-    
+        return self._query_parser.split_prepare_query(actualQuery)
+
     def is_show_query(self, query):
-        show_pattern = re.compile(r'\bSHOW\b', re.IGNORECASE)
-        return bool(show_pattern.search(query))
+        return self._query_parser.is_show_query(query)
+
+    def _streaming_row_mapper(self, columns):
+        """Row mapper for the rows of a response decoded incrementally, created from its columns."""
+        if not self._row_mapper and columns:
+            self._row_mapper = RowMapperFactory().create(columns=columns,
+                                                         legacy_primitive_types=self._legacy_primitive_types,
+                                                         lazy_rows=self._lazy_rows)
+        return self._row_mapper if self._map_rows else None
+
+    def _add_transfer_sizes(self, wire_bytes: int, decoded_bytes: int) -> None:
+        """Count the bytes of a response read from the network and after its decoding in ``stats``."""
+        self._stats["wireBytes"] = self._stats.get("wireBytes", 0) + wire_bytes
+        self._stats["decodedBytes"] = self._stats.get("decodedBytes", 0) + decoded_bytes
 
     def _update_state(self, status):
         self._stats.update(status.stats)
+        self._add_transfer_sizes(status.wire_bytes, status.decoded_bytes)
         self._update_type = status.update_type
         self._update_count = status.update_count
         self._next_uri = status.next_uri
         if not self._row_mapper and status.columns:
             self._row_mapper = RowMapperFactory().create(columns=status.columns,
-                                                         legacy_primitive_types=self._legacy_primitive_types)
+                                                         legacy_primitive_types=self._legacy_primitive_types,
+                                                         lazy_rows=self._lazy_rows)
         if status.columns:
             self._columns = status.columns
 
-    def fetch(self) -> List[List[Any]]:
-        """Continue fetching data for the current query_id"""
-        try:
-            response = self._request.get(self._request.next_uri)
-        except requests.exceptions.RequestException as e:
-            raise pyavrio.exceptions.TrinoConnectionError("failed to fetch: {}".format(e))
-        status = self._request.process(response)
+    def _update_submitted(self, status) -> List[Any]:
+        """Update the state from the response to the statement, returns its rows."""
+        self._info_uri = status.info_uri
+        self._query_id = status.id
+        self._stats.update({"queryId": self.query_id})
+        self._update_state(status)
+        self._warnings = getattr(status, "warnings", [])
+        if status.next_uri is None:
+            self._finished = True
+        return self._page_rows(status)
+
+    def _update_fetched(self, status) -> None:
         self._update_state(status)
         logger.debug(status)
         if status.next_uri is None:
             self._finished = True
 
+    def _fetched_rows(self, status) -> List[Any]:
         if not self._row_mapper:
             return []
+        return self._page_rows(status)
 
+    def _page_rows(self, status) -> List[Any]:
+        if status.rows_mapped or not self._map_rows or not self._row_mapper:
+            return status.rows
         return self._row_mapper.map(status.rows)
 
+    def _start_mapping_rows(self, rows: Optional[List[Any]]) -> Optional[List[Any]]:
+        """Map the rows of the pages fetched from now on, returns ``rows`` received before mapped."""
+        if self._map_rows:
+            return rows
+        self._map_rows = True
+        if not rows or not self._row_mapper:
+            return rows
+        return self._row_mapper.map(rows)
+
+    def fetch(self) -> List[List[Any]]:
+        """Continue fetching data for the current query_id"""
+        with self._fetch_lock:
+            try:
+                response = self._request.get(self._request.next_uri)
+            except requests.exceptions.RequestException as e:
+                raise pyavrio.exceptions.TrinoConnectionError("failed to fetch: {}".format(e))
+            status = self._request.process(response, row_mapper_factory=self._streaming_row_mapper)
+            self._update_fetched(status)
+        return self._fetched_rows(status)
+
     def cancel(self) -> None:
         """Cancel the current query"""
-        if self._next_uri is None:
+        # Not serialized with fetch on purpose: the DELETE must not wait for a GET of the
+        # next page in flight, and any next URI of the query cancels it.
+        next_uri = self._next_uri
+        if next_uri is None:
             return
 
         logger.debug("cancelling query: %s", self.query_id)
         try:
-            response = self._request.delete(self._next_uri)
+            response = self._request.delete(next_uri)
         except requests.exceptions.RequestException as e:
             raise pyavrio.exceptions.TrinoConnectionError("failed to cancel query: {}".format(e))
         logger.debug(response)
@@ -1007,6 +1476,7 @@ class DoubleValueMapper(ValueMapper[float]):
         return float(value)
 
 
+@functools.lru_cache(maxsize=256)
 def _create_tzinfo(timezone_str: str) -> tzinfo:
     if timezone_str.startswith("+") or timezone_str.startswith("-"):
         hours = timezone_str[1:3]
@@ -1022,6 +1492,19 @@ def _fraction_to_decimal(fractional_str: str) -> Decimal:
     return Decimal(fractional_str or 0) / POWERS_OF_TEN[len(fractional_str)]
 
 
+def _fraction_to_microseconds(fractional_str: str, precision: int) -> Optional[int]:
+    """
+    Microseconds of a fraction of a second which needs no rounding to ``precision``,
+    ``None`` if it has to be rounded with the ``Decimal`` arithmetic of :class:`TemporalType`.
+    """
+    digits = len(fractional_str)
+    if digits == 0:
+        return 0
+    if digits > precision or digits > MAX_PYTHON_TEMPORAL_PRECISION_POWER or not fractional_str.isdecimal():
+        return None
+    return int(fractional_str) * 10 ** (MAX_PYTHON_TEMPORAL_PRECISION_POWER - digits)
+
+
 class TemporalType(Generic[PythonTemporalType], metaclass=abc.ABCMeta):
     def __init__(self, whole_python_temporal_value: PythonTemporalType, remaining_fractional_seconds: Decimal):
         self._whole_python_temporal_value = whole_python_temporal_value
@@ -1124,6 +1607,9 @@ class TimeValueMapper(ValueMapper[time]):
             return None
         whole_python_temporal_value = value[:self.time_default_size]
         remaining_fractional_seconds = value[self.time_default_size + 1:]
+        microseconds = _fraction_to_microseconds(remaining_fractional_seconds, self.precision)
+        if microseconds is not None:
+            return time.fromisoformat(whole_python_temporal_value).replace(microsecond=microseconds)
         return Time(
             time.fromisoformat(whole_python_temporal_value),
             _fraction_to_decimal(remaining_fractional_seconds)
@@ -1140,6 +1626,10 @@ class TimeWithTimeZoneValueMapper(TimeValueMapper):
         whole_python_temporal_value = value[:self.time_default_size]
         remaining_fractional_seconds = value[self.time_default_size + 1:len(value) - 6]
         timezone_part = value[len(value) - 6:]
+        microseconds = _fraction_to_microseconds(remaining_fractional_seconds, self.precision)
+        if microseconds is not None:
+            return time.fromisoformat(whole_python_temporal_value).replace(
+                microsecond=microseconds, tzinfo=_create_tzinfo(timezone_part))
         return TimeWithTimeZone(
             time.fromisoformat(whole_python_temporal_value).replace(tzinfo=_create_tzinfo(timezone_part)),
             _fraction_to_decimal(remaining_fractional_seconds),
@@ -1163,6 +1653,9 @@ class TimestampValueMapper(ValueMapper[datetime]):
             return None
         whole_python_temporal_value = value[:self.datetime_default_size]
         remaining_fractional_seconds = value[self.datetime_default_size + 1:]
+        microseconds = _fraction_to_microseconds(remaining_fractional_seconds, self.precision)
+        if microseconds is not None:
+            return datetime.fromisoformat(whole_python_temporal_value).replace(microsecond=microseconds)
         return Timestamp(
             datetime.fromisoformat(whole_python_temporal_value),
             _fraction_to_decimal(remaining_fractional_seconds),
@@ -1176,6 +1669,10 @@ class TimestampWithTimeZoneValueMapper(TimestampValueMapper):
         datetime_with_fraction, timezone_part = value.rsplit(' ', 1)
         whole_python_temporal_value = datetime_with_fraction[:self.datetime_default_size]
         remaining_fractional_seconds = datetime_with_fraction[self.datetime_default_size + 1:]
+        microseconds = _fraction_to_microseconds(remaining_fractional_seconds, self.precision)
+        if microseconds is not None:
+            return datetime.fromisoformat(whole_python_temporal_value).replace(
+                microsecond=microseconds, tzinfo=_create_tzinfo(timezone_part))
         return TimestampWithTimeZone(
             datetime.fromisoformat(whole_python_temporal_value).replace(tzinfo=_create_tzinfo(timezone_part)),
             _fraction_to_decimal(remaining_fractional_seconds),
@@ -1200,31 +1697,66 @@ class ArrayValueMapper(ValueMapper[List[Optional[Any]]]):
 
 
 class NamedRowTuple(tuple):
-    """Custom tuple class as namedtuple doesn't support missing or duplicate names"""
+    """
+    Custom tuple class as namedtuple doesn't support missing or duplicate names
+
+    ``NamedRowTuple(values, names, types)`` returns an instance of a subclass generated
+    once per row type, see :func:`_named_row_tuple_class`. Fields are read through
+    properties of that subclass and the repr is only formatted when requested.
+    """
+    __slots__ = ()
+
+    _names: List[Optional[str]] = []
+    _types: List[str] = []
+    _name_counts: Dict[str, int] = {}
+    _ambiguous_names: frozenset = frozenset()
+
     def __new__(cls, values, names: List[str], types: List[str]):
+        if cls is NamedRowTuple:
+            cls = _named_row_tuple_class(tuple(names), tuple(types))
         return super().__new__(cls, values)
 
-    def __init__(self, values, names: List[str], types: List[str]):
-        self._names = names
-        # With names and types users can retrieve the name and Trino data type of a row
-        self.__annotations__ = dict()
-        self.__annotations__["names"] = names
-        self.__annotations__["types"] = types
-        elements: List[Any] = []
-        for name, value in zip(names, values):
-            if names.count(name) == 1:
-                setattr(self, name, value)
-                elements.append(f"{name}: {repr(value)}")
-            else:
-                elements.append(repr(value))
-        self._repr = "(" + ", ".join(elements) + ")"
-
     def __getattr__(self, name):
-        if self._names.count(name):
+        if name in self._ambiguous_names:
             raise ValueError("Ambiguous row field reference: " + name)
 
     def __repr__(self):
-        return self._repr
+        counts = self._name_counts
+        return "(" + ", ".join(
+            f"{name}: {repr(value)}" if counts.get(name) == 1 else repr(value)
+            for name, value in zip(self._names, self)
+        ) + ")"
+
+    def __reduce__(self):
+        return NamedRowTuple, (tuple(self), self._names, self._types)
+
+
+# Attributes of the generated classes which must not be shadowed by field accessors
+_NAMED_ROW_TUPLE_RESERVED_NAMES = frozenset({"_names", "_types", "_name_counts", "_ambiguous_names"})
+
+
+@functools.lru_cache(maxsize=256)
+def _named_row_tuple_class(names: Tuple[Optional[str], ...], types: Tuple[str, ...]) -> type:
+    """Generates the :class:`NamedRowTuple` subclass of a row type, with one property per unique field name."""
+    # Unnamed fields are only reachable by index
+    name_counts: Dict[str, int] = {}
+    for name in names:
+        if name is not None:
+            name_counts[name] = name_counts.get(name, 0) + 1
+    namespace: Dict[str, Any] = {
+        "__slots__": (),
+        "_names": list(names),
+        "_types": list(types),
+        "_name_counts": name_counts,
+        "_ambiguous_names": frozenset(name for name, count in name_counts.items() if count > 1),
+        # With names and types users can retrieve the name and Trino data type of a row
+        "__annotations__": {"names": list(names), "types": list(types)},
+    }
+    for index, name in enumerate(names):
+        if name_counts.get(name) == 1 and not (
+                name.startswith("__") or name in _NAMED_ROW_TUPLE_RESERVED_NAMES):
+            namespace[name] = property(operator.itemgetter(index))
+    return type("NamedRowTuple", (NamedRowTuple,), namespace)
 
 
 class RowValueMapper(ValueMapper[Tuple[Optional[Any], ...]]):
@@ -1232,14 +1764,14 @@ class RowValueMapper(ValueMapper[Tuple[Optional[Any], ...]]):
         self.mappers = mappers
         self.names = names
         self.types = types
+        self.row_class = _named_row_tuple_class(tuple(names), tuple(types))
 
     def map(self, values: List[Any]) -> Optional[Tuple[Optional[Any], ...]]:
         if values is None:
             return None
-        return NamedRowTuple(
-            list(self.mappers[index].map(value) for index, value in enumerate(values)),
-            self.names,
-            self.types
+        return tuple.__new__(
+            self.row_class,
+            [mapper.map(value) for mapper, value in zip(self.mappers, values)],
         )
 
 
@@ -1281,13 +1813,41 @@ class RowMapperFactory:
     """
     NO_OP_ROW_MAPPER = NoOpRowMapper()
 
-    def create(self, columns, legacy_primitive_types):
+    # Row mappers are shared by all queries returning the same column types
+    _ROW_MAPPER_CACHE_SIZE = 256
+    _row_mappers: "OrderedDict[Tuple[str, ...], RowMapper]" = OrderedDict()
+    _row_mappers_lock = threading.Lock()
+
+    def create(self, columns, legacy_primitive_types, lazy_rows: bool = False):
         assert columns is not None
 
         if not legacy_primitive_types:
-            return RowMapper([self._create_value_mapper(column['typeSignature']) for column in columns])
+            row_mapper = self._get_compiled_row_mapper(columns)
+            if lazy_rows:
+                return LazyRowMapper(row_mapper.columns)
+            return row_mapper
         return RowMapperFactory.NO_OP_ROW_MAPPER
 
+    def _get_compiled_row_mapper(self, columns) -> CompiledRowMapper:
+        key = tuple(json.dumps(column['typeSignature'], sort_keys=True) for column in columns)
+        with RowMapperFactory._row_mappers_lock:
+            row_mapper = RowMapperFactory._row_mappers.get(key)
+            if row_mapper is not None:
+                RowMapperFactory._row_mappers.move_to_end(key)
+                return row_mapper
+        row_mapper = CompiledRowMapper([self._create_value_mapper(column['typeSignature']) for column in columns])
+        with RowMapperFactory._row_mappers_lock:
+            RowMapperFactory._row_mappers[key] = row_mapper
+            if len(RowMapperFactory._row_mappers) > RowMapperFactory._ROW_MAPPER_CACHE_SIZE:
+                RowMapperFactory._row_mappers.popitem(last=False)
+        return row_mapper
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop the row mappers cached for previously seen column types."""
+        with cls._row_mappers_lock:
+            cls._row_mappers.clear()
+
     def _create_value_mapper(self, column) -> ValueMapper:
         col_type = column['rawType']
 
@@ -1356,3 +1916,113 @@ class RowMapper:
         except ValueError as e:
             error_str = f"Could not convert '{value}' into the associated python type"
             raise pyavrio.exceptions.TrinoDataError(error_str) from e
+
+
+class CompiledRowMapper(RowMapper):
+    """
+    Maps rows in place with a function generated for the column types.
+
+    Columns mapped by a :class:`NoOpValueMapper` are skipped. Conversion errors are
+    reported the same way as by :class:`RowMapper`.
+    """
+    def __init__(self, columns):
+        super().__init__(columns)
+        self._convert_rows = self._compile(columns)
+
+    def map(self, rows):
+        if self._convert_rows is None:
+            return rows
+        return self._convert_rows(rows, self._map_row)
+
+    @staticmethod
+    def _compile(columns):
+        indexes = [index for index, mapper in enumerate(columns) if not isinstance(mapper, NoOpValueMapper)]
+        if not indexes:
+            return None
+        namespace = {f"map_{index}": columns[index].map for index in indexes}
+        targets = ", ".join(f"row[{index}]" for index in indexes)
+        values = ", ".join(f"map_{index}(row[{index}])" for index in indexes)
+        # The row is only assigned once all its values are converted, so a row failing
+        # to convert is left untouched and mapped again to report the failing value
+        source = (
+            "def convert_rows(rows, map_row):\n"
+            "    for row in rows:\n"
+            "        try:\n"
+            f"            {targets}, = {values},\n"
+            "        except ValueError:\n"
+            "            map_row(row)\n"
+            "            raise\n"
+            "    return rows\n"
+        )
+        exec(compile(source, "<pyavrio row mapper>", "exec"), namespace)
+        return namespace["convert_rows"]
+
+
+class LazyRowMapper(RowMapper):
+    """
+    Wraps rows into :class:`LazyRow` objects instead of converting their values.
+
+    Used when ``lazy_rows`` is enabled, so only the columns which are read are converted.
+    """
+    def __init__(self, columns):
+        super().__init__(columns)
+        # Columns which need no conversion are returned as decoded
+        self.lazy_columns = [None if isinstance(mapper, NoOpValueMapper) else mapper for mapper in columns]
+
+    def map(self, rows):
+        return [LazyRow(row, self) for row in rows]
+
+
+class LazyRow(Sequence):
+    """
+    Row of a result converting the value of a column when it is first read.
+
+    The decoded values are converted by the value mapper of their column on first
+    access and the converted value replaces the decoded one. Conversion errors are
+    raised as :class:`pyavrio.exceptions.TrinoDataError` by the access reading the value.
+    """
+    __slots__ = ("_values", "_row_mapper", "_converted")
+
+    def __init__(self, values: List[Any], row_mapper: LazyRowMapper):
+        self._values = values
+        self._row_mapper = row_mapper
+        # Bit i is set once the value of column i is converted
+        self._converted = 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._values)))]
+        value = self._values[index]
+        mapper = self._row_mapper.lazy_columns[index]
+        if mapper is None:
+            return value
+        if index < 0:
+            index += len(self._values)
+        bit = 1 << index
+        if self._converted & bit:
+            return value
+        value = self._row_mapper._map_value(value, mapper)
+        self._values[index] = value
+        self._converted |= bit
+        return value
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        for index in range(len(self._values)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, LazyRow):
+            other = other.to_list()
+        return self.to_list() == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def to_list(self) -> List[Any]:
+        """Convert all values of the row and return them as a list."""
+        return [self[index] for index in range(len(self._values))]
@@ -0,0 +1,238 @@
+"""
+
+This module converts pages of result rows into NumPy arrays, one per column.
+
+Each column is returned as an array of values and a boolean validity mask which is
+``False`` for NULL values. The dtype of a column is picked from its Trino type:
+
+=============================  ======================
+Trino type                     NumPy dtype
+=============================  ======================
+bigint, integer, smallint,     int64, int32, int16,
+tinyint                        int8
+double, real                   float64, float32
+boolean                        bool
+date                           datetime64[D]
+timestamp(p)                   datetime64[s|ms|us|ns]
+other types                    object
+=============================  ======================
+
+NULL values are stored as 0, ``False`` or ``NaT`` in typed arrays and as ``None`` in
+object arrays. Typed arrays are parsed by NumPy from the values as returned by Trino.
+Values of object columns are converted to Python objects by the value mappers of the
+columns for rows as returned by Trino (``raw=True``), and kept as they are otherwise.
+
+NumPy is an optional dependency, install ``pyavrio[numpy]`` to use this module.
+"""
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from pyavrio.client import RowMapperFactory, ValueMapper, _create_tzinfo
+from pyavrio.exceptions import TrinoDataError
+
+__all__ = ["Column", "ColumnBatch", "to_column", "to_column_batch", "concat_column_batches"]
+
+_INTEGER_DTYPES = {
+    "bigint": "int64",
+    "integer": "int32",
+    "smallint": "int16",
+    "tinyint": "int8",
+}
+
+_FLOATING_DTYPES = {
+    "double": "float64",
+    "real": "float32",
+}
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError("Columnar results require the 'numpy' package, install pyavrio[numpy]") from e
+    return numpy
+
+
+class Column(NamedTuple):
+    """Values of a result column, with ``valid`` set to ``False`` where the value is NULL."""
+    name: str
+    type: str
+    values: Any
+    valid: Any
+
+
+class ColumnBatch:
+    """
+    Columns of a page of results, or of a whole result.
+
+    Columns can be looked up by position or by name, names returned by more than one
+    column resolve to the first of them.
+    """
+
+    def __init__(self, columns: List[Column], num_rows: int):
+        self.columns = columns
+        self.num_rows = num_rows
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def __getitem__(self, key: Union[int, str]) -> Column:
+        if isinstance(key, int):
+            return self.columns[key]
+        for column in self.columns:
+            if column.name == key:
+                return column
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[Column]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Map column names to their value arrays."""
+        return {column.name: column.values for column in self.columns}
+
+    def __repr__(self) -> str:
+        return "ColumnBatch(names={}, num_rows={})".format(self.names, self.num_rows)
+
+
+def _dtype(type_signature: Dict[str, Any]) -> Optional[str]:
+    """NumPy dtype of a column type, ``None`` for columns stored in object arrays."""
+    raw_type = type_signature["rawType"]
+    if raw_type in _INTEGER_DTYPES:
+        return _INTEGER_DTYPES[raw_type]
+    if raw_type in _FLOATING_DTYPES:
+        return _FLOATING_DTYPES[raw_type]
+    if raw_type == "boolean":
+        return "bool"
+    if raw_type == "date":
+        return "datetime64[D]"
+    if raw_type == "timestamp":
+        arguments = type_signature.get("arguments") or []
+        precision = arguments[0]["value"] if arguments else 3
+        if precision == 0:
+            return "datetime64[s]"
+        if precision <= 3:
+            return "datetime64[ms]"
+        if precision <= 6:
+            return "datetime64[us]"
+        return "datetime64[ns]"
+    return None
+
+
+def _is_fixed_offset(zone: str) -> bool:
+    return zone == "UTC" or zone[:1] in ("+", "-")
+
+
+def _split_fixed_offset(values: Sequence[Any]) -> Optional[Tuple[List[Optional[str]], timedelta]]:
+    """Splits ``timestamp with time zone`` values as returned by Trino in their local
+    timestamps and the UTC offset they share, ``None`` unless they share a single fixed offset."""
+    split = [value.rsplit(" ", 1) if value is not None else None for value in values]
+    zones = {parts[1] for parts in split if parts is not None}
+    if len(zones) > 1 or not all(_is_fixed_offset(zone) for zone in zones):
+        return None
+    zone = zones.pop() if zones else "UTC"
+    offset = _create_tzinfo(zone).utcoffset(None) if zone != "UTC" else timedelta(0)
+    return [parts[0] if parts is not None else None for parts in split], offset or timedelta(0)
+
+
+def _value_mappers(columns: List[Dict[str, Any]]) -> List[ValueMapper[Any]]:
+    """Value mappers converting the values of ``columns`` as returned by Trino to Python objects."""
+    if not columns:
+        return []
+    return RowMapperFactory().create(columns, legacy_primitive_types=False).columns
+
+
+def _map_raw_values(values: Sequence[Any], value_mapper: ValueMapper[Any]) -> List[Any]:
+    """Converts values as returned by Trino with ``value_mapper``, raising conversion
+    errors as :class:`pyavrio.exceptions.TrinoDataError` like the row mappers do."""
+    mapped = []
+    for value in values:
+        try:
+            mapped.append(value_mapper.map(value))
+        except ValueError as e:
+            raise TrinoDataError(f"Could not convert '{value}' into the associated python type") from e
+    return mapped
+
+
+def _typed_array(numpy: Any, values: Sequence[Any], valid: Any, dtype: str) -> Any:
+    if dtype.startswith("datetime64") or valid.all():
+        # None is parsed as NaT
+        return numpy.array(values, dtype=dtype)
+    null = False if dtype == "bool" else 0
+    return numpy.array([null if value is None else value for value in values], dtype=dtype)
+
+
+def to_column(
+        column: Dict[str, Any],
+        values: Sequence[Any],
+        value_mapper: Optional[ValueMapper[Any]] = None,
+) -> Column:
+    """
+    Convert the values of a result column, as returned by Trino with its ``typeSignature``, to a :class:`Column`.
+
+    :param value_mapper: if set, the values are as returned by Trino and the values of an
+        object column are converted with it.
+    """
+    numpy = _import_numpy()
+    valid = numpy.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+    dtype = _dtype(column["typeSignature"])
+    if dtype is None:
+        if value_mapper is not None:
+            values = _map_raw_values(values, value_mapper)
+        array = numpy.fromiter(values, dtype=object, count=len(values))
+    else:
+        try:
+            array = _typed_array(numpy, values, valid, dtype)
+        except ValueError as e:
+            if value_mapper is None:
+                raise
+            raise TrinoDataError("Could not convert column '{}': {}".format(column["name"], e)) from e
+    return Column(column["name"], column["type"], array, valid)
+
+
+def to_column_batch(columns: List[Dict[str, Any]], rows: Sequence[Sequence[Any]], raw: bool = False) -> ColumnBatch:
+    """
+    Convert a page of rows to a :class:`ColumnBatch`.
+
+    :param columns: columns of the result, as returned by Trino, with their ``typeSignature``.
+    :param rows: rows of the page.
+    :param raw: whether the rows hold the values as returned by Trino, the values of object
+        columns are then converted to Python objects.
+    """
+    if rows:
+        column_values = list(zip(*rows))
+    else:
+        column_values = [()] * len(columns)
+    value_mappers: Sequence[Optional[ValueMapper[Any]]] = _value_mappers(columns) if raw else [None] * len(columns)
+    return ColumnBatch(
+        [
+            to_column(column, values, value_mapper)
+            for column, values, value_mapper in zip(columns, column_values, value_mappers)
+        ],
+        len(rows),
+    )
+
+
+def concat_column_batches(columns: List[Dict[str, Any]], batches: List[ColumnBatch]) -> ColumnBatch:
+    """Concatenate the batches of a result into a single :class:`ColumnBatch`."""
+    if not batches:
+        return to_column_batch(columns, [])
+    if len(batches) == 1:
+        return batches[0]
+    numpy = _import_numpy()
+    return ColumnBatch(
+        [
+            Column(
+                column.name,
+                column.type,
+                numpy.concatenate([batch.columns[index].values for batch in batches]),
+                numpy.concatenate([batch.columns[index].valid for batch in batches]),
+            )
+            for index, column in enumerate(batches[0].columns)
+        ],
+        sum(batch.num_rows for batch in batches),
+    )
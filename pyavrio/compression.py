@@ -0,0 +1,78 @@
+"""
+
+This module negotiates the compression of HTTP responses.
+
+The ``Accept-Encoding`` header of statement and REST requests lists the content
+codings the client accepts, responses are decoded by ``urllib3`` as they are read.
+``gzip`` and ``deflate`` are always available, ``br`` and ``zstd`` when ``urllib3``
+finds a decoder for them, install ``pyavrio[compression]`` to get both.
+
+The number of bytes of a response read from the network and after its decoding are
+reported by :func:`response_sizes`, the ratio between both is the compression ratio.
+"""
+from typing import Any, List, Optional, Tuple, Union
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+__all__ = ["CONTENT_CODINGS", "supported_content_codings", "accept_encoding", "response_sizes"]
+
+# Content codings in order of preference
+CONTENT_CODINGS = ("zstd", "br", "gzip", "deflate")
+
+IDENTITY = "identity"
+
+
+def supported_content_codings() -> List[str]:
+    """Content codings ``urllib3`` can decode, in order of preference."""
+    decodable = {coding.strip() for coding in ACCEPT_ENCODING.split(",")}
+    return [coding for coding in CONTENT_CODINGS if coding in decodable]
+
+
+def accept_encoding(compression: Union[None, bool, str, List[str]] = "auto") -> str:
+    """
+    Return the value of the ``Accept-Encoding`` header of requests.
+
+    :param compression: ``"auto"`` or ``True`` for every content coding which can be
+        decoded, ``None`` or ``False`` to request uncompressed responses, or one or more
+        of :data:`CONTENT_CODINGS`.
+    """
+    if compression is None or compression is False or compression == IDENTITY:
+        return IDENTITY
+    if compression is True or compression == "auto":
+        return ",".join(supported_content_codings())
+    codings = [compression] if isinstance(compression, str) else list(compression)
+    supported = supported_content_codings()
+    for coding in codings:
+        if coding not in CONTENT_CODINGS:
+            raise ValueError(
+                "Unknown content coding '{}', expected one of {}".format(coding, ", ".join(CONTENT_CODINGS))
+            )
+        if coding not in supported:
+            raise ModuleNotFoundError(
+                "Content coding '{}' cannot be decoded by urllib3, install pyavrio[compression]".format(coding)
+            )
+    return ",".join(codings) if codings else IDENTITY
+
+
+def _wire_bytes(http_response: Any) -> Optional[int]:
+    raw = getattr(http_response, "raw", None)
+    tell = getattr(raw, "tell", None)
+    wire_bytes = tell() if callable(tell) else None
+    if isinstance(wire_bytes, int):
+        return wire_bytes
+    content_length = getattr(http_response, "headers", {}).get("Content-Length")
+    return int(content_length) if content_length is not None and str(content_length).isdigit() else None
+
+
+def response_sizes(http_response: Any, decoded_bytes: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Return the number of bytes of a ``requests.Response`` read from the network and after its decoding.
+
+    :param decoded_bytes: size of the decoded body when it was consumed as a stream,
+        ``len(http_response.content)`` if ``None``.
+    """
+    if decoded_bytes is None:
+        content = http_response.content
+        decoded_bytes = len(content) if isinstance(content, (bytes, bytearray)) else 0
+    wire_bytes = _wire_bytes(http_response)
+    return (decoded_bytes if wire_bytes is None else wire_bytes), decoded_bytes
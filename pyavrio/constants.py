@@ -8,6 +8,26 @@ DEFAULT_SCHEMA: Optional[str] = None
 DEFAULT_AUTH: Optional[Any] = None
 DEFAULT_MAX_ATTEMPTS = 3
 DEFAULT_REQUEST_TIMEOUT: float = 30.0
+DEFAULT_MODIFIED_QUERY_CACHE_SIZE = 1024
+DEFAULT_MODIFIED_QUERY_CACHE_TTL = 300
+DEFAULT_METADATA_QUERY_CACHE_SIZE = 256
+DEFAULT_METADATA_QUERY_CACHE_TTL = 60
+DEFAULT_METADATA_QUERY_CACHE_MAX_BYTES = 8 * 1024 * 1024
+STREAMING_DECODE_CHUNK_SIZE = 64 * 1024
+DEFAULT_SPOOLING_MAX_WORKERS = 4
+DEFAULT_REST_POOL_CONNECTIONS = 10
+DEFAULT_REST_POOL_MAXSIZE = 10
+DEFAULT_REST_MAX_RETRIES = 3
+DEFAULT_REST_BACKOFF_FACTOR = 0.5
+# Lifetime of access tokens without an expiry claim, and how long before expiry they are renewed
+DEFAULT_ACCESS_TOKEN_TTL = 3600
+DEFAULT_ACCESS_TOKEN_EXPIRY_MARGIN = 60
+DEFAULT_REFLECTION_CACHE_TTL = 300
+DEFAULT_REFLECTION_CACHE_SIZE = 4096
+DEFAULT_REFLECTION_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_REFLECTION_MAX_WORKERS = 8
+# Connections of the HTTP pool of the asyncio client, requests beyond wait for one to be free
+DEFAULT_ASYNC_MAX_CONNECTIONS = 512
 
 HTTP = "http"
 HTTPS = "https"
@@ -44,6 +64,10 @@ HEADER_SET_CATALOG = "X-Trino-Set-Catalog"
 
 HEADER_CLIENT_CAPABILITIES = "X-Trino-Client-Capabilities"
 
+HEADER_QUERY_DATA_ENCODING = "X-Trino-Query-Data-Encoding"
+
+HEADER_ACCEPT_ENCODING = "Accept-Encoding"
+
 LENGTH_TYPES = ["char", "varchar"]
 PRECISION_TYPES = ["time", "time with time zone", "timestamp", "timestamp with time zone", "decimal"]
 SCALE_TYPES = ["decimal"]
@@ -0,0 +1,148 @@
+"""
+
+This module builds pandas DataFrames from pages of result rows.
+
+Columns are built with their dtype picked from the Trino type of the column, see
+:mod:`pyavrio.columnar`, instead of being inferred from Python objects:
+
+* ``bigint``, ``integer``, ``smallint``, ``tinyint`` and ``boolean`` columns with NULL
+  values use the nullable ``Int64``/``Int32``/... and ``boolean`` extension dtypes.
+* ``double`` and ``real`` columns store NULL values as ``NaN``.
+* ``decimal`` columns are converted to ``float64`` with ``coerce_float``, like
+  :func:`pandas.read_sql` does, and hold :class:`decimal.Decimal` objects otherwise.
+* ``timestamp with time zone`` columns are converted to UTC.
+* other columns hold the Python objects returned by a cursor.
+
+Rows may hold values as returned by Trino (``raw=True``, as passed by the cursor
+methods), which skips the conversion of every value to a Python object before it is
+copied into the frame.
+
+pandas is an optional dependency, install ``pyavrio[pandas]`` to use this module.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from pyavrio import columnar
+from pyavrio.client import ValueMapper
+from pyavrio.exceptions import TrinoDataError
+
+__all__ = ["to_dataframe", "iter_dataframes", "concat_dataframes"]
+
+
+def _import_pandas() -> Any:
+    try:
+        import pandas
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError("DataFrame results require the 'pandas' package, install pyavrio[pandas]") from e
+    return pandas
+
+
+def _utc_timestamps(pandas: Any, numpy: Any, values: Sequence[Any], value_mapper: ValueMapper[Any], raw: bool) -> Any:
+    if raw:
+        split = columnar._split_fixed_offset(values)
+        if split is not None:
+            # A single fixed offset: parse the local timestamps at once and shift them to UTC
+            local_values, offset = split
+            try:
+                local = numpy.array(local_values, dtype="datetime64[ns]")
+            except ValueError:
+                # e.g. timestamps finer than nanoseconds, converted by the value mapper
+                pass
+            else:
+                if offset:
+                    local = local - numpy.timedelta64(int(offset.total_seconds() * 1_000_000), "us")
+                return pandas.Series(local).dt.tz_localize("UTC")
+        values = columnar._map_raw_values(values, value_mapper)
+    return pandas.Series(pandas.to_datetime(list(values), utc=True))
+
+
+def _to_series(pandas: Any, numpy: Any, column: Dict[str, Any], values: Sequence[Any],
+               value_mapper: ValueMapper[Any], raw: bool, coerce_float: bool) -> Any:
+    raw_type = column["typeSignature"]["rawType"]
+    if raw_type == "decimal" and coerce_float:
+        try:
+            array = numpy.array([numpy.nan if value is None else value for value in values], dtype="float64")
+        except ValueError as e:
+            if not raw:
+                raise
+            raise TrinoDataError("Could not convert column '{}' to float64: {}".format(column["name"], e)) from e
+        return pandas.Series(array)
+    if raw_type == "timestamp with time zone":
+        return _utc_timestamps(pandas, numpy, values, value_mapper, raw)
+
+    converted = columnar.to_column(column, values, value_mapper if raw else None)
+    array = converted.values
+    if array.dtype == object:
+        return pandas.Series(array, dtype=object)
+    if converted.valid.all() or array.dtype.kind == "M":
+        return pandas.Series(array)
+    if array.dtype.kind == "f":
+        array[~converted.valid] = numpy.nan
+        return pandas.Series(array)
+    if array.dtype.kind == "b":
+        return pandas.Series(pandas.arrays.BooleanArray(array, ~converted.valid))
+    return pandas.Series(pandas.arrays.IntegerArray(array, ~converted.valid))
+
+
+def to_dataframe(
+        columns: List[Dict[str, Any]],
+        rows: Sequence[Sequence[Any]],
+        raw: bool = False,
+        coerce_float: bool = True,
+) -> Any:
+    """
+    Build a DataFrame from a page of rows.
+
+    :param columns: columns of the result, as returned by Trino, with their ``typeSignature``.
+    :param rows: rows of the page.
+    :param raw: whether the rows hold the values as returned by Trino instead of Python objects.
+    :param coerce_float: whether ``decimal`` columns are converted to ``float64``.
+    """
+    pandas = _import_pandas()
+    numpy = columnar._import_numpy()
+    value_mappers = columnar._value_mappers(columns)
+    column_values = list(zip(*rows)) if rows else [()] * len(columns)
+    frame = pandas.DataFrame({
+        index: _to_series(pandas, numpy, column, values, value_mapper, raw, coerce_float)
+        for index, (column, values, value_mapper) in enumerate(zip(columns, column_values, value_mappers))
+    })
+    # Columns are set afterwards as a result may return the same name more than once
+    frame.columns = [column["name"] for column in columns]
+    return frame
+
+
+def iter_dataframes(
+        columns: List[Dict[str, Any]],
+        pages: Iterable[Sequence[Sequence[Any]]],
+        chunksize: Optional[int] = None,
+        raw: bool = False,
+        coerce_float: bool = True,
+) -> Iterator[Any]:
+    """
+    Build a DataFrame per page of rows, or per ``chunksize`` rows if set.
+
+    Only the rows of a single frame are held in memory at a time.
+    """
+    if chunksize is None:
+        for rows in pages:
+            if rows:
+                yield to_dataframe(columns, rows, raw=raw, coerce_float=coerce_float)
+        return
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer")
+    buffer: List[Sequence[Any]] = []
+    for rows in pages:
+        buffer.extend(rows)
+        while len(buffer) >= chunksize:
+            yield to_dataframe(columns, buffer[:chunksize], raw=raw, coerce_float=coerce_float)
+            del buffer[:chunksize]
+    if buffer:
+        yield to_dataframe(columns, buffer, raw=raw, coerce_float=coerce_float)
+
+
+def concat_dataframes(columns: List[Dict[str, Any]], frames: List[Any], coerce_float: bool = True) -> Any:
+    """Concatenate the frames of a result into a single DataFrame."""
+    if not frames:
+        return to_dataframe(columns, [], coerce_float=coerce_float)
+    if len(frames) == 1:
+        return frames[0]
+    return _import_pandas().concat(frames, ignore_index=True)
@@ -8,6 +8,7 @@ decide to convert then to a list of tuples.
 """
 import binascii
 import datetime
+import json
 import math
 import uuid
 from collections import OrderedDict
@@ -15,7 +16,7 @@ from decimal import Decimal
 from itertools import islice
 from threading import Lock
 from time import time
-from typing import Any, Dict, List, NamedTuple, Optional  # NOQA for mypy types
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional  # NOQA for mypy types
 from urllib.parse import urlparse
 
 try:
@@ -26,7 +27,8 @@ except ModuleNotFoundError:
 import pyavrio.client
 import pyavrio.exceptions
 import pyavrio.logging
-from pyavrio import constants
+from pyavrio import arrow, columnar, compression, constants, dataframe, json_codec
+from pyavrio.auth import AvrioAuthentication
 from pyavrio.constants import LENGTH_TYPES, PRECISION_TYPES, SCALE_TYPES
 from pyavrio.exceptions import (
     DatabaseError,
@@ -40,6 +42,7 @@ from pyavrio.exceptions import (
     ProgrammingError,
     Warning,
 )
+from pyavrio.query_parser import QueryParser
 from pyavrio.transaction import NO_TRANSACTION, IsolationLevel, Transaction
 
 __all__ = [
@@ -50,6 +53,7 @@ __all__ = [
     "connect",
     "Connection",
     "Cursor",
+    "QueryTemplate",
     # https://www.python.org/dev/peps/pep-0249/#exceptions
     "Warning",
     "Error",
@@ -80,16 +84,21 @@ class TimeBoundLRUCache:
         self.ttl_seconds = ttl_seconds
         self.cache = OrderedDict()
         self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key):
         with self.lock:
             if key not in self.cache:
+                self.misses += 1
                 return None
             value, timestamp = self.cache[key]
             if time() - timestamp > self.ttl_seconds:
-                self.cache.pop(key)
+                self._evict(key)
+                self.misses += 1
                 return None
             self.cache.move_to_end(key)
+            self.hits += 1
             return value
 
     def put(self, key, value):
@@ -97,12 +106,93 @@ class TimeBoundLRUCache:
             self.cache[key] = value, time()
             self.cache.move_to_end(key)
             if len(self.cache) > self.capacity:
-                self.cache.popitem(last=False)
+                self._evict(next(iter(self.cache)))
+
+    def invalidate(self, key):
+        """Remove a single entry. Returns True if the key was cached."""
+        with self.lock:
+            if key not in self.cache:
+                return False
+            self._evict(key)
+            return True
+
+    def invalidate_where(self, predicate):
+        """Remove all entries whose key matches ``predicate``. Returns the number of evicted entries."""
+        with self.lock:
+            keys = [key for key in self.cache if predicate(key)]
+            for key in keys:
+                self._evict(key)
+            return len(keys)
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.cache):
+                self._evict(key)
+
+    def _evict(self, key):
+        # Must be called while holding the lock
+        del self.cache[key]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.cache),
+                "capacity": self.capacity,
+            }
+
+    def __len__(self):
+        with self.lock:
+            return len(self.cache)
 
     def __repr__(self):
         return f"LRUCache(capacity: {self.capacity}, ttl: {self.ttl_seconds} seconds, {self.cache})"
 
 
+class SizeBoundLRUCache(TimeBoundLRUCache):
+    """A :py:class:`TimeBoundLRUCache` which additionally keeps the estimated size of
+    its entries below ``max_bytes``. Least recently used entries are evicted first and
+    values larger than the whole budget are not cached at all."""
+    def __init__(self, capacity: int, ttl_seconds: int, max_bytes: int, sizeof=None):
+        super().__init__(capacity, ttl_seconds)
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or _estimate_size
+        self.sizes: Dict[Any, int] = {}
+        self.total_bytes = 0
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self.lock:
+            if key in self.cache:
+                self._evict(key)
+            if size > self.max_bytes:
+                return
+            self.cache[key] = value, time()
+            self.sizes[key] = size
+            self.total_bytes += size
+            while len(self.cache) > self.capacity or self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self.cache)))
+
+    def _evict(self, key):
+        super()._evict(key)
+        self.total_bytes -= self.sizes.pop(key)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats
+        with self.lock:
+            stats["bytes"] = self.total_bytes
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+def _estimate_size(value) -> int:
+    """Rough number of bytes ``value`` occupies once serialized as JSON."""
+    return len(json.dumps(value, default=str))
+
+
 must_use_legacy_prepared_statements = TimeBoundLRUCache(1024, 3600)
 
 
@@ -147,7 +237,18 @@ class Connection(object):
         legacy_prepared_statements=None,
         roles=None,
         timezone=None,
-        platform=None
+        platform=None,
+        modified_query_cache_size=constants.DEFAULT_MODIFIED_QUERY_CACHE_SIZE,
+        modified_query_cache_ttl=constants.DEFAULT_MODIFIED_QUERY_CACHE_TTL,
+        metadata_query_cache_ttl=constants.DEFAULT_METADATA_QUERY_CACHE_TTL,
+        metadata_query_cache_max_bytes=constants.DEFAULT_METADATA_QUERY_CACHE_MAX_BYTES,
+        prefetch_pages=0,
+        streaming_decode=False,
+        json_decoder=None,
+        lazy_rows=False,
+        encoding=None,
+        spooling_max_workers=constants.DEFAULT_SPOOLING_MAX_WORKERS,
+        http_compression="auto",
     ):
         # Automatically assign http_schema, port based on hostname
         parsed_host = urlparse(host, allow_fragments=False)
@@ -173,13 +274,12 @@ class Connection(object):
             roles=roles,
             timezone=timezone,
             platform=platform,
-            access_token=auth.token
+            # Read from auth when used, as its token may be renewed
+            access_token=(lambda: auth.token) if isinstance(auth, AvrioAuthentication) else auth.token
         )
         self.platform=platform
-        # mypy cannot follow module import
         if http_session is None:
-            self._http_session = pyavrio.client.TrinoRequest.http.Session()
-            self._http_session.verify = verify
+            self._http_session = self._create_http_session(verify)
         else:
             self._http_session = http_session
         self.http_headers = http_headers
@@ -195,7 +295,54 @@ class Connection(object):
         self._transaction = None
         self.legacy_primitive_types = legacy_primitive_types
         self.legacy_prepared_statements = legacy_prepared_statements
-    
+        # Number of result pages fetched ahead by a background thread, 0 disables prefetching
+        self.prefetch_pages = prefetch_pages
+        # Decode result pages incrementally from the response stream, mapping rows as they arrive
+        self.streaming_decode = streaming_decode
+        # Return rows converting their values when first read, see pyavrio.client.LazyRow
+        self.lazy_rows = lazy_rows
+        # Query data encodings of the spooled protocol, e.g. "auto" or ["json+zstd", "json"]
+        self.encoding = encoding
+        self.spooling_max_workers = spooling_max_workers
+        # Content codings accepted for responses, "auto" for every one urllib3 can decode
+        self.http_compression = http_compression
+        self.accept_encoding = compression.accept_encoding(http_compression)
+        # Function decoding response bodies, None for requests' Response.json, "auto" for the fastest installed library
+        self.json_decoder = json_codec.get_decoder(json_decoder)
+        # Rewrites returned by getModifiedQuery, keyed by (user, catalog, platform, normalized sql)
+        self._modified_query_cache = TimeBoundLRUCache(
+            modified_query_cache_size, modified_query_cache_ttl
+        ) if modified_query_cache_size else None
+        # Result sets of metadata queries answered by the rewrite service itself
+        self._metadata_query_cache = SizeBoundLRUCache(
+            constants.DEFAULT_METADATA_QUERY_CACHE_SIZE, metadata_query_cache_ttl, metadata_query_cache_max_bytes
+        ) if metadata_query_cache_ttl and metadata_query_cache_max_bytes else None
+        if self._metadata_query_cache is not None:
+            self._client_session.add_session_change_listener(self._invalidate_metadata_queries)
+
+    @property
+    def modified_query_cache(self) -> Optional[TimeBoundLRUCache]:
+        """Cache of query rewrites, ``None`` when disabled with ``modified_query_cache_size=0``."""
+        return self._modified_query_cache
+
+    @property
+    def metadata_query_cache(self) -> Optional[SizeBoundLRUCache]:
+        """Cache of metadata query results, ``None`` when disabled with
+        ``metadata_query_cache_ttl=0`` or ``metadata_query_cache_max_bytes=0``."""
+        return self._metadata_query_cache
+
+    def _invalidate_metadata_queries(self, client_session):
+        # Called when the session catalog or schema changes
+        self._metadata_query_cache.invalidate_where(lambda key: key[0] == client_session.user)
+
+    def invalidate_query_caches(self) -> None:
+        """Drop all cached query rewrites and metadata query results, e.g. after permissions
+        or data product definitions changed."""
+        if self._modified_query_cache is not None:
+            self._modified_query_cache.clear()
+        if self._metadata_query_cache is not None:
+            self._metadata_query_cache.clear()
+
     @property
     def isolation_level(self):
         return self._isolation_level
@@ -236,6 +383,12 @@ class Connection(object):
         self._transaction.rollback()
         self._transaction = None
 
+    def _create_http_session(self, verify):
+        # mypy cannot follow module import
+        http_session = pyavrio.client.TrinoRequest.http.Session()
+        http_session.verify = verify
+        return http_session
+
     def _create_request(self):
         return pyavrio.client.TrinoRequest(
             self.host,
@@ -246,9 +399,14 @@ class Connection(object):
             self.auth,
             self.max_attempts,
             self.request_timeout,
+            streaming_decode=self.streaming_decode,
+            json_decoder=self.json_decoder,
+            encoding=self.encoding,
+            spooling_max_workers=self.spooling_max_workers,
+            http_compression=self.http_compression,
         )
 
-    def cursor(self, legacy_primitive_types: bool = None):
+    def cursor(self, legacy_primitive_types: bool = None, prefetch_pages: int = None, lazy_rows: bool = None):
         """Return a new :py:class:`Cursor` object using the connection."""
         if self.isolation_level != IsolationLevel.AUTOCOMMIT:
             if self.transaction is None:
@@ -261,7 +419,9 @@ class Connection(object):
             self,
             request,
             # if legacy params are not explicitly set in Cursor, take them from Connection
-            legacy_primitive_types if legacy_primitive_types is not None else self.legacy_primitive_types
+            legacy_primitive_types if legacy_primitive_types is not None else self.legacy_primitive_types,
+            prefetch_pages if prefetch_pages is not None else self.prefetch_pages,
+            lazy_rows if lazy_rows is not None else self.lazy_rows,
         )
 
     def _use_legacy_prepared_statements(self):
@@ -320,6 +480,55 @@ class ColumnDescription(NamedTuple):
         )
 
 
+class QueryTemplate(object):
+    """A parameterized statement rewritten in its placeholder form by the query rewrite service.
+
+    Created with :py:meth:`Cursor.prepare_template`. Executions look the rewrite of the
+    placeholder form up in the connection's ``modified_query_cache`` and bind their
+    parameters into the rewritten statement locally, so a template is rewritten again
+    only when its cache entry expires or is invalidated. Statements answered by the
+    rewrite service as metadata queries are executed through :py:meth:`Cursor.execute`.
+    """
+
+    def __init__(self, cursor, operation: str):
+        self._cursor = cursor
+        self._operation = operation
+        self._placeholder_count = QueryParser.count_placeholders(operation)
+        self._rewritten: Optional[str] = None
+        # (user, catalog, platform) the statement was found not to be bindable for
+        self._unbindable_key = None
+
+    @property
+    def operation(self) -> str:
+        return self._operation
+
+    @property
+    def rewritten(self) -> Optional[str]:
+        """Rewritten placeholder form bound by the latest execution, ``None`` before the first one."""
+        return self._rewritten
+
+    def execute(self, params=None):
+        """Bind ``params`` and execute the statement, see :py:meth:`Cursor.execute_template`."""
+        return self._cursor.execute_template(self, params)
+
+    def _get_rewritten(self, session) -> Optional[str]:
+        rewrite_key = (session.user, session.catalog, session.platform)
+        if self._unbindable_key == rewrite_key:
+            return None
+        connection = self._cursor.connection
+        rewritten = pyavrio.client.TrinoQuery(
+            connection._create_request(), query=self._operation,
+            modified_query_cache=connection.modified_query_cache,
+            json_decoder=connection.json_decoder).rewrite()
+        if rewritten is None or QueryParser.count_placeholders(rewritten) != self._placeholder_count:
+            logger.debug("query template can not be bound locally: %s", self._operation)
+            self._unbindable_key = rewrite_key
+            return None
+        self._unbindable_key = None
+        self._rewritten = rewritten
+        return rewritten
+
+
 class Cursor(object):
     """Database cursor.
 
@@ -332,7 +541,9 @@ class Cursor(object):
             self,
             connection,
             request,
-            legacy_primitive_types: bool = False):
+            legacy_primitive_types: bool = False,
+            prefetch_pages: int = 0,
+            lazy_rows: bool = False):
         if not isinstance(connection, Connection):
             raise ValueError(
                 "connection must be a Connection object: {}".format(type(connection))
@@ -344,6 +555,8 @@ class Cursor(object):
         self._iterator = None
         self._query = None
         self._legacy_primitive_types = legacy_primitive_types
+        self._prefetch_pages = prefetch_pages
+        self._lazy_rows = lazy_rows
 
     def __iter__(self):
         return self._iterator
@@ -431,7 +644,7 @@ class Cursor(object):
         """
         sql = f"PREPARE {name} FROM {statement}"
         query = pyavrio.client.TrinoQuery(self.connection._create_request(), query=sql,
-                                        legacy_primitive_types=self._legacy_primitive_types)
+                                          legacy_primitive_types=self._legacy_primitive_types)
         query.execute()
 
     def _execute_prepared_statement(
@@ -440,7 +653,10 @@ class Cursor(object):
         params
     ):
         sql = 'EXECUTE ' + statement_name + ' USING ' + ','.join(map(self._format_prepared_param, params))
-        return pyavrio.client.TrinoQuery(self._request, query=sql, legacy_primitive_types=self._legacy_primitive_types)
+        return pyavrio.client.TrinoQuery(self._request, query=sql, legacy_primitive_types=self._legacy_primitive_types,
+                                         prefetch_pages=self._prefetch_pages,
+                                         json_decoder=self.connection.json_decoder,
+                                         lazy_rows=self._lazy_rows)
 
     def _execute_immediate_statement(self, statement: str, params):
         """
@@ -452,9 +668,14 @@ class Cursor(object):
         sql = "EXECUTE IMMEDIATE '" + statement.replace("'", "''") + \
               "' USING " + ",".join(map(self._format_prepared_param, params))
         return pyavrio.client.TrinoQuery(
-            self.connection._create_request(), query=sql, legacy_primitive_types=self._legacy_primitive_types)
-
-    def _format_prepared_param(self, param):
+            self.connection._create_request(), query=sql, legacy_primitive_types=self._legacy_primitive_types,
+            modified_query_cache=self.connection.modified_query_cache,
+            metadata_query_cache=self.connection.metadata_query_cache,
+            prefetch_pages=self._prefetch_pages,
+            json_decoder=self.connection.json_decoder,
+            lazy_rows=self._lazy_rows)
+
+    def _format_prepared_param(self, param: Any) -> str:
         """
         Formats parameters to be passed in an
         EXECUTE statement.
@@ -542,7 +763,7 @@ class Cursor(object):
     def _deallocate_prepared_statement(self, statement_name: str) -> None:
         sql = 'DEALLOCATE PREPARE ' + statement_name
         query = pyavrio.client.TrinoQuery(self.connection._create_request(), query=sql,
-                                        legacy_primitive_types=self._legacy_primitive_types)
+                                          legacy_primitive_types=self._legacy_primitive_types)
         query.execute()
 
     def _generate_unique_statement_name(self):
@@ -578,10 +799,59 @@ class Cursor(object):
 
         else:
             self._query = pyavrio.client.TrinoQuery(self._request, query=operation,
-                                                  legacy_primitive_types=self._legacy_primitive_types)
+                                                    legacy_primitive_types=self._legacy_primitive_types,
+                                                    modified_query_cache=self.connection.modified_query_cache,
+                                                    metadata_query_cache=self.connection.metadata_query_cache,
+                                                    prefetch_pages=self._prefetch_pages,
+                                                    json_decoder=self.connection.json_decoder,
+                                                    lazy_rows=self._lazy_rows)
             self._iterator = iter(self._query.execute())
         return self
 
+    def prepare_template(self, operation: str) -> QueryTemplate:
+        """
+        Create a reusable :py:class:`QueryTemplate` for a statement with ``?`` placeholders.
+
+        :param operation: sql with ``?`` parameter placeholders.
+        """
+        return QueryTemplate(self, operation)
+
+    def execute_template(self, template: QueryTemplate, params=None):
+        """
+        Execute a :py:class:`QueryTemplate`, binding ``params`` into the cached rewrite
+        of its placeholder form instead of rewriting the bound statement.
+
+        :param template: template created by :py:meth:`prepare_template`.
+        :param params: parameters to be bound, one per placeholder.
+        """
+        params = params or ()
+        assert isinstance(params, (list, tuple)), (
+            'params must be a list or tuple containing the query '
+            'parameter values'
+        )
+        if len(params) != template._placeholder_count:
+            raise ProgrammingError(
+                "Query template has %d parameter placeholders but %d parameters were given"
+                % (template._placeholder_count, len(params))
+            )
+
+        rewritten = template._get_rewritten(self._request._client_session)
+        if rewritten is None:
+            return self.execute(template.operation, params or None)
+
+        literals = [self._format_prepared_param(param) for param in params]
+        self._query = pyavrio.client.TrinoQuery(
+            self._request,
+            query=QueryParser.bind_placeholders(template.operation, literals),
+            legacy_primitive_types=self._legacy_primitive_types,
+            modified_query=QueryParser.bind_placeholders(rewritten, literals),
+            prefetch_pages=self._prefetch_pages,
+            json_decoder=self.connection.json_decoder,
+            lazy_rows=self._lazy_rows,
+        )
+        self._iterator = iter(self._query.execute())
+        return self
+
     def executemany(self, operation, seq_of_params):
         """
         PEP-0249: Prepare a database operation (query or command) and then
@@ -681,6 +951,86 @@ class Cursor(object):
     def fetchall(self) -> List[List[Any]]:
         return list(iter(self.fetchone, None))
 
+    def iter_column_batches(self) -> Iterator[columnar.ColumnBatch]:
+        """
+        Iterate over the result of the last executed statement as one
+        :py:class:`pyavrio.columnar.ColumnBatch` of NumPy arrays per result page.
+
+        Batches replace the row fetch methods: they cannot be iterated once rows were
+        fetched. Numeric, boolean, date and timestamp columns are returned as typed arrays,
+        see :py:mod:`pyavrio.columnar`. Requires NumPy.
+        """
+        assert self._query is not None
+        columns = self._query.columns
+        for rows in self._query.result.iter_pages(raw=True):
+            if rows:
+                # Object columns of a legacy cursor are kept as returned by Trino
+                yield columnar.to_column_batch(columns, rows, raw=not self._legacy_primitive_types)
+
+    def fetch_columns(self) -> columnar.ColumnBatch:
+        """
+        Fetch the remaining result of the last executed statement as a single
+        :py:class:`pyavrio.columnar.ColumnBatch` of NumPy arrays.
+        """
+        batches = list(self.iter_column_batches())
+        return columnar.concat_column_batches(self._query.columns or [], batches)
+
+    def iter_dataframes(self, chunksize: Optional[int] = None, coerce_float: bool = True) -> Iterator[Any]:
+        """
+        Iterate over the result of the last executed statement as pandas DataFrames,
+        one per result page or per ``chunksize`` rows.
+
+        Columns are built with dtypes picked from the column types, see
+        :py:mod:`pyavrio.dataframe`. Like column batches, frames cannot be iterated once
+        rows were fetched. Requires pandas.
+
+        :param chunksize: number of rows per frame, defaults to the rows of each page.
+        :param coerce_float: whether ``decimal`` columns are converted to ``float64``.
+        """
+        assert self._query is not None
+        return dataframe.iter_dataframes(
+            self._query.columns or [],
+            self._query.result.iter_pages(raw=True),
+            chunksize=chunksize,
+            raw=True,
+            coerce_float=coerce_float,
+        )
+
+    def fetch_dataframe(self, coerce_float: bool = True):
+        """
+        Fetch the remaining result of the last executed statement as a single pandas DataFrame.
+
+        :param coerce_float: whether ``decimal`` columns are converted to ``float64``.
+        """
+        frames = list(self.iter_dataframes(coerce_float=coerce_float))
+        return dataframe.concat_dataframes(self._query.columns or [], frames, coerce_float=coerce_float)
+
+    def iter_arrow_batches(self, max_rows: Optional[int] = None) -> Iterator[Any]:
+        """
+        Iterate over the result of the last executed statement as Arrow record batches,
+        one per result page.
+
+        Column types are mapped from the Trino column types, see :py:mod:`pyavrio.arrow`.
+        Like column batches, record batches cannot be iterated once rows were fetched.
+        Requires pyarrow.
+
+        :param max_rows: maximum number of rows per batch, larger pages are split.
+        """
+        assert self._query is not None
+        return arrow.iter_record_batches(
+            self._query.columns or [],
+            self._query.result.iter_pages(raw=True),
+            max_rows=max_rows,
+            raw=True,
+        )
+
+    def fetch_arrow_table(self):
+        """
+        Fetch the remaining result of the last executed statement as an Arrow table.
+        """
+        batches = list(self.iter_arrow_batches())
+        return arrow.to_table(self._query.columns or [], batches)
+
     def cancel(self):
         if self._query is None:
             return
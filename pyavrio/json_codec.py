@@ -0,0 +1,192 @@
+"""
+
+This module decodes the JSON documents returned by the Trino statement API
+and the Avrio REST API.
+
+:func:`get_decoder` returns the function decoding a response body. ``"auto"``
+selects the fastest installed decoder out of orjson, simdjson (pysimdjson) and
+ujson, and falls back to the standard library ``json`` module.
+
+:func:`decode_streaming` reads a statement response from an iterable of byte
+chunks, e.g. ``requests.Response.iter_content``. The rows of ``data`` are decoded
+and mapped one at a time, so the response body and the unmapped rows of a page
+are never held in memory as a whole.
+"""
+import codecs
+import importlib
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+__all__ = ["DECODERS", "get_decoder", "decode_response", "decode_streaming"]
+
+_WHITESPACE = " \t\n\r"
+
+JSONDecoder = Callable[[bytes], Any]
+
+# Decoder names and the package providing them, fastest first
+_OPTIONAL_DECODERS = {
+    "orjson": "orjson",
+    "simdjson": "pysimdjson",
+    "ujson": "ujson",
+}
+
+DECODERS = ("auto", "json") + tuple(_OPTIONAL_DECODERS)
+
+
+def _load_optional_decoder(name: str) -> JSONDecoder:
+    return importlib.import_module(name).loads
+
+
+def get_decoder(name: Union[str, JSONDecoder, None] = None) -> Optional[JSONDecoder]:
+    """
+    Return the function decoding JSON response bodies.
+
+    :param name: one of :data:`DECODERS`, a function decoding ``bytes``, or ``None``
+        to decode responses with ``requests.Response.json``.
+    """
+    if name is None or callable(name):
+        return name
+    if name == "auto":
+        for decoder_name in _OPTIONAL_DECODERS:
+            try:
+                return _load_optional_decoder(decoder_name)
+            except ModuleNotFoundError:
+                continue
+        return json.loads
+    if name == "json":
+        return json.loads
+    if name not in _OPTIONAL_DECODERS:
+        raise ValueError("Unknown JSON decoder '{}', expected one of {}".format(name, ", ".join(DECODERS)))
+    try:
+        return _load_optional_decoder(name)
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError(
+            "JSON decoder '{}' requires the '{}' package".format(name, _OPTIONAL_DECODERS[name])
+        ) from e
+
+
+def decode_response(http_response: Any, decoder: Optional[JSONDecoder] = None) -> Any:
+    """Decode the JSON body of a ``requests.Response`` with ``decoder``, or ``Response.json`` if ``None``."""
+    if decoder is None:
+        return http_response.json()
+    return decoder(http_response.content)
+
+
+class _StreamingReader:
+    """Reads JSON values one after another from an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_available: int) -> bool:
+        """Reads chunks until ``min_available`` characters are buffered, returns whether any was read."""
+        # Drop what was consumed so the buffer only holds the value being decoded
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        read = False
+        while not self._eof and len(self._buffer) < min_available:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                self._buffer += self._text_decoder.decode(b"", final=True)
+            else:
+                self._buffer += self._text_decoder.decode(chunk)
+            read = True
+        return read
+
+    def peek(self) -> str:
+        """Returns the next non whitespace character without consuming it."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill(1):
+                raise ValueError("Unexpected end of JSON document")
+
+    def read_char(self) -> str:
+        """Consumes and returns the next non whitespace character."""
+        char = self.peek()
+        self._pos += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        if self.read_char() != char:
+            raise ValueError("Expected '{}' in JSON document".format(char))
+
+    def value(self) -> Any:
+        """Decodes the JSON value at the current position."""
+        self.peek()
+        while True:
+            available = len(self._buffer) - self._pos
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # A number ending the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # Wait for twice as much data before decoding again, so a value spanning many
+            # chunks is decoded a logarithmic number of times
+            self._fill(2 * available)
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.read_char()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError("Expected ',' or ']' in JSON array")
+
+
+def decode_streaming(
+    chunks: Iterable[bytes],
+    row_mapping: Callable[[Dict[str, Any]], Optional[Callable[[List[Any]], Any]]],
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Decode a statement response, mapping the rows of ``data`` as they are read.
+
+    :param chunks: byte chunks of the response body.
+    :param row_mapping: called with the members decoded before ``data``, returns the
+        function mapping a single row or ``None`` to keep the rows as decoded.
+    :returns: the decoded response and whether its ``data`` rows were mapped.
+    """
+    reader = _StreamingReader(chunks)
+    response: Dict[str, Any] = {}
+    rows_mapped = False
+    reader.expect("{")
+    if reader.peek() == "}":
+        return response, rows_mapped
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "data" and reader.peek() == "[":
+            map_row = row_mapping(response)
+            if map_row is None:
+                response[key] = list(reader.array_items())
+            else:
+                response[key] = [map_row(row) for row in reader.array_items()]
+                rows_mapped = True
+        else:
+            response[key] = reader.value()
+        separator = reader.read_char()
+        if separator == "}":
+            return response, rows_mapped
+        if separator != ",":
+            raise ValueError("Expected ',' or '}' in JSON object")
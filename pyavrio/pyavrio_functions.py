@@ -1,6 +1,13 @@
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
 from sqlalchemy import create_engine as _sqlalchemy_engine
 from sqlalchemy import text as _sqlalchemy_text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ReflectedColumn
+from sqlalchemy.engine.reflection import ObjectKind, ObjectScope
+from sqlalchemy.pool import PoolProxiedConnection
+
+if TYPE_CHECKING:
+    from pyavrio.sqlalchemy.snapshot import MetadataSnapshot
 
 class PyAvrioFunctions:
     @staticmethod
@@ -126,6 +133,59 @@ class PyAvrioFunctions:
             # Raise an exception if there is an error
             raise Exception(f"Error retrieving table columns. Please check your credentials and platform. Error: {str(e)}")
         
+    @staticmethod
+    def get_tables_columns(
+        engine: Engine, schema: Optional[str] = None, tables: Optional[Sequence[str]] = None
+    ) -> Dict[str, List[ReflectedColumn]]:
+        """
+        Retrieve columns information for several tables of a schema using pyavrio.
+
+        The columns of the tables are fetched in parallel by the engine.dialect.get_multi_columns
+        method, instead of one table after the other with :meth:`get_table_columns`.
+
+        :param engine: The engine instance.
+        :param schema: The schema to which the tables belong.
+        :param tables: Optional. The names of the tables, all tables of the schema if not provided.
+        :return: A dictionary mapping the name of each table to its columns information.
+        """
+        try:
+            with engine.connect() as connection:
+                if tables:
+                    kind, scope = ObjectKind.ANY, ObjectScope.ANY
+                else:
+                    kind, scope = ObjectKind.TABLE, ObjectScope.DEFAULT
+                columns = engine.dialect.get_multi_columns(
+                    connection, schema=schema, filter_names=tables, kind=kind, scope=scope,
+                )
+                return {table_name: table_columns for (_, table_name), table_columns in columns}
+        except Exception as e:
+            # Raise an exception if there is an error
+            raise Exception(
+                f"Error retrieving table columns. Please check your credentials and platform. Error: {str(e)}"
+            )
+
+    @staticmethod
+    def save_metadata_snapshot(
+            engine: Engine, path: str, catalogs: Optional[Sequence[str]] = None, max_workers: int = 8
+    ) -> "MetadataSnapshot":
+        """
+        Crawl the catalogs, schemas, tables and columns of the platform and save them to a snapshot file.
+
+        An engine created with ``reflection_snapshot=path`` answers get_catalog_names, get_schema_names,
+        get_table_names and get_table_columns from the snapshot instead of calling the REST API.
+
+        :param engine: The engine instance.
+        :param path: The file the snapshot is written to, as gzip compressed JSON.
+        :param catalogs: Optional. The catalogs to crawl, all catalogs if not provided.
+        :param max_workers: The number of requests sent in parallel.
+        :return: The crawled :class:`pyavrio.sqlalchemy.snapshot.MetadataSnapshot`.
+        """
+        from pyavrio.sqlalchemy.snapshot import crawl
+
+        snapshot = crawl(engine, catalogs=catalogs, max_workers=max_workers)
+        snapshot.save(path, engine.dialect.type_compiler_instance)
+        return snapshot
+
     @staticmethod
     def execute_sql_query(engine, sql_query):
         """
@@ -153,3 +213,48 @@ class PyAvrioFunctions:
  
         except Exception as e:
             raise Exception(f"Error executing SQL query. Please check your credentials and SQL query. Error: {str(e)}")
+
+    @staticmethod
+    def read_dataframe(engine: Engine, sql: str, chunksize: Optional[int] = None, coerce_float: bool = True) -> Any:
+        """
+        Execute a SQL query on Avrio and return its result as a pandas DataFrame.
+
+        Unlike building a DataFrame from the rows returned by :meth:`execute_sql_query`,
+        the frame is built page by page with column dtypes picked from the column types,
+        without converting every value to a Python object first.
+
+        :param engine: The SQLAlchemy engine instance optimized for Avrio.
+        :param sql: The SQL query to execute.
+        :param chunksize: If set, return an iterator of DataFrames of up to ``chunksize`` rows,
+            so only one chunk of the result is held in memory at a time.
+        :param coerce_float: Whether ``decimal`` columns are converted to ``float64``.
+        :return: A DataFrame, or an iterator of DataFrames if ``chunksize`` is set.
+        :raises ValueError: If the SQL query is empty.
+        """
+        if not sql.strip():
+            raise ValueError("SQL query cannot be empty.")
+        if chunksize is not None:
+            return PyAvrioFunctions._iter_dataframes(engine, sql, chunksize, coerce_float)
+
+        connection = engine.raw_connection()
+        try:
+            cursor = PyAvrioFunctions._execute(connection, sql)
+            return cursor.fetch_dataframe(coerce_float=coerce_float)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _iter_dataframes(engine: Engine, sql: str, chunksize: int, coerce_float: bool) -> Iterator[Any]:
+        connection = engine.raw_connection()
+        try:
+            cursor = PyAvrioFunctions._execute(connection, sql)
+            yield from cursor.iter_dataframes(chunksize=chunksize, coerce_float=coerce_float)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _execute(connection: PoolProxiedConnection, sql: str) -> Any:
+        # The frames are built from the pages as returned by Trino, columns are converted at once
+        cursor = connection.cursor()
+        cursor.execute(sql)
+        return cursor
@@ -1,74 +1,364 @@
-from sql_metadata import Parser
+import functools
 import re
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+__all__ = ["QueryParser", "ParsedStatement"]
+
+# Quoted literals/identifiers and comments are kept verbatim, any other whitespace run is collapsed
+_NORMALIZE_PATTERN = re.compile(
+    r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*\n?|/\*.*?\*/)|\s+",
+    re.DOTALL,
+)
+
+_LITERAL = r"(?:'(?:[^']|'')*'|\d[\d.]*(?:[eE][+-]?\d+)?)"
+
+# A single token, preceded by optional whitespace. Runs of comma separated literals
+# (e.g. large IN lists) are consumed as one token so they cost a single match.
+_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+      | (?P<literal>{literal}(?:\s*,\s*{literal})*)
+      | (?P<quoted>"(?:[^"]|"")*")
+      | (?P<word>[^\W\d]\w*)
+      | (?P<punct>\S)
+    )""".format(literal=_LITERAL),
+    re.VERBOSE | re.DOTALL,
+)
+
+# Keywords introducing a table reference
+_TABLE_KEYWORDS = frozenset({"from", "join", "into", "update", "table"})
+
+# Keywords ending the comma separated table list of a FROM clause
+_FROM_LIST_TERMINATORS = frozenset({
+    "where", "group", "order", "having", "limit", "offset", "fetch", "window",
+    "union", "intersect", "except", "select", "set", "values",
+})
+
+_COMPATIBILITY_LITERALS = frozenset({"1", "2", "3"})
+
+_STATEMENT_CACHE_SIZE = 128
+
+# Longer statements are parsed again on every call rather than kept alive by the cache
+_CACHED_STATEMENT_MAX_LENGTH = 64 * 1024
+
+
+class ParsedStatement(NamedTuple):
+    """
+    Result of the single lexing pass over an SQL statement.
+
+    keyword: first keyword of the statement, lowercased ("" if the statement does not start with one)
+    is_capability_query: whether the statement is sent as is, without the query rewrite
+    is_show_query: whether the statement contains the SHOW keyword outside of literals and comments
+    tables: table references, as tuples of identifier parts
+    schema_qualifier_spans: (start, end) offsets of "schema." qualifiers of two part table references,
+        including their occurrences in column references
+    prepare_split: offset splitting "PREPARE name FROM" from the prepared statement, if any
+    placeholder_offsets: offsets of "?" parameter placeholders outside of literals and comments
+    """
+    keyword: str
+    is_capability_query: bool
+    is_show_query: bool
+    tables: Tuple[Tuple[str, ...], ...]
+    schema_qualifier_spans: Tuple[Tuple[int, int], ...]
+    prepare_split: Optional[int]
+    placeholder_offsets: Tuple[int, ...]
+
+
+class _Name(NamedTuple):
+    parts: Tuple[str, ...]
+    # start offset of each part
+    starts: Tuple[int, ...]
+    # lowercased keyword if the name is a single unquoted word
+    keyword: Optional[str]
+
+
+def _identifier_value(token: str) -> str:
+    if token.startswith('"'):
+        return token[1:-1].replace('""', '"')
+    return token
+
+
+# Token kind, text and start and end offsets
+_Token = Tuple[str, str, int, int]
+# As a token, with kind "name" and a _Name instead of the text for dotted identifier chains
+_Unit = Tuple[str, Any, int, int]
+
+
+def _tokenize(query: str) -> List[_Token]:
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind is None or kind == "comment":
+            continue
+        tokens.append((kind, match.group(kind), match.start(kind), match.end(kind)))
+    return tokens
+
+
+def _group_names(tokens: List[_Token]) -> List[_Unit]:
+    """Collapses dotted identifier chains into :class:`_Name` units."""
+    units: List[_Unit] = []
+    i = 0
+    count = len(tokens)
+    while i < count:
+        kind, text, start, end = tokens[i]
+        if kind not in ("word", "quoted"):
+            units.append((kind, text, start, end))
+            i += 1
+            continue
+        parts = [_identifier_value(text)]
+        starts = [start]
+        keyword = text.lower() if kind == "word" else None
+        i += 1
+        while (
+            i + 1 < count
+            and tokens[i][1] == "."
+            and tokens[i + 1][0] in ("word", "quoted")
+        ):
+            parts.append(_identifier_value(tokens[i + 1][1]))
+            starts.append(tokens[i + 1][2])
+            end = tokens[i + 1][3]
+            keyword = None
+            i += 2
+        units.append(("name", _Name(tuple(parts), tuple(starts), keyword), start, end))
+    return units
+
+
+def parse_statement(query: str) -> ParsedStatement:
+    """
+    Analyze an SQL statement with a single tokenizer pass. Results are memoized per statement text,
+    for statements of up to 64 KiB.
+    """
+    if len(query) > _CACHED_STATEMENT_MAX_LENGTH:
+        return _parse_statement(query)
+    return _cached_parse_statement(query)
+
+
+def _parse_statement(query: str) -> ParsedStatement:
+    tokens = _tokenize(query)
+    units = _group_names(tokens)
+
+    keyword = ""
+    if units and units[0][0] == "name" and units[0][1].keyword:
+        keyword = units[0][1].keyword
+
+    is_capability_query = keyword == "alter" or (
+        keyword == "select"
+        and len(tokens) == 2
+        and tokens[1][0] == "literal"
+        and tokens[1][1] in _COMPATIBILITY_LITERALS
+    )
+
+    is_show_query = False
+    prepare_from: Optional[int] = None
+    prepare_split: Optional[int] = None
+    tables: List[_Name] = []
+    names: List[_Name] = []
+    placeholder_offsets: List[int] = []
+    expect_table = False
+    # Whether a comma continues the table list of a FROM clause, one entry per open parenthesis
+    in_from_list = False
+    from_list_stack: List[bool] = []
+
+    for index, (kind, value, start, end) in enumerate(units):
+        if kind == "name":
+            name_keyword = value.keyword
+            names.append(value)
+            if name_keyword == "show":
+                is_show_query = True
+            elif keyword == "prepare" and name_keyword == "from" and prepare_from is None:
+                prepare_from = end
+            elif name_keyword == "select" and prepare_from is not None:
+                prepare_split = prepare_from
+
+            if name_keyword in _TABLE_KEYWORDS:
+                if name_keyword == "from":
+                    in_from_list = True
+                elif name_keyword != "join" and not expect_table:
+                    in_from_list = False
+                expect_table = True
+                continue
+            if expect_table:
+                expect_table = False
+                next_unit = units[index + 1] if index + 1 < len(units) else None
+                is_call = next_unit is not None and next_unit[1] == "("
+                if not is_call and name_keyword not in _FROM_LIST_TERMINATORS:
+                    tables.append(value)
+                    continue
+            if name_keyword in _FROM_LIST_TERMINATORS:
+                in_from_list = False
+        elif value == "(":
+            from_list_stack.append(in_from_list)
+            in_from_list = False
+            expect_table = False
+        elif value == ")":
+            in_from_list = from_list_stack.pop() if from_list_stack else False
+        elif value == "," and in_from_list:
+            expect_table = True
+        elif value == "?":
+            placeholder_offsets.append(start)
+
+    qualified_tables = {table.parts for table in tables if len(table.parts) == 2}
+    schema_qualifier_spans = tuple(
+        (name.starts[0], name.starts[1])
+        for name in names
+        if len(name.parts) >= 2 and name.parts[:2] in qualified_tables
+    )
+
+    return ParsedStatement(
+        keyword=keyword,
+        is_capability_query=is_capability_query,
+        is_show_query=is_show_query,
+        tables=tuple(table.parts for table in tables),
+        schema_qualifier_spans=schema_qualifier_spans,
+        prepare_split=prepare_split,
+        placeholder_offsets=tuple(placeholder_offsets),
+    )
+
+
+_cached_parse_statement = functools.lru_cache(maxsize=_STATEMENT_CACHE_SIZE)(_parse_statement)
 
-__all__ = ["QueryParser"]
 
 class QueryParser:
-    
+
     @staticmethod
-    def parse_query(query, platform=None):
+    def normalize_query(query: str) -> str:
+        """
+        Normalize an SQL query so that statements differing only in layout compare equal.
+
+        Whitespace outside of string literals, quoted identifiers and comments is
+        collapsed to a single space and the statement is stripped. The normalized
+        form is only meant to be used as a lookup key, never sent to the server.
+
+        Args:
+            query (str): SQL query to normalize
+
+        Returns:
+            str: Normalized query
+        """
+        return _NORMALIZE_PATTERN.sub(lambda m: m.group(1) or " ", query).strip()
+
+    @staticmethod
+    def analyze(query: str) -> ParsedStatement:
+        """
+        Analyze an SQL query with a single tokenizer pass.
+
+        The result is memoized per statement text, so the checks below share one pass.
+
+        Args:
+            query (str): SQL query to analyze
+
+        Returns:
+            ParsedStatement: Statement classification and table references
+        """
+        return parse_statement(query)
+
+    @staticmethod
+    def parse_query(query: str, platform: Optional[str] = None) -> bool:
         """
         Parse and validate SQL query.
-        
+
         Args:
             query (str): SQL query to parse
             platform (str, optional): Platform type for additional validation logic
-                
+
         Returns:
             bool: True if query is valid, False otherwise
         """
-        # Strip whitespace first to avoid unnecessary processing
-        query = query.strip().lower()
-        
-        # Early return if empty query
-        if not query:
-            return False
-
-        # Remove comments
-        query = re.sub(r'(/\*.*?\*/|--.*?$)', '', query, flags=re.DOTALL | re.MULTILINE).strip()
-
-        # Compatibility queries
-        COMPATIBILITY_QUERIES = {'select 1', 'select 2', 'select 3'}
-        
-        # Check query type using startswith
-        if query.startswith('select'):
-            # Normalize whitespace more efficiently
-            normalized_query = ' '.join(query.split())
-            return normalized_query in COMPATIBILITY_QUERIES
-        return query.startswith('alter')
+        return parse_statement(query).is_capability_query
 
     @staticmethod
-    def remove_schema_from_query(_query, platform):
+    def is_show_query(query: str) -> bool:
+        """
+        Check whether the query contains the SHOW keyword.
+
+        Args:
+            query (str): SQL query to check
+
+        Returns:
+            bool: True if SHOW appears outside of literals and comments
+        """
+        return parse_statement(query).is_show_query
+
+    @staticmethod
+    def split_prepare_query(query: str) -> Tuple[Optional[str], str]:
+        """
+        Split a "PREPARE name FROM <statement>" query.
+
+        Args:
+            query (str): SQL query to split
+
+        Returns:
+            tuple: The "PREPARE name FROM" part and the prepared statement, or
+            None and the query if it is not a PREPARE of a SELECT statement
+        """
+        split = parse_statement(query).prepare_split
+        if split is None:
+            return None, query
+        return query[:split], query[split:]
+
+    @staticmethod
+    def remove_schema_from_query(_query: str, platform: Optional[str]) -> str:
         """
         Remove schema from query for data products platform.
-        
+
         Args:
             query (str): SQL query to process
             platform (str): Platform identifier
-            
+
         Returns:
             str: Processed query with schema removed if applicable
         """
-        parsed_query = Parser(_query)
-        if platform == "data_products" and parsed_query.tables:
-            for i, table in enumerate(parsed_query.tables):
-                parts = table.split('.')
-                if len(parts) == 2:
-                    part_1 = parts[0]
-                    part_2 = parts[1]
-
-                    pattern_1 = re.compile(rf'"{re.escape(part_1)}"\."{re.escape(part_2)}"')
-                    pattern_2 = re.compile(rf'"{re.escape(part_1)}"\.{re.escape(part_2)}')
-                    pattern_3 = re.compile(rf'{re.escape(part_1)}\."{re.escape(part_2)}"')
-                    pattern_4 = re.compile(rf'{re.escape(part_1)}\.{re.escape(part_2)}')
-
-                    _query = pattern_1.sub(part_2, _query)
-                    _query = pattern_2.sub(part_2, _query)
-                    _query = pattern_3.sub(part_2, _query)
-                    _query = pattern_4.sub(part_2, _query)
-                    parsed_query.tables[i] = part_2
+        if platform != "data_products":
             return _query
-        else:
+        spans = parse_statement(_query).schema_qualifier_spans
+        if not spans:
             return _query
-        
-    
\ No newline at end of file
+        pieces = []
+        position = 0
+        for start, end in spans:
+            pieces.append(_query[position:start])
+            position = end
+        pieces.append(_query[position:])
+        return "".join(pieces)
+
+    @staticmethod
+    def count_placeholders(query: str) -> int:
+        """
+        Count the "?" parameter placeholders of an SQL query.
+
+        Args:
+            query (str): SQL query to check
+
+        Returns:
+            int: Number of placeholders outside of literals and comments
+        """
+        return len(parse_statement(query).placeholder_offsets)
+
+    @staticmethod
+    def bind_placeholders(query: str, literals: Sequence[str]) -> str:
+        """
+        Replace the "?" parameter placeholders of an SQL query with SQL literals.
+
+        Args:
+            query (str): SQL query with placeholders
+            literals (list): SQL literals, one per placeholder, in order
+
+        Returns:
+            str: Query with the placeholders replaced
+
+        Raises:
+            ValueError: If the number of literals does not match the number of placeholders
+        """
+        offsets = parse_statement(query).placeholder_offsets
+        if len(offsets) != len(literals):
+            raise ValueError(
+                f"Query has {len(offsets)} parameter placeholders but {len(literals)} parameters were given"
+            )
+        pieces = []
+        position = 0
+        for offset, literal in zip(offsets, literals):
+            pieces.append(query[position:offset])
+            pieces.append(literal)
+            position = offset + 1
+        pieces.append(query[position:])
+        return "".join(pieces)
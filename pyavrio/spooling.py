@@ -0,0 +1,141 @@
+"""
+
+This module decodes the result data of the Trino spooled protocol.
+
+When the client advertises query data encodings with the
+``X-Trino-Query-Data-Encoding`` header, the ``data`` of a statement response may be
+an object listing segments instead of an array of rows::
+
+    {"encoding": "json+zstd", "segments": [
+        {"type": "inline", "data": "<base64>", "metadata": {...}},
+        {"type": "spooled", "uri": "...", "ackUri": "...", "headers": {...}, "metadata": {...}}
+    ]}
+
+Inline segments carry their data in the response. Spooled segments are downloaded
+from their URI, in parallel, and acknowledged once decoded so the server can drop
+them, both with the ``headers`` of the segment. A segment is compressed with the
+algorithm of the encoding when its metadata has an ``uncompressedSize``.
+
+Compressed encodings are optional: ``json+zstd`` requires the ``zstandard`` package
+and ``json+lz4`` the ``lz4`` package, install ``pyavrio[spooling]`` to get both.
+"""
+import base64
+import importlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pyavrio.logging
+
+__all__ = ["ENCODINGS", "supported_encodings", "decode_segment", "decode_segments"]
+
+logger = pyavrio.logging.get_logger(__name__)
+
+# Compressed encodings and the package decompressing them, preferred first
+_COMPRESSED_ENCODINGS = {
+    "json+zstd": "zstandard",
+    "json+lz4": "lz4",
+}
+
+ENCODINGS = tuple(_COMPRESSED_ENCODINGS) + ("json",)
+
+Rows = List[List[Any]]
+
+
+def _is_installed(package: str) -> bool:
+    try:
+        importlib.import_module(package)
+    except ModuleNotFoundError:
+        return False
+    return True
+
+
+def supported_encodings(encoding: Union[str, List[str]] = "auto") -> List[str]:
+    """
+    Return the query data encodings to advertise, in order of preference.
+
+    :param encoding: ``"auto"`` for every encoding whose decompression package is
+        installed, or one or more of :data:`ENCODINGS`.
+    """
+    if encoding == "auto":
+        return [name for name, package in _COMPRESSED_ENCODINGS.items() if _is_installed(package)] + ["json"]
+    encodings = [encoding] if isinstance(encoding, str) else list(encoding)
+    for name in encodings:
+        if name not in ENCODINGS:
+            raise ValueError("Unknown query data encoding '{}', expected one of {}".format(name, ", ".join(ENCODINGS)))
+        package = _COMPRESSED_ENCODINGS.get(name)
+        if package is not None and not _is_installed(package):
+            raise ModuleNotFoundError("Query data encoding '{}' requires the '{}' package".format(name, package))
+    return encodings
+
+
+def _decompress(encoding: str, data: bytes, uncompressed_size: int) -> bytes:
+    if encoding == "json+zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=uncompressed_size)
+    if encoding == "json+lz4":
+        import lz4.block
+
+        return lz4.block.decompress(data, uncompressed_size=uncompressed_size)
+    raise ValueError("Unsupported query data encoding '{}'".format(encoding))
+
+
+def decode_segment(
+        encoding: str,
+        data: bytes,
+        metadata: Dict[str, Any],
+        decoder: Optional[Callable[[bytes], Any]] = None,
+) -> Rows:
+    """Decode the rows of a segment, decompressing it first if its metadata has an ``uncompressedSize``."""
+    if encoding != "json" and "uncompressedSize" in metadata:
+        data = _decompress(encoding, data, metadata["uncompressedSize"])
+    return (decoder or json.loads)(data)
+
+
+def decode_segments(
+        data: Dict[str, Any],
+        download: Callable[[Dict[str, Any]], bytes],
+        acknowledge: Callable[[Dict[str, Any]], None],
+        decoder: Optional[Callable[[bytes], Any]] = None,
+        max_workers: int = 1,
+) -> Rows:
+    """
+    Decode the rows of the segments of a response, in order.
+
+    :param data: the ``data`` object of a statement response.
+    :param download: returns the body of a spooled segment.
+    :param acknowledge: acknowledges a decoded spooled segment.
+    :param decoder: function decoding JSON, ``json.loads`` if ``None``.
+    :param max_workers: number of spooled segments downloaded in parallel.
+    """
+    encoding = data["encoding"]
+    segments = data.get("segments") or []
+
+    def decode_spooled(segment: Dict[str, Any]) -> Rows:
+        rows = decode_segment(encoding, download(segment), segment.get("metadata", {}), decoder)
+        try:
+            acknowledge(segment)
+        except Exception as e:
+            # Unacknowledged segments are removed by the server when they expire
+            logger.warning("Failed to acknowledge spooled segment %s: %s", segment.get("ackUri"), e)
+        return rows
+
+    spooled = [segment for segment in segments if segment["type"] == "spooled"]
+    if len(spooled) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(spooled))) as executor:
+            spooled_rows = iter(list(executor.map(decode_spooled, spooled)))
+    else:
+        spooled_rows = map(decode_spooled, spooled)
+
+    rows: Rows = []
+    for segment in segments:
+        if segment["type"] == "inline":
+            rows.extend(decode_segment(
+                encoding, base64.b64decode(segment["data"]), segment.get("metadata", {}), decoder,
+            ))
+        elif segment["type"] == "spooled":
+            rows.extend(next(spooled_rows))
+        else:
+            raise ValueError("Unsupported segment type '{}'".format(segment["type"]))
+    return rows
@@ -1,3 +1,4 @@
+from sqlalchemy import exc
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import compiler, sqltypes
 from sqlalchemy.sql.base import DialectKWArgs
@@ -235,6 +236,25 @@ class TrinoTypeCompiler(compiler.GenericTypeCompiler):
     def visit_JSON(self, type_, **kw):
         return 'JSON'
 
+    def visit_ARRAY(self, type_, **kw):
+        datatype = self.process(type_.item_type, **kw)
+        for _ in range(type_.dimensions or 1):
+            datatype = f"ARRAY({datatype})"
+        return datatype
+
+    def visit_MAP(self, type_, **kw):
+        return f"MAP({self.process(type_.key_type, **kw)}, {self.process(type_.value_type, **kw)})"
+
+    def visit_ROW(self, type_, **kw):
+        # Only named fields are rendered, so that the type parses back to the same ROW
+        if any(attr_name is None for attr_name, _ in type_.attr_types):
+            raise exc.CompileError("ROW types with anonymous fields can not be rendered, name every field")
+        attrs = ", ".join(
+            f"{self.dialect.identifier_preparer.quote(attr_name)} {self.process(attr_type, **kw)}"
+            for attr_name, attr_type in type_.attr_types
+        )
+        return f"ROW({attrs})"
+
 
 class TrinoIdentifierPreparer(compiler.IdentifierPreparer):
     reserved_words = RESERVED_WORDS
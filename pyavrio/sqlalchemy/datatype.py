@@ -1,8 +1,10 @@
+import functools
 import re
 from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 import sqlalchemy
 from sqlalchemy import func, util
 from sqlalchemy.sql import sqltypes
+from sqlalchemy.sql.base import SchemaEventTarget
 from sqlalchemy.sql.type_api import TypeDecorator, TypeEngine
 from sqlalchemy.types import JSON
 
@@ -211,47 +213,191 @@ def aware_split(
     yield string[i:]
 
 
-def parse_sqltype(type_str: str) -> TypeEngine:
-    type_str = type_str.strip().lower()
-    match = re.match(r"^(?P<type>\w+)\s*(?:\((?P<options>.*)\))?", type_str)
-    if not match:
-        util.warn(f"Could not parse type name '{type_str}'")
+# Number of distinct type strings whose parsed types are interned
+_TYPE_CACHE_SIZE = 1024
+
+# A single token of a type signature, preceded by optional whitespace
+_TOKEN_PATTERN = re.compile(r'\s*(?:(?P<word>\w+)|(?P<quoted>"(?:[^"\\]|\\.|"")*")|(?P<punct>[(),])|(?P<other>\S))')
+
+# A whole signature of a scalar type, e.g. "decimal(38, 10)" or "timestamp(3) with time zone"
+_SCALAR_PATTERN = re.compile(r"(\w+)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?((?:\s+\w+)*)\s*")
+
+_CONTAINER_TYPES = frozenset({"array", "map", "row"})
+
+
+class _NotInterned(Exception):
+    """Raised to keep the result of a type string which could not be fully parsed out of the cache."""
+    def __init__(self, type_: TypeEngine):
+        self.type_ = type_
+
+
+class _TypeParser:
+    """
+    Recursive descent parser of Trino type signatures.
+
+    The signature is tokenized by a single regex pass, types are then built from the
+    tokens without splitting the signature again at each level of nesting.
+    """
+
+    def __init__(self, type_str: str):
+        self.type_str = type_str
+        self.tokens: List[Tuple[str, str]] = []
+        self.position = 0
+        self.warned = False
+
+    def warn(self, message: str) -> TypeEngine:
+        self.warned = True
+        util.warn(message)
         return sqltypes.NULLTYPE
-    type_name = match.group("type")
-    type_opts = match.group("options")
-
-    if type_name == "array":
-        item_type = parse_sqltype(type_opts)
-        if isinstance(item_type, sqltypes.ARRAY):
-            # Multi-dimensions array is normalized in SQLAlchemy, e.g:
-            # `ARRAY(ARRAY(INT))` in Trino SQL will become `ARRAY(INT(), dimensions=2)` in SQLAlchemy
-            dimensions = (item_type.dimensions or 1) + 1
-            return sqltypes.ARRAY(item_type.item_type, dimensions=dimensions)
-        return sqltypes.ARRAY(item_type)
-    elif type_name == "map":
-        key_type_str, value_type_str = aware_split(type_opts)
-        key_type = parse_sqltype(key_type_str)
-        value_type = parse_sqltype(value_type_str)
-        return MAP(key_type, value_type)
-    elif type_name == "row":
+
+    def parse(self) -> TypeEngine:
+        scalar = _SCALAR_PATTERN.fullmatch(self.type_str)
+        if scalar and scalar.group(1) not in _CONTAINER_TYPES:
+            # Most columns are scalars, which need no tokenizing
+            type_name, first_arg, second_arg, suffix = scalar.groups()
+            type_args = [int(arg) for arg in (first_arg, second_arg) if arg is not None]
+            return self._scalar(type_name, type_args, suffix.split())
+        self.tokens = [
+            (match.lastgroup, match.group(match.lastgroup)) for match in _TOKEN_PATTERN.finditer(self.type_str)
+        ]
+        try:
+            type_ = self._parse_type()
+            if self.position != len(self.tokens):
+                raise ValueError(self.type_str)
+            return type_
+        except (IndexError, ValueError):
+            return self.warn(f"Could not parse type name '{self.type_str}'")
+
+    def _next(self) -> Tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def _expect(self, punct: str) -> None:
+        if self._next()[1] != punct:
+            raise ValueError(self.type_str)
+
+    def _parse_type(self) -> TypeEngine:
+        kind, type_name = self._next()
+        if kind != "word":
+            raise ValueError(self.type_str)
+        if type_name in _CONTAINER_TYPES:
+            self._expect("(")
+            return self._parse_container(type_name)
+
+        type_args: List[int] = []
+        if self._peek() == "(":
+            self.position += 1
+            type_args.append(int(self._next()[1]))
+            while self._peek() == ",":
+                self.position += 1
+                type_args.append(int(self._next()[1]))
+            self._expect(")")
+        # Words completing the type name, e.g. "with time zone"
+        suffix = []
+        while self.position < len(self.tokens) and self.tokens[self.position][0] == "word":
+            suffix.append(self.tokens[self.position][1])
+            self.position += 1
+        return self._scalar(type_name, type_args, suffix)
+
+    def _scalar(self, type_name: str, type_args: List[int], suffix: List[str]) -> TypeEngine:
+        if type_name not in _type_map:
+            return self.warn(f"Did not recognize type '{type_name}'")
+        type_class = _type_map[type_name]
+        if type_name in ("time", "timestamp"):
+            type_kwargs: Dict[str, Any] = dict()
+            if suffix[-3:] == ["with", "time", "zone"]:
+                type_kwargs["timezone"] = True
+            if type_args:
+                type_kwargs["precision"] = type_args[0]
+            return type_class(**type_kwargs)
+        return type_class(*type_args)
+
+    def _parse_container(self, type_name: str) -> TypeEngine:
+        if type_name == "array":
+            item_type = self._parse_type()
+            self._expect(")")
+            if isinstance(item_type, sqltypes.ARRAY):
+                # Multi-dimensions array is normalized in SQLAlchemy, e.g:
+                # `ARRAY(ARRAY(INT))` in Trino SQL will become `ARRAY(INT(), dimensions=2)` in SQLAlchemy
+                dimensions = (item_type.dimensions or 1) + 1
+                return sqltypes.ARRAY(item_type.item_type, dimensions=dimensions)
+            return sqltypes.ARRAY(item_type)
+        if type_name == "map":
+            key_type = self._parse_type()
+            self._expect(",")
+            value_type = self._parse_type()
+            self._expect(")")
+            return MAP(key_type, value_type)
         attr_types: List[Tuple[Optional[str], SQLType]] = []
-        for attr in aware_split(type_opts):
-            attr_name, attr_type_str = aware_split(attr.strip(), delimiter=" ", maxsplit=1)
-            attr_name = unquote(attr_name)
-            attr_type = parse_sqltype(attr_type_str)
-            attr_types.append((attr_name, attr_type))
-        return ROW(attr_types)
-
-    if type_name not in _type_map:
-        util.warn(f"Did not recognize type '{type_name}'")
-        return sqltypes.NULLTYPE
-    type_class = _type_map[type_name]
-    type_args = [int(o.strip()) for o in type_opts.split(",")] if type_opts else []
-    if type_name in ("time", "timestamp"):
-        type_kwargs: Dict[str, Any] = dict()
-        if type_str.endswith("with time zone"):
-            type_kwargs["timezone"] = True
-        if type_opts is not None:
-            type_kwargs["precision"] = int(type_opts)
-        return type_class(**type_kwargs)
-    return type_class(*type_args)
+        while True:
+            attr_types.append(self._parse_field())
+            punct = self._next()[1]
+            if punct == ")":
+                return ROW(attr_types)
+            if punct != ",":
+                raise ValueError(self.type_str)
+
+    def _parse_field(self) -> Tuple[Optional[str], TypeEngine]:
+        # A row field is a quoted or unquoted name followed by its type, or only a type
+        kind, text = self.tokens[self.position]
+        if kind == "quoted":
+            self.position += 1
+            return unquote(text), self._parse_type()
+        if kind == "word" and self.position + 1 < len(self.tokens) and self.tokens[self.position + 1][0] == "word":
+            self.position += 1
+            return text, self._parse_type()
+        return None, self._parse_type()
+
+
+@functools.lru_cache(maxsize=_TYPE_CACHE_SIZE)
+def _parse_interned(type_str: str) -> TypeEngine:
+    parser = _TypeParser(type_str.strip().lower())
+    type_ = parser.parse()
+    if parser.warned:
+        # Not cached, so the warning is raised again for every column of this type
+        raise _NotInterned(type_)
+    return type_
+
+
+def _has_event_target(type_: TypeEngine) -> bool:
+    if isinstance(type_, SchemaEventTarget):
+        return True
+    if isinstance(type_, MAP):
+        return _has_event_target(type_.key_type) or _has_event_target(type_.value_type)
+    if isinstance(type_, ROW):
+        return any(_has_event_target(attr_type) for _, attr_type in type_.attr_types)
+    return False
+
+
+def _copy_interned(type_: TypeEngine) -> TypeEngine:
+    """Copy of an interned type, down to every nested type attaching itself to its column."""
+    if not _has_event_target(type_):
+        return type_
+    copy = type_.copy()
+    if isinstance(type_, sqltypes.ARRAY):
+        copy.item_type = _copy_interned(type_.item_type)
+    elif isinstance(type_, MAP):
+        copy.key_type = _copy_interned(type_.key_type)
+        copy.value_type = _copy_interned(type_.value_type)
+    elif isinstance(type_, ROW):
+        copy.attr_types = [(attr_name, _copy_interned(attr_type)) for attr_name, attr_type in type_.attr_types]
+    return copy
+
+
+def parse_sqltype(type_str: str) -> TypeEngine:
+    """
+    Parse a Trino type signature, e.g. ``array(row(id bigint, name varchar))``.
+
+    Parsed types are interned per signature. Instances are shared by the columns of the
+    same type, except types attaching themselves to their column (:class:`SchemaEventTarget`),
+    e.g. ``boolean`` or ``array``, which are copied along with the types containing them.
+    """
+    try:
+        type_ = _parse_interned(type_str)
+    except _NotInterned as e:
+        return e.type_
+    return _copy_interned(type_)
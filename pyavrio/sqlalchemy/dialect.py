@@ -1,22 +1,35 @@
+import functools
+import inspect
 import json
+import os
+import re
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from textwrap import dedent
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+)
 from urllib.parse import unquote_plus
 
 from sqlalchemy import exc, sql
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.engine.default import DefaultDialect, DefaultExecutionContext
+from sqlalchemy.engine.reflection import ObjectKind, ObjectScope
 from sqlalchemy.engine.url import URL
 from sqlalchemy.sql import sqltypes
 
+from pyavrio import constants
 from pyavrio import dbapi as trino_dbapi
 from pyavrio import logging
 from pyavrio.auth import (
-    AvrioAuthentication
+    AvrioAuthentication,
+    get_token_cache
 )
 from pyavrio.dbapi import Cursor
 from pyavrio.sqlalchemy import compiler, datatype, error
+from pyavrio.sqlalchemy.snapshot import MetadataSnapshot
 from pyavrio.avrio_rest_handler import AvrioHTTPHandler
 from .datatype import JSONIndexType, JSONPathType
 
@@ -27,9 +40,68 @@ colspecs = {
     sqltypes.JSON.JSONPathType: JSONPathType,
 }
 
+# Statements which may create, drop or rename schemas and tables
+_DDL_STATEMENT = re.compile(r"^\s*(CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+def _reflection_cache(kind: str):
+    """
+    Cache the result of a reflection method in the reflection cache of the dialect and
+    in the ``info_cache`` of the inspection, like :func:`sqlalchemy.engine.reflection.cache`.
+
+    Results are keyed by ``kind`` and the platform, user, catalog, schema and table they
+    were fetched for, falling back to the defaults of the connection. Results found in the
+    metadata snapshot of the dialect are returned without being fetched.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, connection, *args, **kw):
+            arguments = signature.bind(self, connection, *args, **kw).arguments
+            key = self._reflection_key(
+                connection, kind, arguments.get("schema"), arguments.get("table_name"), kw.get("catalog"),
+            )
+            return self._reflect(connection, key, lambda: fn(self, connection, *args, **kw), kw.get("info_cache"))
+        return wrapper
+    return decorate
+
+
+def _copy_reflected(value):
+    # Callers, e.g. the SQLAlchemy inspector, may update the column dictionaries they get
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+class _ReflectionSettings(NamedTuple):
+    """
+    Settings of a connection read by the thread owning it, passed to the reflection methods
+    called from worker threads in its place, as SQLAlchemy connections are not thread-safe.
+    """
+    host: Optional[str]
+    platform: Optional[str]
+    user: Optional[str]
+    auth: Any
+    catalog: Optional[str]
+    schema: Optional[str]
+    json_decoder: Optional[Callable[[bytes], Any]]
+    accept_encoding: Optional[str]
+
 
 class TrinoDialect(DefaultDialect):
-    def __init__(self, base_url=None, json_serializer=None, json_deserializer=None, **kwargs):
+    def __init__(
+        self,
+        base_url=None,
+        json_serializer=None,
+        json_deserializer=None,
+        reflection_cache_ttl=constants.DEFAULT_REFLECTION_CACHE_TTL,
+        reflection_cache_size=constants.DEFAULT_REFLECTION_CACHE_SIZE,
+        reflection_cache_max_bytes=constants.DEFAULT_REFLECTION_CACHE_MAX_BYTES,
+        reflection_max_workers=constants.DEFAULT_REFLECTION_MAX_WORKERS,
+        reflection_snapshot=None,
+        **kwargs
+    ):
         # Initialize the parent class
         DefaultDialect.__init__(self, **kwargs)
         
@@ -40,6 +112,144 @@ class TrinoDialect(DefaultDialect):
         self._json_serializer = json_serializer
         self._json_deserializer = json_deserializer
 
+        # Catalogs, schemas, tables and columns fetched from the REST API, shared by the connections of the engine
+        self._reflection_cache = trino_dbapi.SizeBoundLRUCache(
+            reflection_cache_size, reflection_cache_ttl, reflection_cache_max_bytes
+        ) if reflection_cache_ttl and reflection_cache_size and reflection_cache_max_bytes else None
+        # DBAPI connections whose session changes invalidate the reflection cache
+        self._watched_connections: "weakref.WeakSet[trino_dbapi.Connection]" = weakref.WeakSet()
+        # Reflection requests being fetched, concurrent requests of the same key wait for their result
+        self._reflections_in_flight: Dict[Tuple[Optional[str], ...], Future] = {}
+        self._reflections_lock = threading.Lock()
+        # Number of tables whose columns are fetched in parallel by get_multi_columns
+        self._reflection_max_workers = reflection_max_workers
+        self._reflection_snapshot: Optional[MetadataSnapshot] = None
+        self.reflection_snapshot = reflection_snapshot
+
+    @property
+    def reflection_cache(self) -> Optional[trino_dbapi.SizeBoundLRUCache]:
+        """Cache of reflected metadata, ``None`` when disabled with ``reflection_cache_ttl=0``."""
+        return self._reflection_cache
+
+    @property
+    def reflection_snapshot(self) -> Optional[MetadataSnapshot]:
+        """Metadata snapshot answering reflection, see :func:`pyavrio.sqlalchemy.snapshot.crawl`."""
+        return self._reflection_snapshot
+
+    @reflection_snapshot.setter
+    def reflection_snapshot(self, snapshot: Union[None, str, "os.PathLike[str]", MetadataSnapshot]) -> None:
+        if snapshot is not None and not isinstance(snapshot, MetadataSnapshot):
+            snapshot = MetadataSnapshot.load(snapshot)
+        self._reflection_snapshot = snapshot
+
+    def clear_reflection_cache(self) -> None:
+        """Drop all cached reflection results, e.g. after tables were created or dropped."""
+        if self._reflection_cache is not None:
+            self._reflection_cache.clear()
+
+    def _reflection_key(
+        self, connection: Connection, kind: str, schema: Optional[str], table_name: Optional[str],
+        catalog: Optional[str] = None
+    ) -> Tuple[Optional[str], ...]:
+        catalog = None if kind == "catalogs" else catalog or self._get_default_catalog_name(connection)
+        if kind in ("tables", "table_index", "columns"):
+            schema = schema or self._get_default_schema_name(connection)
+        return (
+            kind,
+            self._get_default_platform(connection),
+            self._get_default_user(connection),
+            catalog,
+            schema,
+            table_name,
+        )
+
+    def _reflect(self, connection: Connection, key: Tuple[Optional[str], ...], fetch: Callable[[], Any],
+                 info_cache: Optional[Dict[Any, Any]] = None) -> Any:
+        if info_cache is not None and key in info_cache:
+            return _copy_reflected(info_cache[key])
+        value = self._from_snapshot(connection, key)
+        if value is not None:
+            return _copy_reflected(value)
+        if self._reflection_cache is not None:
+            self._watch_session(self._raw_connection(connection))
+            value = self._reflection_cache.get(key)
+        if value is None:
+            value = self._fetch_once(key, fetch)
+        if info_cache is not None:
+            info_cache[key] = _copy_reflected(value)
+        return _copy_reflected(value)
+
+    def _from_snapshot(self, connection: Connection, key: Tuple[Optional[str], ...]) -> Any:
+        snapshot = self._reflection_snapshot
+        kind, platform, user, catalog, schema, table_name = key
+        if snapshot is None or not snapshot.matches(self._get_default_host(connection), platform, user):
+            return None
+        if kind == "catalogs":
+            return snapshot.catalog_names()
+        if kind == "schemas":
+            return snapshot.schema_names(catalog)
+        if kind == "tables":
+            return snapshot.table_names(catalog, schema)
+        if kind == "columns":
+            return snapshot.columns(catalog, schema, table_name)
+        return None
+
+    def _fetch_once(self, key: Tuple[Optional[str], ...], fetch: Callable[[], Any]) -> Any:
+        with self._reflections_lock:
+            in_flight = self._reflections_in_flight.get(key)
+            if in_flight is None:
+                future: Future = Future()
+                self._reflections_in_flight[key] = future
+        if in_flight is not None:
+            return in_flight.result()
+        try:
+            value = fetch()
+            if self._reflection_cache is not None:
+                self._reflection_cache.put(key, _copy_reflected(value))
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._reflections_lock:
+                del self._reflections_in_flight[key]
+
+    def _watch_session(self, dbapi_connection: trino_dbapi.Connection) -> None:
+        if isinstance(dbapi_connection, _ReflectionSettings):
+            # Watched by the thread which read the settings
+            return
+        # Pooled connections are proxies, checked out again for every SQLAlchemy connection
+        dbapi_connection = getattr(dbapi_connection, "dbapi_connection", dbapi_connection)
+        with self._reflections_lock:
+            if dbapi_connection in self._watched_connections:
+                return
+            self._watched_connections.add(dbapi_connection)
+        dbapi_connection._client_session.add_session_change_listener(self._invalidate_reflection)
+
+    def _invalidate_reflection(self, client_session) -> None:
+        # Called when the session catalog or schema of a connection changes
+        self._invalidate_user_reflection(client_session.user)
+
+    def _invalidate_user_reflection(self, user: Optional[str]) -> None:
+        if self._reflection_cache is not None:
+            self._reflection_cache.invalidate_where(lambda key: key[2] == user)
+
+    def _name_index(self, connection: Connection, kind: str, schema: Optional[str] = None, **kw) -> FrozenSet[str]:
+        """
+        Hash set of the table names of a schema (``"table_index"``) or of the schema names of
+        a catalog (``"schema_index"``), cached like the lists they are built from. Names missing
+        from the set are reported as missing until the entry expires or DDL is executed.
+        """
+        if kind == "table_index":
+            def fetch():
+                return frozenset(self.get_table_names(connection, schema=schema, **kw))
+        else:
+            def fetch():
+                return frozenset(self.get_schema_names(connection, **kw))
+        key = self._reflection_key(connection, kind, schema, None, kw.get("catalog"))
+        return self._reflect(connection, key, fetch, kw.get("info_cache"))
+
 
     name = "pyavrio"
     driver = "rest"
@@ -114,10 +324,11 @@ class TrinoDialect(DefaultDialect):
             if not url.username:
                 raise ValueError("Username is required when specify password in connection URL")
             kwargs["http_scheme"] = "https"
-            avrio_http_handler = AvrioHTTPHandler("https://"+url.host, access_token=None)
-            token = avrio_http_handler._generate_token(url.username, url.password, url.host)
-            avrio_http_handler = AvrioHTTPHandler("https://"+url.host, access_token=token)
-            kwargs["auth"] = AvrioAuthentication(token)
+            token_cache = url.query.get("token_cache", "memory")
+            kwargs["auth"] = AvrioAuthentication(
+                self._sign_in(url, token_cache),
+                refresh=functools.partial(self._sign_in, url, token_cache),
+            )
         platform = url.query.get('platform')
         if platform:
             kwargs["platform"] = platform
@@ -129,6 +340,19 @@ class TrinoDialect(DefaultDialect):
             kwargs["auth"] = AvrioAuthentication(unquote_plus(url.query["access_token"]))
         return args, kwargs
 
+    @staticmethod
+    def _sign_in(url: URL, token_cache: str, stale_token: Optional[str] = None) -> str:
+        """Access token of the user and password of ``url``, from the token cache unless it has none valid."""
+        def sign_in():
+            avrio_http_handler = AvrioHTTPHandler("https://"+url.host, access_token=None)
+            return avrio_http_handler._generate_token(url.username, url.password, url.host)
+
+        cache = get_token_cache(token_cache)
+        if cache is None:
+            return sign_in()
+        return cache.get_or_sign_in(url.host, url.username, url.password, sign_in, stale_token=stale_token)
+
+    @_reflection_cache("columns")
     def get_columns(self, connection: Connection, table_name: str, schema: str = None, **kw) -> List[Dict[str, Any]]:
         """
         Retrieve columns information for a specified table using REST API calls.
@@ -141,7 +365,7 @@ class TrinoDialect(DefaultDialect):
             connection (Connection): The connection object containing necessary information for authentication and endpoint.
             table_name (str): The name of the table for which columns information is to be retrieved.
             schema (str, optional): The schema to which the specified table belongs.
-            **kw: Additional keyword arguments.
+            **kw: Additional keyword arguments, ``catalog`` overrides the catalog of the connection.
 
         Returns:
             List[Dict[str, Any]]: A list of dictionaries containing information about columns, including their names and data types.
@@ -153,7 +377,9 @@ class TrinoDialect(DefaultDialect):
         auth = self._get_default_auth(connection)
         token = auth.token
         host=self._get_default_host(connection)
-        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token)
+        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token,
+                                              json_decoder=self._get_default_json_decoder(connection),
+                                              accept_encoding=self._get_default_accept_encoding(connection))
         user=self._get_default_user(connection)
         table=table_name   
         if platform == 'data_products':
@@ -164,10 +390,11 @@ class TrinoDialect(DefaultDialect):
                 schema = self._get_default_schema_name(connection)
             if schema is None:
                 raise ValueError("Please provide a schema.")
-            catalog=self._get_default_catalog_name(connection)
+            catalog=kw.get("catalog") or self._get_default_catalog_name(connection)
             columns = avrio_http_handler._get_columns_ds(user, token, catalog, schema, table)
             return columns
 
+    @_reflection_cache("catalogs")
     def get_catalog_names(self, connection: Connection, **kw) -> List[str]:
         """
         Retrieve catalog names from the specified platform using REST API calls.
@@ -191,7 +418,9 @@ class TrinoDialect(DefaultDialect):
         token = auth.token
         host=self._get_default_host(connection)
         user=self._get_default_user(connection)
-        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token)
+        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token,
+                                              json_decoder=self._get_default_json_decoder(connection),
+                                              accept_encoding=self._get_default_accept_encoding(connection))
         if platform == 'data_products':
             catalogs = avrio_http_handler._get_catalogs_dp(user, token)
             return catalogs
@@ -199,6 +428,7 @@ class TrinoDialect(DefaultDialect):
             catalogs = avrio_http_handler._get_catalogs_ds(user, token)
             return catalogs
 
+    @_reflection_cache("schemas")
     def get_schema_names(self, connection: Connection, **kw) -> List[str]:
         
         """
@@ -212,14 +442,14 @@ class TrinoDialect(DefaultDialect):
 
         Parameters:
             connection (Connection): The connection object containing necessary information for authentication, endpoint, and catalog.
-            **kw: Additional keyword arguments.
+            **kw: Additional keyword arguments, ``catalog`` overrides the catalog of the connection.
 
         Returns:
             List[str]: A list of schema names.
         """
         
         platform=self._get_default_platform(connection)
-        catalog=self._get_default_catalog_name(connection)
+        catalog=kw.get("catalog") or self._get_default_catalog_name(connection)
         if not platform or not catalog:
             if not platform:
                 raise ValueError("Please provide a platform.")
@@ -228,7 +458,9 @@ class TrinoDialect(DefaultDialect):
         auth = self._get_default_auth(connection)
         token = auth.token
         host=self._get_default_host(connection)
-        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token)
+        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token,
+                                              json_decoder=self._get_default_json_decoder(connection),
+                                              accept_encoding=self._get_default_accept_encoding(connection))
         user=self._get_default_user(connection)
         if platform == 'data_products':
             if len(catalog)==0 or catalog == 'system':
@@ -243,6 +475,7 @@ class TrinoDialect(DefaultDialect):
             return schemas
 
 
+    @_reflection_cache("tables")
     def get_table_names(self, connection: Connection, schema: str = None, **kw) -> List[str]:
         """
         Retrieve table names from the specified platform and schema using REST API calls.
@@ -256,7 +489,7 @@ class TrinoDialect(DefaultDialect):
         Parameters:
             connection (Connection): The connection object containing necessary information for authentication, endpoint, and schema.
             schema (str, optional): The schema for which table names are to be retrieved. If not provided, the default schema is used.
-            **kw: Additional keyword arguments.
+            **kw: Additional keyword arguments, ``catalog`` overrides the catalog of the connection.
 
         Returns:
             List[str]: A list of table names.
@@ -272,10 +505,12 @@ class TrinoDialect(DefaultDialect):
         auth = self._get_default_auth(connection)
         token = auth.token
         host=self._get_default_host(connection)
-        catalog=self._get_default_catalog_name(connection)
+        catalog=kw.get("catalog") or self._get_default_catalog_name(connection)
         user=self._get_default_user(connection)
         schema=schema
-        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token)
+        avrio_http_handler = AvrioHTTPHandler("https://"+host, access_token=token,
+                                              json_decoder=self._get_default_json_decoder(connection),
+                                              accept_encoding=self._get_default_accept_encoding(connection))
         if platform == 'data_products':
             if len(catalog)==0 or catalog == 'system':
                 params = {"platform": platform, "catalog": 'system', "schema": schema}
@@ -290,6 +525,134 @@ class TrinoDialect(DefaultDialect):
             tables = avrio_http_handler._get_tables_ds(user, catalog, token, schema)
             return tables
 
+    def _get_multi_names(
+        self, connection: Connection, schema: Optional[str], filter_names: Optional[Sequence[str]],
+        kind: ObjectKind, scope: ObjectScope, **kw
+    ) -> List[str]:
+        # Same selection of tables as DefaultDialect._default_multi_reflect, without duplicates
+        kw.pop("unreflectable", None)
+        if filter_names and kind is ObjectKind.ANY and scope is ObjectScope.ANY:
+            names: Iterable[str] = filter_names
+        elif ObjectScope.DEFAULT not in scope:
+            names = []
+        else:
+            names = []
+            if ObjectKind.TABLE in kind:
+                names.extend(self.get_table_names(connection, schema=schema, **kw))
+            if ObjectKind.VIEW in kind:
+                names.extend(self.get_view_names(connection, schema=schema, **kw))
+            if filter_names:
+                names = [name for name in names if name in set(filter_names)]
+        return list(dict.fromkeys(names))
+
+    def get_multi_columns(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], List[Dict[str, Any]]]]:
+        """
+        Retrieve columns information for several tables of a schema at once.
+
+        The columns of each table are fetched with :meth:`get_columns`, up to ``reflection_max_workers``
+        tables in parallel over the pooled REST sessions. The worker threads get the settings of the
+        connection read beforehand, never the connection itself. Tables found in the reflection cache are
+        not fetched again, and tables being fetched by another thread are waited for instead of fetched twice.
+
+        Returns:
+            Iterable of ``((schema, table_name), columns)`` pairs, skipping tables which do not exist.
+        """
+        unreflectable = kw.pop("unreflectable", {})
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+
+        def get_columns(table_name: str) -> Optional[List[Dict[str, Any]]]:
+            try:
+                return self.get_columns(connection, table_name, schema=schema, **kw)
+            except exc.UnreflectableTableError as e:
+                unreflectable.setdefault((schema, table_name), e)
+            except exc.NoSuchTableError:
+                pass
+            return None
+
+        if len(names) > 1 and self._reflection_max_workers > 1:
+            if self._reflection_cache is not None:
+                self._watch_session(self._raw_connection(connection))
+            connection = self._reflection_settings(connection)
+            with ThreadPoolExecutor(max_workers=min(self._reflection_max_workers, len(names))) as executor:
+                columns = list(executor.map(get_columns, names))
+        else:
+            columns = [get_columns(name) for name in names]
+        return [((schema, name), table_columns) for name, table_columns in zip(names, columns)
+                if table_columns is not None]
+
+    def get_multi_pk_constraint(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], Dict[str, Any]]]:
+        """Trino has no support for primary keys. Returns a dummy for every table."""
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+        return [((schema, name), dict(name=None, constrained_columns=[])) for name in names]
+
+    def get_multi_foreign_keys(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], List[Dict[str, Any]]]]:
+        """Trino has no support for foreign keys. Returns an empty list for every table."""
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+        return [((schema, name), []) for name in names]
+
+    def get_multi_indexes(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], List[Dict[str, Any]]]]:
+        """Avrio has no support for indexes. Returns an empty list for every table."""
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+        return [((schema, name), []) for name in names]
+
+    def get_multi_unique_constraints(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], List[Dict[str, Any]]]]:
+        """Trino has no support for unique constraints. Returns an empty list for every table."""
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+        return [((schema, name), []) for name in names]
+
+    def get_multi_check_constraints(
+        self,
+        connection: Connection,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kw
+    ) -> Iterable[Tuple[Tuple[Optional[str], str], List[Dict[str, Any]]]]:
+        """Trino has no support for check constraints. Returns an empty list for every table."""
+        names = self._get_multi_names(connection, schema, filter_names, kind, scope, **kw)
+        return [((schema, name), []) for name in names]
+
     def get_pk_constraint(self, connection: Connection, table_name: str, schema: str = None, **kw) -> Dict[str, Any]:
         """Trino has no support for primary keys. Returns a dummy"""
         return dict(name=None, constrained_columns=[])
@@ -328,8 +691,24 @@ class TrinoDialect(DefaultDialect):
     def _raw_connection(self, connection: Union[Engine, Connection]) -> trino_dbapi.Connection:
         if isinstance(connection, Engine):
             return connection.raw_connection()
+        if isinstance(connection, _ReflectionSettings):
+            return connection
         return connection.connection
 
+    def _reflection_settings(self, connection: Connection) -> _ReflectionSettings:
+        """Settings of ``connection`` for reflection methods called from other threads."""
+        dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
+        return _ReflectionSettings(
+            host=dbapi_connection.host,
+            platform=dbapi_connection.platform,
+            user=dbapi_connection.user,
+            auth=dbapi_connection.auth,
+            catalog=dbapi_connection.catalog,
+            schema=dbapi_connection.schema,
+            json_decoder=dbapi_connection.json_decoder,
+            accept_encoding=dbapi_connection.accept_encoding,
+        )
+
     def _get_default_catalog_name(self, connection: Connection) -> Optional[str]:
         dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
         return dbapi_connection.catalog
@@ -354,6 +733,14 @@ class TrinoDialect(DefaultDialect):
         dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
         return dbapi_connection.user
     
+    def _get_default_json_decoder(self, connection: Connection) -> Optional[Callable[[bytes], Any]]:
+        dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
+        return dbapi_connection.json_decoder
+
+    def _get_default_accept_encoding(self, connection: Connection) -> Optional[str]:
+        dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
+        return dbapi_connection.accept_encoding
+
     def _get_default_table_name(self, connection: Connection) -> Optional[str]:
         dbapi_connection: trino_dbapi.Connection = self._raw_connection(connection)
         return dbapi_connection.table_name
@@ -362,6 +749,16 @@ class TrinoDialect(DefaultDialect):
         self, cursor: Cursor, statement: str, parameters: Tuple[Any, ...], context: DefaultExecutionContext = None
     ):
         cursor.execute(statement, parameters)
+        self._after_execute(cursor, statement)
+
+    def do_execute_no_params(self, cursor: Cursor, statement: str, context: DefaultExecutionContext = None):
+        cursor.execute(statement)
+        self._after_execute(cursor, statement)
+
+    def _after_execute(self, cursor: Cursor, statement: str) -> None:
+        # Created or dropped schemas and tables must not be answered from the cached names
+        if _DDL_STATEMENT.match(statement):
+            self._invalidate_user_reflection(cursor.connection.user)
 
     def do_rollback(self, dbapi_connection: trino_dbapi.Connection):
         if dbapi_connection.transaction is not None:
@@ -385,10 +782,13 @@ class TrinoDialect(DefaultDialect):
         return table_part
     
     def has_table(self, connection: Connection, table_name: str, schema: str = None, **kw) -> bool:
-        get_table_names = self.get_table_names(connection, schema)
-        return len(get_table_names) > 0
+        return table_name in self._name_index(connection, "table_index", schema, **kw)
+
+    def has_schema(self, connection: Connection, schema_name: str, **kw) -> bool:
+        return schema_name in self._name_index(connection, "schema_index", **kw)
 
     def get_view_names(self, connection: Connection, schema: str = None, **kw) -> List[str]:
+        """Views are listed with the tables by the Avrio REST API, see :meth:`has_table`. Returns an empty list."""
         schema = schema or self._get_default_schema_name(connection)
         if schema is None:
             raise exc.NoSuchTableError("schema is required")
@@ -0,0 +1,217 @@
+"""
+This module crawls the metadata of a platform into a snapshot file.
+
+:func:`crawl` walks the catalogs, schemas, tables and columns visible to the user
+of an engine, fetching each level in parallel, and returns a :class:`MetadataSnapshot`.
+Snapshots are saved as gzip compressed JSON. An engine created with
+``reflection_snapshot=<path>`` answers reflection from the snapshot, falling back
+to the REST API for objects it does not contain.
+"""
+import gzip
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import exc
+from sqlalchemy.sql import sqltypes
+from sqlalchemy.sql.type_api import TypeEngine
+
+from pyavrio import constants, logging
+from pyavrio.sqlalchemy import datatype
+
+logger = logging.get_logger(__name__)
+
+__all__ = ["SNAPSHOT_VERSION", "MetadataSnapshot", "crawl"]
+
+# Version of the snapshot file format, snapshots of other versions are rejected
+SNAPSHOT_VERSION = 1
+
+T = TypeVar("T")
+Catalogs = Dict[str, Optional[Dict[str, Optional[Dict[str, Optional[List[Dict[str, Any]]]]]]]]
+
+
+class MetadataSnapshot:
+    """
+    Catalogs, schemas, tables and columns of a platform as seen by a user.
+
+    :param catalogs: columns by table, by schema, by catalog. The value of a catalog,
+        schema or table whose children could not be crawled is ``None``.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str],
+        platform: Optional[str],
+        user: Optional[str],
+        catalogs: Optional[Catalogs] = None,
+        created_at: Optional[str] = None,
+    ):
+        self.host = host
+        self.platform = platform
+        self.user = user
+        self.catalogs: Catalogs = catalogs if catalogs is not None else {}
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+
+    def matches(self, host: Optional[str], platform: Optional[str], user: Optional[str]) -> bool:
+        """Whether the snapshot was crawled for this host, platform and user."""
+        return (self.host, self.platform, self.user) == (host, platform, user)
+
+    def catalog_names(self) -> List[str]:
+        return list(self.catalogs)
+
+    def schema_names(self, catalog: str) -> Optional[List[str]]:
+        schemas = self.catalogs.get(catalog)
+        return None if schemas is None else list(schemas)
+
+    def table_names(self, catalog: str, schema: str) -> Optional[List[str]]:
+        tables = (self.catalogs.get(catalog) or {}).get(schema)
+        return None if tables is None else list(tables)
+
+    def columns(self, catalog: str, schema: str, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        return ((self.catalogs.get(catalog) or {}).get(schema) or {}).get(table_name)
+
+    def to_dict(self, type_compiler) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "created_at": self.created_at,
+            "host": self.host,
+            "platform": self.platform,
+            "user": self.user,
+            "catalogs": {
+                catalog: None if schemas is None else {
+                    schema: None if tables is None else {
+                        table_name: None if columns is None else [
+                            _column_to_dict(column, type_compiler) for column in columns
+                        ]
+                        for table_name, columns in tables.items()
+                    }
+                    for schema, tables in schemas.items()
+                }
+                for catalog, schemas in self.catalogs.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetadataSnapshot":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                "Unsupported metadata snapshot version {}, expected {}".format(data.get("version"), SNAPSHOT_VERSION)
+            )
+        catalogs = {
+            catalog: None if schemas is None else {
+                schema: None if tables is None else {
+                    table_name: None if columns is None else [_column_from_dict(column) for column in columns]
+                    for table_name, columns in tables.items()
+                }
+                for schema, tables in schemas.items()
+            }
+            for catalog, schemas in data["catalogs"].items()
+        }
+        return cls(data.get("host"), data.get("platform"), data.get("user"), catalogs, data.get("created_at"))
+
+    def save(self, path: str, type_compiler=None) -> None:
+        """Write the snapshot to ``path``, replacing any previous snapshot atomically."""
+        if type_compiler is None:
+            from pyavrio.sqlalchemy.dialect import TrinoDialect
+            type_compiler = TrinoDialect().type_compiler_instance
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metadata_snapshot")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(self.to_dict(type_compiler)).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataSnapshot":
+        with gzip.open(path, "rb") as f:
+            return cls.from_dict(json.loads(f.read()))
+
+
+def _column_to_dict(column: Dict[str, Any], type_compiler) -> Dict[str, Any]:
+    column = dict(column)
+    column_type = column.get("type")
+    if isinstance(column_type, TypeEngine):
+        # Types parsed by the REST handler are stored as Trino type signatures and parsed again when loaded
+        try:
+            column["type"] = type_compiler.process(column_type)
+        except exc.CompileError:
+            column["type"] = None
+        column["parsed_type"] = True
+    return column
+
+
+def _column_from_dict(column: Dict[str, Any]) -> Dict[str, Any]:
+    column = dict(column)
+    if column.pop("parsed_type", False):
+        type_str = column.get("type")
+        column["type"] = sqltypes.NULLTYPE if type_str is None else datatype.parse_sqltype(type_str)
+    return column
+
+
+def _map_parallel(fn: Callable[[T], Any], items: Sequence[T], executor: ThreadPoolExecutor) -> List[Tuple[T, Any]]:
+    # Results of failed items are None, the crawl goes on with the other objects
+    def call(item: T) -> Any:
+        try:
+            return fn(item)
+        except Exception as e:
+            logger.warning("Failed to crawl %s: %s", item, e)
+            return None
+
+    return [(item, result) for item, result in zip(items, executor.map(call, items)) if result is not None]
+
+
+def crawl(
+    engine,
+    catalogs: Optional[Sequence[str]] = None,
+    max_workers: int = constants.DEFAULT_REFLECTION_MAX_WORKERS,
+) -> MetadataSnapshot:
+    """
+    Crawl the metadata visible to the user of ``engine`` on its platform.
+
+    Catalogs, then schemas, then tables, then columns are fetched level by level,
+    each level up to ``max_workers`` requests in parallel. Failures are logged and
+    the children of the objects they concern are left out of the snapshot.
+
+    :param engine: an engine created with the ``pyavrio`` dialect.
+    :param catalogs: the catalogs to crawl, all catalogs if ``None``.
+    :param max_workers: number of requests sent in parallel.
+    """
+    # A dialect of its own, so the crawl reads neither the reflection cache nor the snapshot of the engine
+    dialect = type(engine.dialect)(reflection_cache_ttl=0)
+    with engine.connect() as connection, ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        if catalogs is None:
+            catalogs = dialect.get_catalog_names(connection)
+        # SQLAlchemy connections are not thread-safe, the workers only get the settings read here
+        settings = dialect._reflection_settings(connection)
+        snapshot = MetadataSnapshot(
+            settings.host, settings.platform, settings.user, {catalog: None for catalog in catalogs},
+        )
+
+        schemas = _map_parallel(
+            lambda catalog: dialect.get_schema_names(settings, catalog=catalog), list(catalogs), executor,
+        )
+        for catalog, schema_names in schemas:
+            snapshot.catalogs[catalog] = {schema: None for schema in schema_names}
+
+        tables = _map_parallel(
+            lambda item: dialect.get_table_names(settings, schema=item[1], catalog=item[0]),
+            [(catalog, schema) for catalog, schema_names in schemas for schema in schema_names],
+            executor,
+        )
+        for (catalog, schema), table_names in tables:
+            snapshot.catalogs[catalog][schema] = {table_name: None for table_name in table_names}
+
+        columns = _map_parallel(
+            lambda item: dialect.get_columns(settings, item[2], schema=item[1], catalog=item[0]),
+            [(catalog, schema, table_name) for (catalog, schema), table_names in tables for table_name in table_names],
+            executor,
+        )
+        for (catalog, schema, table_name), table_columns in columns:
+            snapshot.catalogs[catalog][schema][table_name] = table_columns
+    return snapshot
@@ -13,9 +13,19 @@ with open(os.path.join(here, "README.md"), "r", "utf-8") as f:
     readme = f.read()
 
 kerberos_require = ["requests_kerberos"]
-sqlalchemy_require = ["sqlalchemy >= 1.3"]
+sqlalchemy_require = ["sqlalchemy >= 2.0"]
 external_authentication_token_cache_require = ["keyring"]
-all_require = kerberos_require + sqlalchemy_require
+orjson_require = ["orjson"]
+numpy_require = ["numpy >= 1.23"]
+pandas_require = ["pandas"] + numpy_require
+pyarrow_require = ["pyarrow"]
+spooling_require = ["zstandard", "lz4"]
+compression_require = ["urllib3[brotli,zstd] >= 2"]
+async_require = ["httpx>=0.27"]
+all_require = (
+    kerberos_require + sqlalchemy_require + orjson_require + pandas_require + pyarrow_require + spooling_require
+    + compression_require + async_require
+)
 
 tests_require = all_require + [
     "httpretty < 1.1",
@@ -63,12 +73,19 @@ setup(
         # requests CVE https://github.com/advisories/GHSA-j8r2-6x86-q33q
         "requests>=2.31.0",
         "tzlocal",
-        "sqlalchemy >= 1.3",
+        "sqlalchemy >= 2.0",
         "sql_metadata==2.11.0"
     ],
     extras_require={
         "all": all_require,
+        "async": async_require,
+        "compression": compression_require,
         "kerberos": kerberos_require,
+        "numpy": numpy_require,
+        "orjson": orjson_require,
+        "pandas": pandas_require,
+        "pyarrow": pyarrow_require,
+        "spooling": spooling_require,
         "sqlalchemy": sqlalchemy_require,
         "tests": tests_require,
         "external-authentication-token-cache": external_authentication_token_cache_require,
@@ -1,7 +1,26 @@
 import unittest
+from sqlalchemy import exc
 from sqlalchemy import types as sqltypes
+from sqlalchemy.sql.base import SchemaEventTarget
 from pyavrio.sqlalchemy.datatype import DOUBLE, MAP, ROW, TIME, TIMESTAMP, parse_sqltype  
 
+def _event_targets(type_):
+    """Ids of the types nested in ``type_`` which attach themselves to their column."""
+    nested = [type_]
+    targets = set()
+    while nested:
+        current = nested.pop()
+        if isinstance(current, SchemaEventTarget):
+            targets.add(id(current))
+        if isinstance(current, sqltypes.ARRAY):
+            nested.append(current.item_type)
+        elif isinstance(current, MAP):
+            nested.extend([current.key_type, current.value_type])
+        elif isinstance(current, ROW):
+            nested.extend(attr_type for _, attr_type in current.attr_types)
+    return targets
+
+
 class TestParseSQLType(unittest.TestCase):
 
     def test_basic_types(self):
@@ -47,5 +66,80 @@ class TestParseSQLType(unittest.TestCase):
         self.assertIsInstance(result, TIMESTAMP)
         self.assertEqual(result.precision, 3)
 
+    def test_timestamp_with_time_zone(self):
+        result = parse_sqltype('timestamp(6) with time zone')
+        self.assertIsInstance(result, TIMESTAMP)
+        self.assertEqual(result.precision, 6)
+        self.assertTrue(result.timezone)
+
+    def test_nested_types(self):
+        result = parse_sqltype('row(a row(b array(array(bigint))), "c d" map(varchar, decimal(10, 2)))')
+        self.assertEqual(result.attr_types[0][0], "a")
+        inner = result.attr_types[0][1].attr_types[0][1]
+        self.assertIsInstance(inner, sqltypes.ARRAY)
+        self.assertEqual(inner.dimensions, 2)
+        self.assertEqual(result.attr_types[1][0], "c d")
+        self.assertEqual(result.attr_types[1][1].value_type.scale, 2)
+
+    def test_anonymous_row_fields(self):
+        result = parse_sqltype('row(integer, varchar(3))')
+        self.assertEqual([name for name, _ in result.attr_types], [None, None])
+        self.assertEqual(result.attr_types[1][1].length, 3)
+
+    def test_immutable_types_are_interned(self):
+        self.assertIs(parse_sqltype('map(varchar, bigint)'), parse_sqltype('map(varchar, bigint)'))
+
+    def test_schema_event_targets_are_copied(self):
+        first = parse_sqltype('array(integer)')
+        second = parse_sqltype('array(integer)')
+        self.assertIsNot(first, second)
+        self.assertEqual(repr(first), repr(second))
+        self.assertIsNot(parse_sqltype('boolean'), parse_sqltype('boolean'))
+
+    def test_nested_schema_event_targets_are_copied(self):
+        for type_str in ('map(varchar, boolean)', 'row(a bigint, b array(boolean))', 'array(row(flag boolean))'):
+            first = parse_sqltype(type_str)
+            second = parse_sqltype(type_str)
+            with self.subTest(type_str=type_str):
+                self.assertEqual(repr(first), repr(second))
+                self.assertTrue(_event_targets(first))
+                self.assertTrue(_event_targets(first).isdisjoint(_event_targets(second)))
+
+    def test_nested_immutable_types_are_shared(self):
+        first = parse_sqltype('row(a bigint, b array(boolean))')
+        second = parse_sqltype('row(a bigint, b array(boolean))')
+        self.assertIs(first.attr_types[0][1], second.attr_types[0][1])
+
+    def test_unrecognized_type_is_not_interned(self):
+        for _ in range(2):
+            with self.assertWarns(Warning):
+                self.assertEqual(parse_sqltype('array(unknown_type)').item_type, sqltypes.NULLTYPE)
+
+
+class TestTypeCompilerRoundTrip(unittest.TestCase):
+
+    def setUp(self):
+        from pyavrio.sqlalchemy.dialect import TrinoDialect
+        self.type_compiler = TrinoDialect().type_compiler_instance
+
+    def test_compiled_types_parse_back(self):
+        types = [
+            sqltypes.ARRAY(sqltypes.INTEGER()),
+            sqltypes.ARRAY(sqltypes.VARCHAR(), dimensions=2),
+            MAP(sqltypes.VARCHAR(), sqltypes.ARRAY(DOUBLE())),
+            ROW([("name", sqltypes.VARCHAR()), ("b c", sqltypes.INTEGER()), ("from", sqltypes.BIGINT())]),
+            sqltypes.ARRAY(ROW([("x", DOUBLE()), ("tags", MAP(sqltypes.VARCHAR(), sqltypes.VARCHAR()))])),
+        ]
+        for type_ in types:
+            compiled = self.type_compiler.process(type_)
+            with self.subTest(compiled=compiled):
+                self.assertEqual(repr(parse_sqltype(compiled)), repr(type_))
+                self.assertEqual(self.type_compiler.process(parse_sqltype(compiled)), compiled)
+
+    def test_row_with_anonymous_fields(self):
+        with self.assertRaises(exc.CompileError):
+            self.type_compiler.process(ROW([(None, sqltypes.BIGINT()), ("name", sqltypes.VARCHAR())]))
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
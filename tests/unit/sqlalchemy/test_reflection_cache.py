@@ -0,0 +1,330 @@
+import threading
+import time
+from unittest.mock import Mock, PropertyMock, patch
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.engine.reflection import ObjectKind, ObjectScope
+from sqlalchemy.sql import sqltypes
+
+from pyavrio import PyAvrioFunctions
+from pyavrio.auth import AvrioAuthentication
+from pyavrio.avrio_rest_handler import AvrioHTTPHandler
+from pyavrio.dbapi import Connection
+from pyavrio.sqlalchemy.dialect import TrinoDialect
+
+COLUMNS = [{"name": "id", "type": sqltypes.BIGINT(), "nullable": "YES"}]
+
+
+def _connection(user="user@example.com", schema="schema"):
+    connection = Mock()
+    connection.connection = Connection(
+        "avrio.example.com", user=user, catalog="catalog", schema=schema, platform="data_sources",
+        auth=AvrioAuthentication("token"), http_scheme="https",
+    )
+    return connection
+
+
+@pytest.fixture
+def get_tables_ds():
+    with patch.object(AvrioHTTPHandler, "_get_tables_ds", return_value=["orders", "users"]) as mock:
+        yield mock
+
+
+@pytest.fixture
+def get_columns_ds():
+    with patch.object(AvrioHTTPHandler, "_get_columns_ds", return_value=COLUMNS) as mock:
+        yield mock
+
+
+def test_tables_are_cached(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    assert dialect.get_table_names(connection) == ["orders", "users"]
+    assert dialect.get_table_names(connection, "schema") == ["orders", "users"]
+    assert dialect.get_table_names(_connection(), schema="schema") == ["orders", "users"]
+
+    get_tables_ds.assert_called_once()
+
+
+def test_key_includes_user_schema_and_table(get_tables_ds, get_columns_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    dialect.get_table_names(connection, "schema")
+    dialect.get_table_names(connection, "other_schema")
+    dialect.get_table_names(_connection(user="other@example.com"), "schema")
+    dialect.get_columns(connection, "orders")
+    dialect.get_columns(connection, "users")
+    dialect.get_columns(connection, "users", schema="schema")
+
+    assert get_tables_ds.call_count == 3
+    assert get_columns_ds.call_count == 2
+
+
+def test_cached_results_are_copies(get_columns_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    columns = dialect.get_columns(connection, "orders")
+    columns[0]["type"] = None
+    columns.append({"name": "extra"})
+
+    assert dialect.get_columns(connection, "orders") == COLUMNS
+
+
+def test_clear_reflection_cache(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+    dialect.get_table_names(connection)
+
+    dialect.clear_reflection_cache()
+    dialect.get_table_names(connection)
+
+    assert get_tables_ds.call_count == 2
+
+
+def test_session_change_invalidates_cache(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+    dialect.get_table_names(connection, "schema")
+
+    connection.connection._client_session.schema = "other_schema"
+    dialect.get_table_names(connection, "schema")
+
+    listeners = connection.connection._client_session._session_change_listeners
+    assert get_tables_ds.call_count == 2
+    assert listeners.count(dialect._invalidate_reflection) == 1
+
+
+def test_ttl(get_tables_ds):
+    dialect = TrinoDialect(reflection_cache_ttl=60)
+    connection = _connection()
+    dialect.get_table_names(connection)
+
+    with patch("pyavrio.dbapi.time", return_value=2 ** 40):
+        dialect.get_table_names(connection)
+
+    assert get_tables_ds.call_count == 2
+
+
+def test_size_limit(get_tables_ds):
+    dialect = TrinoDialect(reflection_cache_size=1)
+    connection = _connection()
+
+    dialect.get_table_names(connection, "schema")
+    dialect.get_table_names(connection, "other_schema")
+    dialect.get_table_names(connection, "schema")
+
+    assert get_tables_ds.call_count == 3
+    assert len(dialect.reflection_cache) == 1
+
+
+def test_info_cache_without_reflection_cache(get_tables_ds):
+    dialect = TrinoDialect(reflection_cache_ttl=0)
+    connection = _connection()
+    info_cache = {}
+
+    dialect.get_table_names(connection, info_cache=info_cache)
+    dialect.get_table_names(connection, info_cache=info_cache)
+    dialect.get_table_names(connection, info_cache={})
+
+    assert dialect.reflection_cache is None
+    assert get_tables_ds.call_count == 2
+
+
+def test_errors_are_not_cached(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+    get_tables_ds.side_effect = [RuntimeError("unavailable"), ["orders"]]
+
+    with pytest.raises(RuntimeError):
+        dialect.get_table_names(connection)
+
+    assert dialect.get_table_names(connection) == ["orders"]
+
+
+def test_get_multi_columns(get_tables_ds, get_columns_ds):
+    dialect = TrinoDialect()
+
+    columns = dict(dialect.get_multi_columns(_connection(), schema="schema"))
+
+    assert columns == {("schema", "orders"): COLUMNS, ("schema", "users"): COLUMNS}
+    get_tables_ds.assert_called_once()
+    assert get_columns_ds.call_count == 2
+
+
+def test_get_multi_columns_filter_names(get_tables_ds, get_columns_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    columns = dialect.get_multi_columns(
+        connection, filter_names=["users", "users"], kind=ObjectKind.ANY, scope=ObjectScope.ANY,
+    )
+
+    assert [key for key, _ in columns] == [(None, "users")]
+    get_tables_ds.assert_not_called()
+    assert [args[-1] for args, _ in get_columns_ds.call_args_list] == ["users"]
+
+
+def test_get_multi_columns_in_parallel(get_tables_ds, get_columns_ds):
+    tables = ["table_{}".format(i) for i in range(16)]
+    get_tables_ds.return_value = tables
+    lock = threading.Lock()
+    running = []
+    concurrency = []
+
+    def get_columns(user, token, catalog, schema, table):
+        with lock:
+            running.append(table)
+            concurrency.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(table)
+        return [{"name": table}]
+
+    get_columns_ds.side_effect = get_columns
+    dialect = TrinoDialect(reflection_max_workers=4)
+
+    columns = dialect.get_multi_columns(_connection(), schema="schema")
+
+    assert [(key, value) for key, value in columns] == [(("schema", t), [{"name": t}]) for t in tables]
+    assert 1 < max(concurrency) <= 4
+
+
+def test_get_multi_columns_uses_connection_on_calling_thread_only(get_tables_ds, get_columns_ds):
+    get_tables_ds.return_value = ["table_{}".format(i) for i in range(8)]
+    dbapi_connection = _connection().connection
+    threads = set()
+    connection = Mock()
+    type(connection).connection = PropertyMock(
+        side_effect=lambda: threads.add(threading.current_thread()) or dbapi_connection
+    )
+    dialect = TrinoDialect(reflection_max_workers=4)
+
+    columns = dialect.get_multi_columns(connection, schema="schema")
+
+    assert len(columns) == 8
+    assert get_columns_ds.call_count == 8
+    assert threads == {threading.current_thread()}
+    # The session of the connection is still watched for catalog changes
+    dbapi_connection._client_session.catalog = "other_catalog"
+    assert len(dialect.reflection_cache) == 0
+
+
+def test_get_multi_columns_skips_missing_tables(get_tables_ds, get_columns_ds):
+    get_columns_ds.side_effect = [exc.NoSuchTableError("orders"), COLUMNS]
+    dialect = TrinoDialect(reflection_max_workers=1)
+
+    assert dict(dialect.get_multi_columns(_connection(), schema="schema")) == {("schema", "users"): COLUMNS}
+
+
+def test_in_flight_requests_are_deduplicated(get_columns_ds):
+    started = threading.Event()
+    release = threading.Event()
+
+    def get_columns(*args):
+        started.set()
+        release.wait(5)
+        return COLUMNS
+
+    get_columns_ds.side_effect = get_columns
+    dialect = TrinoDialect(reflection_cache_ttl=0)
+    connection = _connection()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(dialect.get_columns(connection, "orders")))
+               for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [COLUMNS] * 3
+    get_columns_ds.assert_called_once()
+
+
+def test_get_multi_pk_constraint(get_tables_ds):
+    dialect = TrinoDialect()
+
+    constraints = dict(dialect.get_multi_pk_constraint(_connection(), schema="schema"))
+
+    assert constraints == {
+        ("schema", "orders"): {"name": None, "constrained_columns": []},
+        ("schema", "users"): {"name": None, "constrained_columns": []},
+    }
+
+
+def test_get_tables_columns(get_columns_ds):
+    dialect = TrinoDialect()
+    engine = Mock(dialect=dialect)
+    engine.connect.return_value.__enter__ = Mock(return_value=_connection())
+    engine.connect.return_value.__exit__ = Mock(return_value=False)
+
+    columns = PyAvrioFunctions.get_tables_columns(engine, schema="schema", tables=["orders", "users"])
+
+    assert columns == {"orders": COLUMNS, "users": COLUMNS}
+
+
+def test_has_table(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    assert dialect.has_table(connection, "orders")
+    assert dialect.has_table(connection, "users", schema="schema")
+    assert not dialect.has_table(connection, "missing")
+    assert not dialect.has_table(connection, "missing")
+
+    get_tables_ds.assert_called_once()
+
+
+def test_has_table_per_schema(get_tables_ds):
+    get_tables_ds.side_effect = lambda user, catalog, token, schema: ["orders"] if schema == "schema" else []
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    assert dialect.has_table(connection, "orders", schema="schema")
+    assert not dialect.has_table(connection, "orders", schema="other_schema")
+    assert get_tables_ds.call_count == 2
+
+
+def test_has_table_refreshed_after_ttl(get_tables_ds):
+    dialect = TrinoDialect(reflection_cache_ttl=60)
+    connection = _connection()
+    assert not dialect.has_table(connection, "created")
+
+    get_tables_ds.return_value = ["created"]
+    with patch("pyavrio.dbapi.time", return_value=2 ** 40):
+        assert dialect.has_table(connection, "created")
+
+
+def test_ddl_invalidates_table_index(get_tables_ds):
+    dialect = TrinoDialect()
+    connection = _connection()
+    cursor = Mock()
+    cursor.connection.user = "user@example.com"
+    assert not dialect.has_table(connection, "created")
+
+    get_tables_ds.return_value = ["created"]
+    dialect.do_execute(cursor, "SELECT * FROM orders", ())
+    assert not dialect.has_table(connection, "created")
+    dialect.do_execute_no_params(cursor, "\n  create table created (id bigint)")
+    assert dialect.has_table(connection, "created")
+
+    assert get_tables_ds.call_count == 2
+
+
+def test_has_schema():
+    dialect = TrinoDialect()
+    connection = _connection()
+
+    with patch.object(AvrioHTTPHandler, "_get_schemas_ds", return_value=["schema", "other_schema"]) as get_schemas_ds:
+        assert dialect.has_schema(connection, "other_schema")
+        assert not dialect.has_schema(connection, "missing")
+        assert dialect.has_schema(connection, "schema")
+
+    get_schemas_ds.assert_called_once()
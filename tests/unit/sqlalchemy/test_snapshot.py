@@ -0,0 +1,195 @@
+import gzip
+import json
+import threading
+import time
+from unittest.mock import Mock, PropertyMock, patch
+
+import pytest
+from sqlalchemy.sql import sqltypes
+
+from pyavrio import PyAvrioFunctions
+from pyavrio.auth import AvrioAuthentication
+from pyavrio.avrio_rest_handler import AvrioHTTPHandler
+from pyavrio.dbapi import Connection
+from pyavrio.sqlalchemy import datatype
+from pyavrio.sqlalchemy.dialect import TrinoDialect
+from pyavrio.sqlalchemy.snapshot import SNAPSHOT_VERSION, MetadataSnapshot, crawl
+
+HOST = "avrio.example.com"
+USER = "user@example.com"
+SCHEMAS = {"sales": ["public", "archive"], "hr": ["public"]}
+TABLES = {("sales", "public"): ["orders", "users"], ("sales", "archive"): ["orders_2020"], ("hr", "public"): []}
+
+
+def _connection(platform="data_sources"):
+    connection = Mock()
+    connection.connection = Connection(
+        HOST, user=USER, catalog="sales", schema="public", platform=platform,
+        auth=AvrioAuthentication("token"), http_scheme="https",
+    )
+    return connection
+
+
+def _engine(dialect=None, platform="data_sources"):
+    engine = Mock(dialect=dialect or TrinoDialect())
+    engine.connect.return_value.__enter__ = Mock(return_value=_connection(platform))
+    engine.connect.return_value.__exit__ = Mock(return_value=False)
+    return engine
+
+
+def _columns(user, token, catalog, schema, table):
+    return [{"name": "{}_id".format(table), "type": "bigint", "nullable": "YES"}]
+
+
+@pytest.fixture
+def rest_api():
+    with patch.object(AvrioHTTPHandler, "_get_catalogs_ds", return_value=["sales", "hr"]) as catalogs, \
+            patch.object(AvrioHTTPHandler, "_get_schemas_ds",
+                         side_effect=lambda user, catalog, token: SCHEMAS[catalog]) as schemas, \
+            patch.object(AvrioHTTPHandler, "_get_tables_ds",
+                         side_effect=lambda user, catalog, token, schema: TABLES[(catalog, schema)]) as tables, \
+            patch.object(AvrioHTTPHandler, "_get_columns_ds", side_effect=_columns) as columns:
+        yield Mock(catalogs=catalogs, schemas=schemas, tables=tables, columns=columns)
+
+
+def test_crawl(rest_api):
+    snapshot = crawl(_engine(), max_workers=4)
+
+    assert (snapshot.host, snapshot.platform, snapshot.user) == (HOST, "data_sources", USER)
+    assert snapshot.catalog_names() == ["sales", "hr"]
+    assert snapshot.schema_names("sales") == ["public", "archive"]
+    assert snapshot.table_names("hr", "public") == []
+    assert snapshot.columns("sales", "archive", "orders_2020") == _columns(None, None, None, None, "orders_2020")
+    assert rest_api.columns.call_count == 3
+
+
+def test_crawl_uses_connection_on_calling_thread_only(rest_api):
+    dbapi_connection = _connection().connection
+    threads = set()
+    connection = Mock()
+    type(connection).connection = PropertyMock(
+        side_effect=lambda: threads.add(threading.current_thread()) or dbapi_connection
+    )
+    engine = _engine()
+    engine.connect.return_value.__enter__ = Mock(return_value=connection)
+    lock = threading.Lock()
+    running = []
+    concurrency = []
+
+    def get_columns(user, token, catalog, schema, table):
+        with lock:
+            running.append(table)
+            concurrency.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(table)
+        return _columns(user, token, catalog, schema, table)
+
+    rest_api.columns.side_effect = get_columns
+
+    snapshot = crawl(engine, max_workers=4)
+
+    assert snapshot.table_names("sales", "public") == ["orders", "users"]
+    assert rest_api.columns.call_count == 3
+    assert max(concurrency) > 1
+    assert threads == {threading.current_thread()}
+
+
+def test_crawl_catalogs(rest_api):
+    snapshot = crawl(_engine(), catalogs=["hr"])
+
+    assert snapshot.catalog_names() == ["hr"]
+    rest_api.catalogs.assert_not_called()
+
+
+def test_crawl_failures_are_left_out(rest_api):
+    def get_tables(user, catalog, token, schema):
+        if schema == "archive":
+            raise RuntimeError("unavailable")
+        return TABLES[(catalog, schema)]
+
+    rest_api.tables.side_effect = get_tables
+
+    snapshot = crawl(_engine())
+
+    assert snapshot.schema_names("sales") == ["public", "archive"]
+    assert snapshot.table_names("sales", "archive") is None
+    assert snapshot.table_names("sales", "public") == ["orders", "users"]
+
+
+def test_save_and_load(rest_api, tmp_path):
+    path = str(tmp_path / "metadata.json.gz")
+
+    PyAvrioFunctions.save_metadata_snapshot(_engine(), path)
+    snapshot = MetadataSnapshot.load(path)
+
+    with gzip.open(path, "rb") as f:
+        assert json.loads(f.read())["version"] == SNAPSHOT_VERSION
+    assert snapshot.catalogs == crawl(_engine()).catalogs
+    assert list(tmp_path.iterdir()) == [tmp_path / "metadata.json.gz"]
+
+
+def test_load_unsupported_version(tmp_path):
+    path = str(tmp_path / "metadata.json.gz")
+    with gzip.open(path, "wb") as f:
+        f.write(json.dumps({"version": SNAPSHOT_VERSION + 1, "catalogs": {}}).encode("utf-8"))
+
+    with pytest.raises(ValueError, match="version"):
+        MetadataSnapshot.load(path)
+
+
+def test_parsed_types_round_trip(tmp_path):
+    path = str(tmp_path / "metadata.json.gz")
+    types = ["bigint", "decimal(10, 2)", "array(row(a integer, \"b c\" varchar))", "map(varchar, array(double))",
+             "timestamp(3) with time zone"]
+    columns = [{"name": str(i), "type": datatype.parse_sqltype(t), "nullable": "YES"} for i, t in enumerate(types)]
+    columns.append({"name": "unknown", "type": sqltypes.NULLTYPE, "nullable": "YES"})
+    MetadataSnapshot(HOST, "data_products", USER, {"domain": {"sub": {"product": columns}}}).save(path)
+
+    loaded = MetadataSnapshot.load(path).columns("domain", "sub", "product")
+
+    assert [repr(column["type"]) for column in loaded] == [repr(column["type"]) for column in columns]
+
+
+def test_reflection_from_snapshot(rest_api):
+    snapshot = crawl(_engine())
+    rest_api.reset_mock()
+    dialect = TrinoDialect(reflection_snapshot=snapshot)
+    connection = _connection()
+
+    assert dialect.get_catalog_names(connection) == ["sales", "hr"]
+    assert dialect.get_schema_names(connection) == ["public", "archive"]
+    assert dialect.get_schema_names(connection, catalog="hr") == ["public"]
+    assert dialect.get_table_names(connection) == ["orders", "users"]
+    assert dialect.get_columns(connection, "orders") == _columns(None, None, None, None, "orders")
+    assert rest_api.method_calls == []
+
+
+def test_reflection_falls_back_to_rest_api(rest_api):
+    snapshot = MetadataSnapshot(HOST, "data_sources", USER, {"sales": None})
+    dialect = TrinoDialect(reflection_snapshot=snapshot)
+
+    assert dialect.get_catalog_names(_connection()) == ["sales"]
+    assert dialect.get_schema_names(_connection()) == ["public", "archive"]
+    assert dialect.get_table_names(_connection(), catalog="hr", schema="public") == []
+    rest_api.catalogs.assert_not_called()
+    rest_api.schemas.assert_called_once()
+    rest_api.tables.assert_called_once()
+
+
+def test_snapshot_of_other_user_is_ignored(rest_api):
+    dialect = TrinoDialect(reflection_snapshot=MetadataSnapshot(HOST, "data_sources", "other@example.com", {}))
+
+    assert dialect.get_catalog_names(_connection()) == ["sales", "hr"]
+    rest_api.catalogs.assert_called_once()
+
+
+def test_reflection_snapshot_from_path(rest_api, tmp_path):
+    path = str(tmp_path / "metadata.json.gz")
+    crawl(_engine()).save(path)
+
+    dialect = TrinoDialect(reflection_snapshot=path)
+
+    assert dialect.reflection_snapshot.catalog_names() == ["sales", "hr"]
+    dialect.reflection_snapshot = None
+    assert dialect.reflection_snapshot is None
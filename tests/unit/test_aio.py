@@ -0,0 +1,338 @@
+import asyncio
+import json
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from pyavrio import constants
+from pyavrio.auth import AvrioAuthentication
+from pyavrio.dbapi import TimeBoundLRUCache
+from pyavrio.endpoints import AvrioEndpoints
+from pyavrio.exceptions import NotSupportedError
+
+httpx = pytest.importorskip("httpx")
+from pyavrio import aio  # noqa: E402
+
+HOST = "avrio.example.com"
+STATEMENT_URL = "https://{}:443{}".format(HOST, constants.URL_STATEMENT_PATH)
+COLUMNS = [{"name": "id", "type": "bigint", "typeSignature": {"rawType": "bigint", "arguments": []}}]
+
+
+class FakeCoordinator:
+    """Rewrite service and coordinator answering queries of ``pages`` result pages."""
+
+    def __init__(self, pages=((1, 2), (3,)), delay=0.0, columns=COLUMNS):
+        self.pages = pages
+        self.columns = columns
+        self.delay = delay
+        self.requests = []
+        self.statements = []
+        self.rewrites = 0
+        self.cancelled = set()
+
+    def _status(self, query_id, page):
+        status = {"id": query_id, "stats": {"state": "RUNNING"}, "infoUri": "https://{}/ui/{}".format(HOST, query_id)}
+        if page < len(self.pages):
+            status["nextUri"] = "{}/{}/{}".format(STATEMENT_URL, query_id, page + 1)
+        if page > 0:
+            status["columns"] = self.columns
+            status["data"] = [[value] for value in self.pages[page - 1]]
+        return status
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if request.url.path == AvrioEndpoints.MODIFIED_QUERY:
+            self.rewrites += 1
+            sql = json.loads(request.content)["inputQuerySql"]
+            return httpx.Response(200, json={"isMetadataQuery": False, "finalModifiedSQL": sql + " /* rewritten */"})
+        if request.method == "POST":
+            self.statements.append(request.content.decode("utf-8"))
+            return httpx.Response(200, json=self._status("q{}".format(len(self.statements)), 0))
+        query_id, page = request.url.path.split("/")[-2:]
+        if request.method == "DELETE":
+            self.cancelled.add(query_id)
+            return httpx.Response(204)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json=self._status(query_id, int(page)))
+
+
+def _connection(coordinator, **kwargs):
+    kwargs.setdefault("auth", AvrioAuthentication("token"))
+    return aio.connect(
+        HOST, user="user@example.com", catalog="sales", schema="public", platform="data_sources",
+        http_scheme="https", http_client=httpx.AsyncClient(transport=httpx.MockTransport(coordinator)), **kwargs,
+    )
+
+
+def test_execute_and_iterate():
+    coordinator = FakeCoordinator()
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            cursor = connection.cursor()
+            assert await cursor.execute("SELECT id FROM orders") is cursor
+            rows = [row async for row in cursor]
+            return cursor, rows
+
+    cursor, rows = asyncio.run(run())
+
+    assert rows == [[1], [2], [3]]
+    assert coordinator.statements == ["SELECT id FROM orders /* rewritten */"]
+    assert cursor.query_id == "q1"
+    assert [column.name for column in cursor.description] == ["id"]
+    assert coordinator.requests[1].headers["Authorization"] == "Bearer token"
+    assert coordinator.requests[1].headers[constants.HEADER_CATALOG] == "sales"
+
+
+def test_fetch_methods():
+    async def run():
+        async with _connection(FakeCoordinator(pages=((1, 2), (3, 4), (5,)))) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT id FROM orders")
+            return await cursor.fetchone(), await cursor.fetchmany(2), await cursor.fetchall(), await cursor.fetchone()
+
+    assert asyncio.run(run()) == ([1], [[2], [3]], [[4], [5]], None)
+
+
+def test_parameters_are_bound():
+    coordinator = FakeCoordinator()
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            await connection.cursor().execute("SELECT id FROM orders WHERE name = ?", ["o'hara"])
+
+    asyncio.run(run())
+
+    assert coordinator.statements == [
+        "EXECUTE IMMEDIATE 'SELECT id FROM orders WHERE name = ?' USING 'o''hara' /* rewritten */"
+    ]
+
+
+def test_concurrent_queries():
+    coordinator = FakeCoordinator(delay=0.01)
+
+    async def run():
+        async with _connection(coordinator, modified_query_cache_size=0) as connection:
+            async def query(i):
+                cursor = connection.cursor()
+                await cursor.execute("SELECT id FROM orders_{}".format(i))
+                return await cursor.fetchall()
+
+            return await asyncio.gather(*(query(i) for i in range(200)))
+
+    results = asyncio.run(run())
+
+    assert results == [[[1], [2], [3]]] * 200
+    assert coordinator.rewrites == 200
+    assert len(coordinator.statements) == 200
+
+
+def test_rewrite_is_cached():
+    coordinator = FakeCoordinator()
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            for _ in range(2):
+                await connection.cursor().execute("SELECT id FROM orders")
+            return connection.modified_query_cache
+
+    cache = asyncio.run(run())
+
+    assert coordinator.rewrites == 1
+    assert isinstance(cache, TimeBoundLRUCache) and len(cache) == 1
+
+
+def test_cancel():
+    coordinator = FakeCoordinator()
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT id FROM orders")
+            await cursor.cancel()
+            return cursor
+
+    cursor = asyncio.run(run())
+
+    assert coordinator.cancelled == {"q1"}
+    assert cursor._query.cancelled
+
+
+def test_cancelled_task_cancels_query():
+    coordinator = FakeCoordinator(pages=((1,),) * 100, delay=0.05)
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT id FROM orders")
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(cursor.fetchall(), timeout=0.2)
+            return cursor
+
+    cursor = asyncio.run(run())
+
+    assert coordinator.cancelled == {"q1"}
+    assert cursor._query.cancelled
+
+
+def test_retry_on_service_unavailable():
+    coordinator = FakeCoordinator()
+    responses = [httpx.Response(503)]
+
+    async def handler(request):
+        if request.method == "GET" and responses:
+            return responses.pop()
+        return await coordinator(request)
+
+    async def run():
+        connection = aio.connect(
+            HOST, user="user@example.com", platform="data_sources", http_scheme="https",
+            auth=AvrioAuthentication("token"), http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        cursor = connection.cursor()
+        cursor._request._retry_delay = lambda attempt: 0
+        await cursor.execute("SELECT id FROM orders")
+        rows = await cursor.fetchall()
+        await connection.close()
+        return rows
+
+    assert asyncio.run(run()) == [[1], [2], [3]]
+
+
+def test_unauthorized_request_retried_with_refreshed_token():
+    coordinator = FakeCoordinator()
+    refresh = Mock(return_value="new_token")
+
+    async def handler(request):
+        if request.headers["Authorization"] != "Bearer new_token":
+            return httpx.Response(401)
+        return await coordinator(request)
+
+    async def run():
+        connection = aio.connect(
+            HOST, user="user@example.com", platform="data_sources", http_scheme="https",
+            auth=AvrioAuthentication("token", refresh=refresh),
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        cursor = connection.cursor()
+        await cursor.execute("SELECT id FROM orders")
+        rows = await cursor.fetchall()
+        await connection.close()
+        return rows
+
+    assert asyncio.run(run()) == [[1], [2], [3]]
+    refresh.assert_called_once_with("token")
+
+
+def test_transactions_are_not_supported():
+    from pyavrio.transaction import IsolationLevel
+
+    with pytest.raises(NotSupportedError):
+        aio.connect(HOST, auth=AvrioAuthentication("token"), isolation_level=IsolationLevel.READ_COMMITTED)
+    with pytest.raises(NotSupportedError):
+        aio.connect(HOST, auth=AvrioAuthentication("token"), prefetch_pages=2)
+
+
+def test_request_state_is_shared_with_trino_request():
+    from pyavrio.client import ClientSession
+
+    http_client = httpx.AsyncClient()
+    session = ClientSession(user="user@example.com", catalog="sales")
+    request = aio.AsyncTrinoRequest(HOST, constants.DEFAULT_TLS_PORT, session, http_client)
+
+    assert request._http_scheme == constants.HTTPS
+    assert request.next_uri is None
+    assert request.http_headers[constants.HEADER_CATALOG] == "sales"
+    assert not hasattr(request, "_http_session")
+    with pytest.raises(ValueError, match="cannot use authentication with HTTP"):
+        aio.AsyncTrinoRequest(HOST, 8080, session, http_client, auth=AvrioAuthentication("token"))
+    asyncio.run(http_client.aclose())
+
+
+def test_accept_encoding_lists_codings_with_importable_decoders(monkeypatch):
+    import importlib.util
+
+    find_spec = importlib.util.find_spec
+    aio._decodable_codings.cache_clear()
+    monkeypatch.setattr(
+        importlib.util, "find_spec", lambda name: None if name in ("brotli", "brotlicffi") else find_spec(name)
+    )
+    try:
+        assert "br" not in aio._decodable_codings()
+        assert aio._accept_encoding("auto").split(",")[-2:] == ["gzip", "deflate"]
+        assert aio._accept_encoding(None) == "identity"
+    finally:
+        aio._decodable_codings.cache_clear()
+
+
+def test_no_requests_session_is_created():
+    async def run():
+        async with _connection(FakeCoordinator()) as connection:
+            await connection.cursor().execute("SELECT id FROM orders")
+            return connection
+
+    assert asyncio.run(run())._http_session is None
+    with pytest.raises(NotSupportedError, match="http_client"):
+        aio.connect(HOST, auth=AvrioAuthentication("token"), http_session=Mock())
+
+
+def test_cancel_does_not_wait_for_fetch_in_flight():
+    coordinator = FakeCoordinator(delay=1)
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT id FROM orders")
+            fetch = asyncio.ensure_future(cursor.fetchall())
+            await asyncio.sleep(0.05)
+            await asyncio.wait_for(cursor.cancel(), timeout=0.5)
+            fetch.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await fetch
+            return cursor
+
+    cursor = asyncio.run(run())
+
+    assert coordinator.cancelled == {"q1"}
+    assert cursor._query.cancelled
+
+
+def test_unsupported_authentication_is_rejected():
+    from requests.auth import HTTPBasicAuth
+
+    with pytest.raises(ValueError, match="AvrioAuthentication"):
+        aio.connect(HOST, auth=HTTPBasicAuth("user", "password"))
+
+
+def test_query_does_not_inherit_synchronous_methods():
+    from pyavrio.client import TrinoQuery
+
+    async def run():
+        async with _connection(FakeCoordinator()) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT id FROM orders")
+            rows = await cursor.fetchall()
+            with pytest.raises(NotSupportedError):
+                connection.cursor(prefetch_pages=2)
+            return cursor._query, rows
+
+    query, rows = asyncio.run(run())
+
+    assert not isinstance(query, TrinoQuery)
+    assert not hasattr(query, "is_finished")
+    assert rows == [[1], [2], [3]]
+    assert query.finished and query.query_id == "q1" and query.stats["queryId"] == "q1"
+
+
+def test_rows_are_converted():
+    columns = [{"name": "day", "type": "date", "typeSignature": {"rawType": "date", "arguments": []}}]
+    coordinator = FakeCoordinator(pages=(("2024-01-31",), ("2024-02-01",)), columns=columns)
+
+    async def run():
+        async with _connection(coordinator) as connection:
+            cursor = connection.cursor()
+            await cursor.execute("SELECT day FROM orders")
+            return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [[date(2024, 1, 31)], [date(2024, 2, 1)]]
@@ -0,0 +1,114 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+
+from pyavrio.client import RowMapperFactory, TrinoResult
+from pyavrio.dbapi import Connection, Cursor
+from pyavrio.exceptions import TrinoDataError
+
+pa = pytest.importorskip("pyarrow")
+from pyavrio.arrow import arrow_type, iter_record_batches, to_record_batch  # noqa: E402
+
+
+def _long(value):
+    return {"kind": "LONG", "value": value}
+
+
+def _signature(raw_type, arguments=()):
+    return {"rawType": raw_type, "arguments": list(arguments)}
+
+
+def _column(name, type_signature):
+    return {"name": name, "type": type_signature["rawType"], "typeSignature": type_signature}
+
+
+COLUMNS = [
+    _column("id", _signature("bigint")),
+    _column("score", _signature("double")),
+    _column("amount", _signature("decimal", [_long(10), _long(2)])),
+    _column("day", _signature("date")),
+    _column("created", _signature("timestamp with time zone", [_long(3)])),
+    _column("tags", _signature("array", [{"kind": "TYPE", "value": _signature("varchar", [_long(10)])}])),
+    _column("point", _signature("row", [
+        {"kind": "NAMED_TYPE", "value": {"fieldName": {"name": "x"}, "typeSignature": _signature("double")}},
+        {"kind": "NAMED_TYPE", "value": {"fieldName": {"name": "y"}, "typeSignature": _signature("double")}},
+    ])),
+    _column("data", _signature("varbinary")),
+]
+
+RAW_ROWS = [
+    [1, "NaN", "1.25", "2024-01-31", "2024-01-31 10:00:00.123 +01:00", ["a"], [1.0, 2.0], "YWJj"],
+    [None, None, None, None, None, None, None, None],
+]
+
+
+@pytest.mark.parametrize(
+    "type_signature, expected", [
+        (_signature("integer"), "int32"),
+        (_signature("decimal", [_long(38), _long(0)]), "decimal128(38, 0)"),
+        (_signature("decimal", [_long(50), _long(2)]), "decimal256(50, 2)"),
+        (_signature("timestamp", [_long(6)]), "timestamp[us]"),
+        (_signature("timestamp with time zone", [_long(9)]), "timestamp[ns, tz=UTC]"),
+        (_signature("time", [_long(3)]), "time64[us]"),
+        (_signature("map", [{"kind": "TYPE", "value": _signature("varchar")},
+                            {"kind": "TYPE", "value": _signature("bigint")}]), "map<string, int64>"),
+        (_signature("uuid"), "string"),
+    ]
+)
+def test_arrow_type(type_signature, expected):
+    assert str(arrow_type(type_signature)) == expected
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_to_record_batch(raw):
+    rows = RAW_ROWS if raw else RowMapperFactory().create(COLUMNS, False).map([list(row) for row in RAW_ROWS])
+
+    batch = to_record_batch(COLUMNS, rows, raw=raw)
+
+    assert batch.schema.names == ["id", "score", "amount", "day", "created", "tags", "point", "data"]
+    first = batch.to_pylist()[0]
+    assert first["id"] == 1
+    assert first["score"] != first["score"]  # NaN
+    assert first["amount"] == Decimal("1.25")
+    assert first["day"] == date(2024, 1, 31)
+    assert first["created"] == datetime(2024, 1, 31, 9, 0, 0, 123000, tzinfo=timezone.utc)
+    assert first["tags"] == ["a"]
+    assert first["point"] == {"x": 1.0, "y": 2.0}
+    assert first["data"] == b"abc"
+    assert all(value is None for value in batch.to_pylist()[1].values())
+
+
+@pytest.mark.parametrize("column, value", [
+    (_column("day", _signature("date")), "not a date"),
+    (_column("created", _signature("timestamp with time zone", [_long(3)])), "not a timestamp +01:00"),
+])
+def test_to_record_batch_raw_conversion_error(column, value):
+    with pytest.raises(TrinoDataError):
+        to_record_batch([column], [[value]], raw=True)
+
+
+def test_iter_record_batches_max_rows():
+    pages = [[[1], [2], [3]], [], [[4]]]
+
+    batches = list(iter_record_batches(COLUMNS[:1], pages, max_rows=2))
+
+    assert [batch.column(0).to_pylist() for batch in batches] == [[1, 2], [3], [4]]
+
+
+def test_cursor_fetch_arrow_table():
+    pages = [[[2]], [[3]]]
+    query = Mock()
+    query.columns = COLUMNS[:1]
+    query.fetch.side_effect = lambda: pages.pop(0)
+    type(query).finished = property(lambda self: not pages)
+    query._map_rows = False
+    query.result = TrinoResult(query, [[1]])
+    cursor = Cursor(Mock(spec=Connection), Mock(), legacy_primitive_types=True)
+    cursor._query = query
+
+    table = cursor.fetch_arrow_table()
+
+    assert table.column("id").to_pylist() == [1, 2, 3]
+    assert table.schema.field("id").type == pa.int64()
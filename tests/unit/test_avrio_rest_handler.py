@@ -1,6 +1,10 @@
+import json
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
-from pyavrio.avrio_rest_handler import AvrioHTTPHandler  
+from pyavrio import constants
+from pyavrio.avrio_rest_handler import AvrioHTTPHandler, SessionRegistry, sessions
 from pyavrio.endpoints import AvrioEndpoints
 
 
@@ -11,7 +15,7 @@ class TestAvrioHTTPHandler(unittest.TestCase):
         self.access_token = 'sample_token'
         self.handler = AvrioHTTPHandler(self.base_url, self.access_token)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get(self, mock_get):
         endpoint = '/test-endpoint'
         params = {'param1': 'value1', 'param2': 'value2'}
@@ -23,10 +27,12 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         response = self.handler._get(endpoint, params)
 
-        mock_get.assert_called_once_with(url=expected_url, headers=expected_headers)
+        mock_get.assert_called_once_with(
+            url=expected_url, headers=expected_headers, timeout=constants.DEFAULT_REQUEST_TIMEOUT
+        )
         self.assertEqual(response, expected_response)
 
-    @patch("requests.post")
+    @patch('requests.Session.post')
     def test_get_modified_query(self, mock_post):
         # Sample input data
         email = "test@example.com"
@@ -53,12 +59,13 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         # Assertions
         mock_post.assert_called_once_with(
-            url=expected_url, headers=expected_headers, json=expected_payload
+            url=expected_url, headers=expected_headers, json=expected_payload,
+            timeout=constants.DEFAULT_REQUEST_TIMEOUT,
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"success": True, "data": "modified_query"})
 
-    @patch("requests.post")
+    @patch('requests.Session.post')
     def test_get_modified_query_failure(self, mock_post):
         # Sample input data
         email = "test@example.com"
@@ -80,7 +87,7 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         mock_post.assert_called_once()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_token(self, mock_post):
         username = 'test_user'
         password = 'test_password'
@@ -96,10 +103,12 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         token = self.handler._generate_token(username, password, host)
 
-        mock_post.assert_called_once_with(url=expected_url, headers=expected_headers, json=expected_payload)
+        mock_post.assert_called_once_with(
+            url=expected_url, headers=expected_headers, json=expected_payload, timeout=constants.DEFAULT_REQUEST_TIMEOUT
+        )
         self.assertEqual(token, 'sample_token')
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_catalogs_dp(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -110,7 +119,20 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         self.assertEqual(result, ['domain1', 'domain2'])
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_get_catalogs_dp_with_json_decoder(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b'[{"domain": "domain1"}, {"domain": "domain2"}]'
+        mock_get.return_value = mock_response
+        handler = AvrioHTTPHandler(self.base_url, self.access_token, json_decoder=json.loads)
+
+        result = handler._get_catalogs_dp('test@example.com', 'token')
+
+        self.assertEqual(result, ['domain1', 'domain2'])
+        mock_response.json.assert_not_called()
+
+    @patch('requests.Session.get')
     def test_get_schemas_dp(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -121,7 +143,7 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         self.assertEqual(result, ['domain1', 'domain2'])
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_tables_dp(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -132,7 +154,7 @@ class TestAvrioHTTPHandler(unittest.TestCase):
 
         self.assertEqual(result, ['table1', 'table2', 'table3'])
    
-    @patch('pyavrio.avrio_rest_handler.requests.get')
+    @patch('requests.Session.get')
     def test_get_schemas_ds(self, mock_get):
         # Mocking the response from the API
         mock_response = MagicMock()
@@ -146,7 +168,7 @@ class TestAvrioHTTPHandler(unittest.TestCase):
         # Asserting the returned value
         self.assertEqual(schemas, ['Schema1', 'Schema2'])
 
-    @patch('pyavrio.avrio_rest_handler.requests.get')
+    @patch('requests.Session.get')
     def test_get_tables_ds(self, mock_get):
         # Mocking the response from the API
         mock_response = MagicMock()
@@ -160,5 +182,99 @@ class TestAvrioHTTPHandler(unittest.TestCase):
         # Asserting the returned value
         self.assertEqual(tables, ['Table1', 'Table2'])
 
+
+class TestSessionRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = SessionRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_handlers_share_session_per_base_url(self):
+        handler = AvrioHTTPHandler('https://example.com', 'token1')
+        other_user = AvrioHTTPHandler('https://example.com', 'token2')
+        other_host = AvrioHTTPHandler('https://other.example.com', 'token1')
+
+        self.assertIs(handler._session, other_user._session)
+        self.assertIs(handler._session, sessions.get('https://example.com'))
+        self.assertIsNot(handler._session, other_host._session)
+
+    def test_handler_session_and_timeout(self):
+        session = MagicMock()
+        handler = AvrioHTTPHandler('https://example.com', 'token', session=session, timeout=5)
+
+        handler._get('/endpoint', {})
+
+        session.get.assert_called_once()
+        self.assertEqual(session.get.call_args.kwargs["timeout"], 5)
+
+    def test_session_options(self):
+        self.registry.configure(pool_maxsize=32, max_retries=5, keep_alive=False)
+
+        session = self.registry.get('https://example.com')
+        adapter = session.get_adapter('https://example.com')
+
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertEqual(session.headers["Connection"], "close")
+
+    def test_configure_closes_sessions(self):
+        session = self.registry.get('https://example.com')
+
+        self.registry.configure(timeout=10)
+
+        self.assertEqual(self.registry.timeout, 10)
+        self.assertEqual(len(self.registry), 0)
+        self.assertIsNot(self.registry.get('https://example.com'), session)
+
+    def test_configure_unknown_option(self):
+        with self.assertRaises(ValueError):
+            self.registry.configure(pool_size=32)
+        with self.assertRaises(ValueError):
+            self.registry.configure(close=None)
+
+    def test_session_does_not_keep_cookies(self):
+        session = self.registry.get('https://example.com')
+        response = MagicMock()
+        response.info.return_value.get_all.return_value = ["session=user1; Path=/"]
+
+        session.cookies.extract_cookies(response, MagicMock(get_full_url=lambda: 'https://example.com/',
+                                                            unverifiable=False, origin_req_host='example.com',
+                                                            host='example.com', type='https'))
+
+        self.assertEqual(len(session.cookies), 0)
+
+    def test_connections_are_reused(self):
+        client_ports = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                client_ports.append(self.client_address[1])
+                body = b'[{"domain": "domain1"}]'
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+        # Close the pooled connection first, the server handles it until then
+        self.addCleanup(self.registry.close)
+        base_url = "http://127.0.0.1:{}".format(httpd.server_address[1])
+
+        for token in ("token1", "token2", "token3"):
+            handler = AvrioHTTPHandler(base_url, token, session=self.registry.get(base_url))
+            self.assertEqual(handler._get_catalogs_dp('test@example.com', token), ['domain1'])
+
+        self.assertEqual(len(client_ports), 3)
+        self.assertEqual(len(set(client_ports)), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,12 @@
+import gc
+import json
 import math
+import pickle
+import random
 import time
 import unittest
 import mock
-from unittest.mock import Mock, call, patch, MagicMock
+from unittest.mock import Mock, call, patch, MagicMock, PropertyMock
 from time import sleep
 import uuid
 from typing import Dict, Optional, Generic, TypeVar, List, Any
@@ -19,6 +23,9 @@ from pyavrio.client import (
     RowMapperFactory,
     NoOpRowMapper,
     RowMapper,
+    CompiledRowMapper,
+    LazyRow,
+    LazyRowMapper,
     ValueMapper,
     TrinoRequest,
     ClientSession,
@@ -51,10 +58,13 @@ from pyavrio.client import (
     TimestampWithTimeZoneValueMapper,
 )
 from pyavrio import __version__, constants
+from pyavrio.auth import AvrioAuthentication
+from pyavrio.dbapi import SizeBoundLRUCache, TimeBoundLRUCache
 from pyavrio.client import RowValueMapper, NamedRowTuple
 import pyavrio.exceptions
 from pyavrio.exceptions import TrinoExternalError, TrinoUserError, Http502Error, Http503Error, Http504Error, HttpError
 import pytz
+import threading
 from threading import Lock
 
 try:
@@ -458,6 +468,92 @@ class TestTimestampValueMapper(unittest.TestCase):
         result = mapper.map(value)
         self.assertEqual(result, expected_result)
 
+class TestTemporalValueMappersFastPath(unittest.TestCase):
+    """The integer fast path must return the same values as the Decimal arithmetic it replaces."""
+
+    @staticmethod
+    def _legacy_time(value, precision, with_time_zone):
+        if with_time_zone:
+            whole, fraction, timezone_part = value[:8], value[9:len(value) - 6], value[len(value) - 6:]
+            return pyavrio.client.TimeWithTimeZone(
+                time.fromisoformat(whole).replace(tzinfo=pyavrio.client._create_tzinfo.__wrapped__(timezone_part)),
+                pyavrio.client._fraction_to_decimal(fraction),
+            ).round_to(precision).to_python_type()
+        return pyavrio.client.Time(
+            time.fromisoformat(value[:8]),
+            pyavrio.client._fraction_to_decimal(value[9:]),
+        ).round_to(precision).to_python_type()
+
+    @staticmethod
+    def _legacy_timestamp(value, precision, with_time_zone):
+        if with_time_zone:
+            datetime_with_fraction, timezone_part = value.rsplit(' ', 1)
+            return pyavrio.client.TimestampWithTimeZone(
+                datetime.fromisoformat(datetime_with_fraction[:19]).replace(
+                    tzinfo=pyavrio.client._create_tzinfo.__wrapped__(timezone_part)),
+                pyavrio.client._fraction_to_decimal(datetime_with_fraction[20:]),
+            ).round_to(precision).to_python_type()
+        return pyavrio.client.Timestamp(
+            datetime.fromisoformat(value[:19]), pyavrio.client._fraction_to_decimal(value[20:]),
+        ).round_to(precision).to_python_type()
+
+    @staticmethod
+    def _fractions(rng):
+        yield ""
+        for digits in range(1, 13):
+            yield "0" * digits
+            yield "9" * digits
+            yield "5".ljust(digits, "0")
+            for _ in range(5):
+                yield "".join(rng.choice("0123456789") for _ in range(digits))
+
+    def _assert_same(self, mapper, legacy, value):
+        # The Decimal arithmetic raises for some values rounded up to the next second,
+        # the fast path must raise the same errors for them
+        try:
+            expected = legacy()
+        except Exception as e:
+            with self.assertRaises(type(e), msg=value):
+                mapper.map(value)
+            return
+        actual = mapper.map(value)
+        self.assertEqual(actual, expected, value)
+        self.assertEqual(type(actual), type(expected), value)
+        self.assertEqual(actual.tzinfo, expected.tzinfo, value)
+        if isinstance(actual, datetime):
+            self.assertEqual(actual.utcoffset(), expected.utcoffset(), value)
+
+    def test_timestamps(self):
+        rng = random.Random(42)
+        zones = ["+00:00", "-08:00", "+05:30", "UTC", "Europe/Warsaw", "America/New_York"]
+        for precision in range(0, 13):
+            for fraction in self._fractions(rng):
+                for whole in ("2024-03-10 01:59:59", "2024-12-31 23:59:59", "1970-01-01 00:00:00"):
+                    value = f"{whole}.{fraction}" if fraction else whole
+                    self._assert_same(pyavrio.client.TimestampValueMapper(precision),
+                                      lambda: self._legacy_timestamp(value, precision, False), value)
+                    for zone in zones:
+                        zoned_value = f"{value} {zone}"
+                        self._assert_same(pyavrio.client.TimestampWithTimeZoneValueMapper(precision),
+                                          lambda: self._legacy_timestamp(zoned_value, precision, True), zoned_value)
+
+    def test_times(self):
+        rng = random.Random(42)
+        for precision in range(0, 13):
+            for fraction in self._fractions(rng):
+                for whole in ("00:00:00", "12:34:56", "23:59:59"):
+                    value = f"{whole}.{fraction}" if fraction else whole
+                    self._assert_same(pyavrio.client.TimeValueMapper(precision),
+                                      lambda: self._legacy_time(value, precision, False), value)
+                    for zone in ("+00:00", "-08:00", "+05:45"):
+                        self._assert_same(pyavrio.client.TimeWithTimeZoneValueMapper(precision),
+                                          lambda: self._legacy_time(value + zone, precision, True), value + zone)
+
+    def test_create_tzinfo_is_cached(self):
+        self.assertIs(pyavrio.client._create_tzinfo("+05:30"), pyavrio.client._create_tzinfo("+05:30"))
+        self.assertEqual(pyavrio.client._create_tzinfo("-08:00"), timezone(-timedelta(hours=8)))
+
+
 class TestBinaryValueMapper(unittest.TestCase):
 
     def test_map_with_valid_value(self):
@@ -502,6 +598,17 @@ class TestRowValueMapper(unittest.TestCase):
         result = self.mapper.map(values)
         self.assertIsNone(result)
 
+    def test_map_reuses_row_class(self):
+        for mock_mapper in self.mock_mappers:
+            mock_mapper.map.side_effect = lambda value: value
+        first = self.mapper.map([1, 'a', 1.5])
+        second = self.mapper.map([2, 'b', 2.5])
+
+        self.assertEqual(first, (1, 'a', 1.5))
+        self.assertEqual(second.name, 'b')
+        self.assertIs(type(first), type(second))
+        self.assertIs(type(first), self.mapper.row_class)
+
 import uuid
 class TestUuidValueMapper(unittest.TestCase):
 
@@ -532,6 +639,7 @@ class TestNoOpRowMapper(unittest.TestCase):
 class TestRowMapperFactory(unittest.TestCase):
 
     def setUp(self):
+        RowMapperFactory.clear_cache()
         self.factory = RowMapperFactory()
 
     def test_create_legacy_primitive_types_true(self):
@@ -613,6 +721,127 @@ class TestRowMapper(unittest.TestCase):
         value_mapper.map.side_effect = ValueError("Invalid value")
         with self.assertRaises(pyavrio.exceptions.TrinoDataError):
             self.mapper._map_value(value, value_mapper)
+
+
+class TestCompiledRowMapper(unittest.TestCase):
+
+    def setUp(self):
+        RowMapperFactory.clear_cache()
+        self.columns = [
+            {'typeSignature': {'rawType': 'bigint', 'arguments': []}},
+            {'typeSignature': {'rawType': 'decimal', 'arguments': []}},
+            {'typeSignature': {'rawType': 'varchar', 'arguments': []}},
+            {'typeSignature': {'rawType': 'double', 'arguments': []}},
+            {'typeSignature': {'rawType': 'date', 'arguments': []}},
+        ]
+
+    def _rows(self):
+        return [[1, "1.5", "a", "Infinity", "2024-01-31"], [None, None, None, None, None]]
+
+    def test_maps_like_row_mapper(self):
+        row_mapper = RowMapperFactory().create(self.columns, legacy_primitive_types=False)
+        reference = RowMapper([RowMapperFactory()._create_value_mapper(column['typeSignature'])
+                               for column in self.columns])
+
+        self.assertIsInstance(row_mapper, CompiledRowMapper)
+        self.assertEqual(row_mapper.map(self._rows()), reference.map(self._rows()))
+        self.assertEqual(row_mapper.map(self._rows())[0],
+                         [1, Decimal("1.5"), "a", float("inf"), date(2024, 1, 31)])
+
+    def test_maps_in_place(self):
+        rows = self._rows()
+        first_row = rows[0]
+
+        result = RowMapperFactory().create(self.columns, legacy_primitive_types=False).map(rows)
+
+        self.assertIs(result, rows)
+        self.assertIs(result[0], first_row)
+
+    def test_no_op_columns_are_not_mapped(self):
+        columns = [{'typeSignature': {'rawType': 'varchar', 'arguments': []}}]
+        rows = [["a"], ["b"]]
+
+        self.assertIs(RowMapperFactory().create(columns, legacy_primitive_types=False).map(rows), rows)
+
+    def test_conversion_error(self):
+        rows = [[1, "1.5", "a", "1.0", "2024-01-31"], [2, "2.5", "b", "2.0", "not a date"]]
+        row_mapper = RowMapperFactory().create(self.columns, legacy_primitive_types=False)
+
+        with self.assertRaises(pyavrio.exceptions.TrinoDataError) as context:
+            row_mapper.map(rows)
+
+        self.assertEqual(str(context.exception), "Could not convert 'not a date' into the associated python type")
+        # The failing row is left untouched
+        self.assertEqual(rows[1], [2, "2.5", "b", "2.0", "not a date"])
+
+    def test_row_mappers_are_cached_per_signature(self):
+        factory = RowMapperFactory()
+        row_mapper = factory.create(self.columns, legacy_primitive_types=False)
+
+        self.assertIs(RowMapperFactory().create([dict(column) for column in self.columns], False), row_mapper)
+        self.assertIsNot(factory.create(self.columns[:2], False), row_mapper)
+        RowMapperFactory.clear_cache()
+        self.assertIsNot(factory.create(self.columns, False), row_mapper)
+
+
+class TestLazyRowMapper(unittest.TestCase):
+
+    def setUp(self):
+        RowMapperFactory.clear_cache()
+        self.columns = [
+            {'typeSignature': {'rawType': 'bigint', 'arguments': []}},
+            {'typeSignature': {'rawType': 'decimal', 'arguments': []}},
+            {'typeSignature': {'rawType': 'varchar', 'arguments': []}},
+            {'typeSignature': {'rawType': 'date', 'arguments': []}},
+        ]
+        self.row_mapper = RowMapperFactory().create(self.columns, legacy_primitive_types=False, lazy_rows=True)
+
+    def test_values_are_converted_on_access(self):
+        raw = [1, "1.5", "a", "2024-01-31"]
+        row = self.row_mapper.map([raw])[0]
+
+        self.assertIsInstance(self.row_mapper, LazyRowMapper)
+        self.assertIsInstance(row, LazyRow)
+        self.assertEqual(raw, [1, "1.5", "a", "2024-01-31"])
+        self.assertEqual(row[1], Decimal("1.5"))
+        self.assertEqual(raw, [1, Decimal("1.5"), "a", "2024-01-31"])
+        self.assertEqual(row[-1], date(2024, 1, 31))
+        self.assertIs(row[1], row[1])
+        self.assertEqual(row[1:3], [Decimal("1.5"), "a"])
+
+    def test_sequence_protocol(self):
+        row = self.row_mapper.map([[1, "1.5", "a", "2024-01-31"]])[0]
+
+        self.assertEqual(len(row), 4)
+        self.assertEqual(list(row), [1, Decimal("1.5"), "a", date(2024, 1, 31)])
+        self.assertEqual(row, [1, Decimal("1.5"), "a", date(2024, 1, 31)])
+        self.assertEqual(row.to_list(), [1, Decimal("1.5"), "a", date(2024, 1, 31)])
+        self.assertIn("a", row)
+        self.assertEqual(repr(row), repr([1, Decimal("1.5"), "a", date(2024, 1, 31)]))
+        with self.assertRaises(IndexError):
+            row[4]
+
+    def test_conversion_error_is_raised_on_access(self):
+        row = self.row_mapper.map([[1, "1.5", "a", "not a date"]])[0]
+
+        self.assertEqual(row[1], Decimal("1.5"))
+        with self.assertRaises(pyavrio.exceptions.TrinoDataError):
+            row[3]
+
+    def test_trino_query_creates_lazy_rows(self):
+        request = Mock()
+        request._host = 'example.com'
+        query = TrinoQuery(request, "SELECT 1", lazy_rows=True)
+        columns = [dict(column, name=str(index)) for index, column in enumerate(self.columns)]
+        query._update_state(TrinoStatus(
+            id="id", stats={}, warnings=[], info_uri=None, next_uri=None, update_type=None,
+            update_count=None, rows=[], columns=columns,
+        ))
+
+        self.assertTrue(query.lazy_rows)
+        self.assertIsInstance(query._row_mapper, LazyRowMapper)
+
+
 class TestDelayExponential(unittest.TestCase):
 
     def test_initialization(self):
@@ -688,6 +917,7 @@ class TestTrinoResult(unittest.TestCase):
         # Mock the TrinoQuery object for testing TrinoResult
         mock_query = Mock()
         mock_query.finished = False  # Set finished to False initially
+        mock_query._start_mapping_rows.side_effect = lambda rows: rows
         mock_query.fetch.return_value = [{"col1": 1, "col2": "value1"}, {"col1": 2, "col2": "value2"}]
 
         # Create a TrinoResult instance with the mock TrinoQuery and initial rows
@@ -715,6 +945,7 @@ class TestTrinoResult(unittest.TestCase):
         # Mock the TrinoQuery object for testing TrinoResult with a finished query
         mock_query = Mock()
         mock_query.finished = True  # Set finished to True initially
+        mock_query._start_mapping_rows.side_effect = lambda rows: rows
         mock_query.fetch.return_value = None  # No more rows to fetch
 
         # Create a TrinoResult instance with the mock TrinoQuery and initial rows
@@ -735,6 +966,217 @@ class TestTrinoResult(unittest.TestCase):
         self.assertEqual(trino_result.rownumber, 1) 
 
 
+class _PagedQuery:
+    """Query stub returning one page per fetch."""
+
+    def __init__(self, pages, error=None):
+        self._pages = list(pages)
+        self._error = error
+        self.query_id = "query_id"
+        self.cancelled = False
+        self.fetch_count = 0
+        self.cancel_count = 0
+        self._map_rows = False
+
+    @property
+    def finished(self):
+        return not self._pages and self._error is None
+
+    def _start_mapping_rows(self, rows):
+        self._map_rows = True
+        return rows
+
+    def fetch(self):
+        self.fetch_count += 1
+        if not self._pages:
+            raise self._error
+        return self._pages.pop(0)
+
+    def cancel(self):
+        self.cancel_count += 1
+        self.cancelled = True
+
+
+class TestTrinoRequestStreamingDecode(unittest.TestCase):
+    def setUp(self):
+        self.request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), streaming_decode=True)
+        body = json.dumps({
+            "id": "query_id",
+            "infoUri": "info",
+            "nextUri": "next",
+            "columns": [{"name": "value", "type": "double", "typeSignature": {"rawType": "double", "arguments": []}}],
+            "data": [[1.5], ["Infinity"], [None]],
+            "stats": {},
+        }).encode("utf-8")
+        self.http_response = Mock(ok=True, status_code=200, headers={})
+        self.http_response.iter_content.return_value = [body[i:i + 16] for i in range(0, len(body), 16)]
+
+    def test_process_maps_rows_while_decoding(self):
+        row_mapper_factory = Mock(side_effect=lambda columns: RowMapperFactory().create(
+            columns=columns, legacy_primitive_types=False))
+
+        status = self.request.process(self.http_response, row_mapper_factory=row_mapper_factory)
+
+        self.assertTrue(status.rows_mapped)
+        self.assertEqual(status.rows, [[1.5], [float("inf")], [None]])
+        self.assertEqual(status.next_uri, "next")
+        row_mapper_factory.assert_called_once()
+        self.http_response.json.assert_not_called()
+        self.http_response.close.assert_called_once()
+
+    def test_process_without_row_mapper(self):
+        status = self.request.process(self.http_response)
+
+        self.assertFalse(status.rows_mapped)
+        self.assertEqual(status.rows, [[1.5], ["Infinity"], [None]])
+
+    def test_get_streams_response(self):
+        self.request._get = Mock()
+        self.request.get("next")
+
+        self.assertTrue(self.request._get.call_args.kwargs["stream"])
+
+    def test_fetch_does_not_map_rows_again(self):
+        query = TrinoQuery(Mock(_host="coordinator"), "SELECT 1")
+        query._row_mapper = Mock()
+        query._request.process.return_value = TrinoStatus(
+            id="query_id", stats={}, warnings=[], info_uri="info", next_uri=None, update_type=None,
+            update_count=None, rows=[[1]], columns=None, rows_mapped=True,
+        )
+
+        self.assertEqual(query.fetch(), [[1]])
+        query._row_mapper.map.assert_not_called()
+
+
+class TestTrinoResultPages(unittest.TestCase):
+    def test_iter_pages(self):
+        query = _PagedQuery([[[2], [3]], [], [[4]]])
+        trino_result = TrinoResult(query, [[1]])
+
+        self.assertEqual(list(trino_result.iter_pages()), [[[1]], [[2], [3]], [], [[4]]])
+        self.assertEqual(trino_result.rownumber, 4)
+
+    def test_iter_pages_with_prefetch(self):
+        query = _PagedQuery([[[2], [3]], [[4]]])
+        trino_result = TrinoResult(query, [[1]], prefetch_pages=2)
+
+        self.assertEqual(list(trino_result.iter_pages()), [[[1]], [[2], [3]], [[4]]])
+
+    def test_iter_pages_after_rows(self):
+        trino_result = TrinoResult(_PagedQuery([[[2]]]), [[1]])
+        self.assertEqual(next(iter(trino_result)), [1])
+
+        with self.assertRaises(pyavrio.exceptions.ProgrammingError):
+            next(trino_result.iter_pages())
+
+    def test_iter_raw_pages(self):
+        query = _PagedQuery([[[2]]])
+        trino_result = TrinoResult(query, [[1]])
+
+        self.assertEqual(list(trino_result.iter_pages(raw=True)), [[[1]], [[2]]])
+        self.assertFalse(query._map_rows)
+
+    def test_iter_raw_pages_after_mapped_pages(self):
+        query = _PagedQuery([[[2]]])
+        trino_result = TrinoResult(query, [[1]])
+        self.assertEqual(next(trino_result.iter_pages()), [[1]])
+
+        with self.assertRaises(pyavrio.exceptions.ProgrammingError):
+            next(trino_result.iter_pages(raw=True))
+
+
+class TestTrinoQueryRowMapping(unittest.TestCase):
+    def test_rows_are_mapped_once_the_result_is_read(self):
+        query = TrinoQuery(Mock(_host="coordinator"), "SELECT 1")
+        query._row_mapper = Mock()
+        query._row_mapper.map.side_effect = lambda rows: [[str(value) for value in row] for row in rows]
+        status = TrinoStatus(
+            id="query_id", stats={}, warnings=[], info_uri="info", next_uri=None, update_type=None,
+            update_count=None, rows=[[1]], columns=None,
+        )
+
+        self.assertEqual(query._page_rows(status), [[1]])
+        self.assertEqual(query._start_mapping_rows([[1]]), [["1"]])
+        self.assertEqual(query._start_mapping_rows([["1"]]), [["1"]])
+        self.assertEqual(query._page_rows(status), [["1"]])
+
+
+class TestTrinoResultPrefetch(unittest.TestCase):
+    def test_prefetch_yields_all_rows_in_order(self):
+        query = _PagedQuery([[[2], [3]], [], [[4]]])
+        trino_result = TrinoResult(query, [[1]], prefetch_pages=2)
+
+        self.assertEqual(list(trino_result), [[1], [2], [3], [4]])
+        self.assertEqual(trino_result.rownumber, 4)
+        self.assertIsNone(trino_result.rows)
+        self.assertEqual(query.fetch_count, 3)
+
+    def test_prefetch_propagates_errors(self):
+        query = _PagedQuery([[[2]]], error=pyavrio.exceptions.HttpError("error 500"))
+        iterator = iter(TrinoResult(query, [[1]], prefetch_pages=1))
+
+        self.assertEqual(next(iterator), [1])
+        self.assertEqual(next(iterator), [2])
+        with self.assertRaises(pyavrio.exceptions.HttpError):
+            next(iterator)
+
+    def test_prefetch_stops_when_consumer_closes(self):
+        query = _PagedQuery([[[i]] for i in range(2, 100)])
+        iterator = iter(TrinoResult(query, [[1]], prefetch_pages=1))
+        self.assertEqual(next(iterator), [1])
+        threads = [thread for thread in threading.enumerate() if thread.name == "pyavrio-prefetch-query_id"]
+
+        iterator.close()
+        for thread in threads:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        # Only the bounded queue and the page in flight were fetched ahead
+        self.assertLessEqual(query.fetch_count, 3)
+        self.assertEqual(query.cancel_count, 1)
+
+    def test_prefetch_stops_when_iterator_is_garbage_collected(self):
+        query = _PagedQuery([[[i]] for i in range(2, 100)])
+        iterator = iter(TrinoResult(query, [[1]], prefetch_pages=1))
+        self.assertEqual(next(iterator), [1])
+        threads = [thread for thread in threading.enumerate() if thread.name == "pyavrio-prefetch-query_id"]
+
+        del iterator
+        gc.collect()
+        for thread in threads:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(query.cancel_count, 1)
+
+    def test_close_stops_prefetch_and_cancels_query(self):
+        query = _PagedQuery([[[i]] for i in range(2, 100)])
+        trino_result = TrinoResult(query, [[1]], prefetch_pages=1)
+        iterator = iter(trino_result)
+        self.assertEqual(next(iterator), [1])
+        prefetcher = trino_result._prefetcher
+
+        trino_result.close()
+        prefetcher.join(timeout=5)
+
+        self.assertFalse(prefetcher.is_alive())
+        self.assertEqual(query.cancel_count, 1)
+
+    def test_fully_consumed_result_is_not_cancelled(self):
+        query = _PagedQuery([[[2]], [[3]]])
+        trino_result = TrinoResult(query, [[1]], prefetch_pages=1)
+
+        self.assertEqual(list(trino_result), [[1], [2], [3]])
+        trino_result.close()
+
+        self.assertEqual(query.cancel_count, 0)
+
+    def test_prefetch_not_used_for_finished_query(self):
+        query = _PagedQuery([])
+        trino_result = TrinoResult(query, [[1]], prefetch_pages=2)
+
+        self.assertEqual(list(trino_result), [[1]])
+        self.assertEqual(query.fetch_count, 0)
+
+
 class TestValueMappers(unittest.TestCase):
     def test_no_op_value_mapper(self):
         mapper = NoOpValueMapper()
@@ -1015,6 +1457,38 @@ class TestNamedRowTuple(unittest.TestCase):
         # Ensure no names are handled correctly
         self.assertEqual(repr(named_row_tuple), "()")  # Empty representation
 
+    def test_field_access(self):
+        names = ['id', 'id', 'name', 'count', None]
+        types = ['integer', 'integer', 'varchar', 'bigint', 'double']
+        named_row_tuple = NamedRowTuple([1, 2, 'Alice', 3, 4.0], names, types)
+
+        self.assertEqual(named_row_tuple.name, 'Alice')
+        self.assertEqual(named_row_tuple.count, 3)  # Fields shadow tuple methods
+        self.assertIsNone(named_row_tuple.missing)
+        with self.assertRaises(ValueError):
+            named_row_tuple.id
+        self.assertEqual(named_row_tuple.__annotations__, {"names": names, "types": types})
+        self.assertEqual(repr(named_row_tuple), "(1, 2, name: 'Alice', count: 3, 4.0)")
+        self.assertEqual(named_row_tuple, (1, 2, 'Alice', 3, 4.0))
+
+    def test_class_per_row_type(self):
+        first = NamedRowTuple([1, 'a'], ['id', 'name'], ['integer', 'varchar'])
+        second = NamedRowTuple([2, 'b'], ['id', 'name'], ['integer', 'varchar'])
+        other = NamedRowTuple([3, 'c'], ['key', 'name'], ['integer', 'varchar'])
+
+        self.assertIs(type(first), type(second))
+        self.assertIsNot(type(first), type(other))
+        self.assertIsInstance(first, NamedRowTuple)
+        with self.assertRaises(AttributeError):
+            first.extra = 1  # Rows are slotted
+
+    def test_pickle(self):
+        named_row_tuple = NamedRowTuple([1, 'a'], ['id', 'name'], ['integer', 'varchar'])
+        restored = pickle.loads(pickle.dumps(named_row_tuple))
+
+        self.assertEqual(restored, named_row_tuple)
+        self.assertEqual(restored.name, 'a')
+
 class TestTrinoQuery(unittest.TestCase):
 
     def setUp(self):
@@ -1076,6 +1550,162 @@ class TestTrinoQuery(unittest.TestCase):
     def test_cancelled(self):
         self.assertFalse(self.trino_query.cancelled)
 
+    def test_cancel_does_not_wait_for_fetch_in_flight(self):
+        self.trino_query._next_uri = 'next'
+        self.mock_request.delete.return_value = Mock(status_code=204)
+
+        with self.trino_query._fetch_lock:
+            cancel = threading.Thread(target=self.trino_query.cancel)
+            cancel.start()
+            cancel.join(timeout=5)
+            self.assertFalse(cancel.is_alive())
+
+        self.mock_request.delete.assert_called_once_with('next')
+        self.assertTrue(self.trino_query.cancelled)
+
+class TestTrinoQueryModifiedQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_request = Mock()
+        self.mock_request._host = 'example.com'
+        session = self.mock_request._client_session
+        session.user = 'user@example.com'
+        session.catalog = 'catalog'
+        session.platform = 'data_sources'
+        session.access_token = 'token'
+        self.mock_request.process.return_value = TrinoStatus(
+            id='query_id', stats={}, warnings=[], info_uri='info', next_uri=None,
+            update_type=None, update_count=None, rows=[], columns=None,
+        )
+        self.cache = TimeBoundLRUCache(10, 60)
+        handler_patcher = patch('pyavrio.client.AvrioHTTPHandler')
+        self.mock_handler = handler_patcher.start().return_value
+        self.addCleanup(handler_patcher.stop)
+        modified_response = Mock(ok=True)
+        modified_response.json.return_value = {'isMetadataQuery': False, 'finalModifiedSQL': 'SELECT * FROM rewritten'}
+        self.mock_handler._get_modified_query.return_value = modified_response
+
+    def _execute(self, sql):
+        query = TrinoQuery(self.mock_request, sql, modified_query_cache=self.cache)
+        query.execute()
+        return query
+
+    def test_rewrite_retried_with_refreshed_token(self):
+        auth = AvrioAuthentication('token', refresh=Mock(return_value='new_token'))
+        self.mock_request._auth = auth
+        type(self.mock_request._client_session).access_token = PropertyMock(side_effect=lambda: auth.token)
+        rewritten = self.mock_handler._get_modified_query.return_value
+        self.mock_handler._get_modified_query.side_effect = [Mock(ok=False, status_code=401), rewritten]
+
+        self._execute('SELECT * FROM t')
+
+        tokens = [c.args[2] for c in self.mock_handler._get_modified_query.call_args_list]
+        self.assertEqual(tokens, ['token', 'new_token'])
+        self.mock_request.raise_response_error.assert_not_called()
+
+    def test_rewrite_is_cached(self):
+        self._execute('SELECT * FROM t')
+        self._execute('  SELECT *\n  FROM t ')
+
+        self.mock_handler._get_modified_query.assert_called_once()
+        self.assertEqual(self.mock_request.post.call_count, 2)
+        self.mock_request.post.assert_called_with('SELECT * FROM rewritten', None)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 1)
+
+    def test_rewrite_cache_key_includes_catalog(self):
+        self._execute('SELECT * FROM t')
+        self.mock_request._client_session.catalog = 'other_catalog'
+        self._execute('SELECT * FROM t')
+
+        self.assertEqual(self.mock_handler._get_modified_query.call_count, 2)
+
+    def test_metadata_query_is_not_cached(self):
+        self.mock_handler._get_modified_query.return_value.json.return_value = {
+            'isMetadataQuery': True,
+            'trinoResultSet': {'allRowsData': [['a']], 'columnMetaData': ['name']},
+        }
+        self._execute('SHOW SCHEMAS')
+        self._execute('SHOW SCHEMAS')
+
+        self.assertEqual(self.mock_handler._get_modified_query.call_count, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_without_cache(self):
+        for _ in range(2):
+            TrinoQuery(self.mock_request, 'SELECT * FROM t').execute()
+
+        self.assertEqual(self.mock_handler._get_modified_query.call_count, 2)
+
+    def test_rewrite_without_executing(self):
+        query = TrinoQuery(self.mock_request, 'SELECT * FROM t WHERE id = ?', modified_query_cache=self.cache)
+
+        self.assertEqual(query.rewrite(), 'SELECT * FROM rewritten')
+        self.mock_request.post.assert_not_called()
+        self.assertEqual(len(self.cache), 1)
+
+    def test_rewrite_of_metadata_query(self):
+        self.mock_handler._get_modified_query.return_value.json.return_value = {
+            'isMetadataQuery': True,
+            'trinoResultSet': {'allRowsData': [['a']], 'columnMetaData': ['name']},
+        }
+
+        self.assertIsNone(TrinoQuery(self.mock_request, 'SHOW SCHEMAS').rewrite())
+
+    def test_modified_query_skips_rewrite(self):
+        TrinoQuery(self.mock_request, 'SELECT * FROM t WHERE id = 1', modified_query='SELECT 1 FROM rewritten').execute()
+
+        self.mock_handler._get_modified_query.assert_not_called()
+        self.mock_request.post.assert_called_once_with('SELECT 1 FROM rewritten', None)
+
+
+class TestTrinoQueryMetadataQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_request = Mock()
+        self.mock_request._host = 'example.com'
+        self.session = ClientSession(user='user@example.com', catalog='catalog', schema='schema',
+                                     platform='data_sources', access_token='token')
+        self.mock_request._client_session = self.session
+        self.cache = SizeBoundLRUCache(10, 60, 1024)
+        self.session.add_session_change_listener(lambda session: self.cache.clear())
+        handler_patcher = patch('pyavrio.client.AvrioHTTPHandler')
+        self.mock_handler = handler_patcher.start().return_value
+        self.addCleanup(handler_patcher.stop)
+        self.mock_handler._get_modified_query.return_value.ok = True
+        self.mock_handler._get_modified_query.return_value.json.return_value = {
+            'isMetadataQuery': True,
+            'trinoResultSet': {'allRowsData': [['schema1'], ['schema2']], 'columnMetaData': ['Schema']},
+        }
+
+    def _execute(self, sql):
+        return list(TrinoQuery(self.mock_request, sql, metadata_query_cache=self.cache).execute())
+
+    def test_metadata_result_is_cached(self):
+        first = self._execute('SHOW SCHEMAS')
+        first[0][0] = 'mutated'
+        second = self._execute('SHOW  SCHEMAS')
+
+        self.assertEqual(second, [['schema1'], ['schema2']])
+        self.mock_handler._get_modified_query.assert_called_once()
+        self.mock_request.post.assert_not_called()
+
+    def test_metadata_result_invalidated_on_schema_change(self):
+        self._execute('SHOW TABLES')
+        self.session.schema = 'other_schema'
+        self._execute('SHOW TABLES')
+
+        self.assertEqual(self.mock_handler._get_modified_query.call_count, 2)
+
+    def test_session_change_listener_only_called_on_change(self):
+        listener = Mock()
+        self.session.add_session_change_listener(listener)
+
+        self.session.catalog = 'catalog'
+        self.session.catalog = 'other_catalog'
+
+        listener.assert_called_once_with(self.session)
+
+
 if __name__ == '__main__':
     unittest.main()
-
@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+
+from pyavrio.client import TrinoResult
+from pyavrio.columnar import _split_fixed_offset, concat_column_batches, to_column_batch
+from pyavrio.dbapi import Connection, Cursor
+from pyavrio.exceptions import TrinoDataError
+
+numpy = pytest.importorskip("numpy")
+
+
+def _column(name, raw_type, arguments=()):
+    return {"name": name, "type": raw_type, "typeSignature": {"rawType": raw_type, "arguments": list(arguments)}}
+
+
+COLUMNS = [
+    _column("id", "bigint"),
+    _column("score", "double"),
+    _column("flag", "boolean"),
+    _column("day", "date"),
+    _column("ts", "timestamp", [{"kind": "LONG", "value": 6}]),
+    _column("amount", "decimal"),
+]
+
+
+def test_raw_values():
+    batch = to_column_batch(COLUMNS, [
+        [1, 1.5, True, "2024-01-31", "2024-01-31 10:00:00.123456", "1.5"],
+        [None, "Infinity", None, None, None, None],
+    ])
+
+    assert batch.num_rows == 2
+    assert batch.names == ["id", "score", "flag", "day", "ts", "amount"]
+    assert batch["id"].values.dtype == numpy.int64
+    assert batch["id"].values.tolist() == [1, 0]
+    assert batch["id"].valid.tolist() == [True, False]
+    assert batch["score"].values.dtype == numpy.float64
+    assert batch["score"].values.tolist() == [1.5, float("inf")]
+    assert batch["flag"].values.tolist() == [True, False]
+    assert batch["day"].values.dtype == numpy.dtype("datetime64[D]")
+    assert batch["day"].values[0] == numpy.datetime64("2024-01-31")
+    assert numpy.isnat(batch["day"].values[1])
+    assert batch["ts"].values.dtype == numpy.dtype("datetime64[us]")
+    assert batch["ts"].values[0] == numpy.datetime64("2024-01-31T10:00:00.123456")
+    assert batch["amount"].values.dtype == object
+    assert batch["amount"].values.tolist() == ["1.5", None]
+
+
+def test_raw_values_of_object_columns_are_mapped():
+    batch = to_column_batch(COLUMNS, [
+        [1, "NaN", True, "2024-01-31", "2024-01-31 10:00:00.123456", "1.5"],
+        [None, None, None, None, None, None],
+    ], raw=True)
+
+    assert batch["id"].values.dtype == numpy.int64
+    assert numpy.isnan(batch["score"].values[0])
+    assert batch["amount"].values.tolist() == [Decimal("1.5"), None]
+
+
+def test_raw_values_conversion_error():
+    with pytest.raises(TrinoDataError):
+        to_column_batch(COLUMNS[3:4], [["not a date"]], raw=True)
+
+
+def test_mapped_values():
+    batch = to_column_batch(COLUMNS, [
+        [1, 1.5, False, date(2024, 1, 31), datetime(2024, 1, 31, 10, 0, 0, 123456), Decimal("1.5")],
+    ])
+
+    assert batch["day"].values[0] == numpy.datetime64("2024-01-31")
+    assert batch["ts"].values[0] == numpy.datetime64("2024-01-31T10:00:00.123456")
+    assert batch["amount"].values[0] == Decimal("1.5")
+    assert batch[0].valid.all()
+
+
+@pytest.mark.parametrize(
+    "precision, unit", [(0, "s"), (3, "ms"), (6, "us"), (9, "ns"), (12, "ns")]
+)
+def test_timestamp_units(precision, unit):
+    batch = to_column_batch([_column("ts", "timestamp", [{"kind": "LONG", "value": precision}])], [])
+
+    assert batch["ts"].values.dtype == numpy.dtype(f"datetime64[{unit}]")
+
+
+def test_split_fixed_offset():
+    local, offset = _split_fixed_offset(["2024-01-31 10:00:00.000 +01:00", None])
+
+    assert local == ["2024-01-31 10:00:00.000", None]
+    assert offset == timedelta(hours=1)
+    assert _split_fixed_offset(["2024-01-31 10:00:00.000 UTC"])[1] == timedelta(0)
+    assert _split_fixed_offset(["2024-01-31 10:00:00.000 Europe/Paris"]) is None
+    assert _split_fixed_offset(["2024-01-31 10:00:00.000 +01:00", "2024-01-31 10:00:00.000 UTC"]) is None
+
+
+def test_concat():
+    columns = COLUMNS[:2]
+    batches = [to_column_batch(columns, [[1, 1.0]]), to_column_batch(columns, [[None, 2.0], [3, None]])]
+
+    batch = concat_column_batches(columns, batches)
+
+    assert batch.num_rows == 3
+    assert batch["id"].values.tolist() == [1, 0, 3]
+    assert batch["score"].valid.tolist() == [True, True, False]
+    assert concat_column_batches(columns, [])["id"].values.dtype == numpy.int64
+
+
+def test_cursor_fetch_columns():
+    pages = [[[2, 2.0]], [[3, 3.0]]]
+    query = Mock()
+    query.columns = COLUMNS[:2]
+    query.fetch.side_effect = lambda: pages.pop(0)
+    type(query).finished = property(lambda self: not pages)
+    query._map_rows = False
+    query.result = TrinoResult(query, [[1, 1.0]])
+    cursor = Cursor(Mock(spec=Connection), Mock())
+    cursor._query = query
+
+    batch = cursor.fetch_columns()
+
+    assert batch.num_rows == 3
+    assert batch["id"].values.tolist() == [1, 2, 3]
+    assert batch.to_dict()["score"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_cursor_fetch_columns_from_raw_pages():
+    pages = [[["2.5"]]]
+    query = Mock()
+    query.columns = [COLUMNS[5]]
+    query.fetch.side_effect = lambda: pages.pop(0)
+    type(query).finished = property(lambda self: not pages)
+    query._map_rows = False
+    query.result = TrinoResult(query, [["1.5"]])
+    cursor = Cursor(Mock(spec=Connection), Mock())
+    cursor._query = query
+
+    batch = cursor.fetch_columns()
+
+    assert batch["amount"].values.tolist() == [Decimal("1.5"), Decimal("2.5")]
+    query._start_mapping_rows.assert_not_called()
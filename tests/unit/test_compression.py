@@ -0,0 +1,156 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from pyavrio import compression, constants
+from pyavrio.avrio_rest_handler import AvrioHTTPHandler
+from pyavrio.client import ClientSession, TrinoQuery, TrinoRequest, TrinoStatus
+from pyavrio.compression import accept_encoding, response_sizes, supported_content_codings
+
+BODY = json.dumps({"data": [[i, "value"] for i in range(1000)]}).encode("utf-8")
+
+
+@pytest.fixture
+def gzip_server():
+    accept_encodings = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            accept_encodings.append(self.headers.get("Accept-Encoding"))
+            body = BODY
+            self.send_response(200)
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/".format(httpd.server_address[1]), accept_encodings
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_supported_content_codings():
+    codings = supported_content_codings()
+
+    assert "gzip" in codings
+    assert "deflate" in codings
+    assert codings == [coding for coding in compression.CONTENT_CODINGS if coding in codings]
+
+
+def test_accept_encoding_auto():
+    assert accept_encoding("auto") == ",".join(supported_content_codings())
+    assert accept_encoding(True) == accept_encoding("auto")
+
+
+@pytest.mark.parametrize("value", [None, False, "identity", []])
+def test_accept_encoding_disabled(value):
+    assert accept_encoding(value) == "identity"
+
+
+def test_accept_encoding_explicit():
+    assert accept_encoding("gzip") == "gzip"
+    assert accept_encoding(["deflate", "gzip"]) == "deflate,gzip"
+
+
+def test_accept_encoding_unknown():
+    with pytest.raises(ValueError, match="compress"):
+        accept_encoding("compress")
+
+
+def test_accept_encoding_not_decodable():
+    with mock.patch.object(compression, "ACCEPT_ENCODING", "gzip,deflate"):
+        with pytest.raises(ModuleNotFoundError, match="pyavrio\\[compression\\]"):
+            accept_encoding("zstd")
+
+
+def test_response_sizes_compressed(gzip_server):
+    url, _ = gzip_server
+
+    wire_bytes, decoded_bytes = response_sizes(requests.get(url, headers={"Accept-Encoding": "gzip"}))
+
+    assert decoded_bytes == len(BODY)
+    assert wire_bytes == len(gzip.compress(BODY))
+    assert wire_bytes < decoded_bytes
+
+
+def test_response_sizes_identity(gzip_server):
+    url, _ = gzip_server
+
+    assert response_sizes(requests.get(url, headers={"Accept-Encoding": "identity"})) == (len(BODY), len(BODY))
+
+
+def test_response_sizes_streamed(gzip_server):
+    url, _ = gzip_server
+    http_response = requests.get(url, headers={"Accept-Encoding": "gzip"}, stream=True)
+
+    decoded_bytes = sum(len(chunk) for chunk in http_response.iter_content(chunk_size=1024))
+
+    assert response_sizes(http_response, decoded_bytes=decoded_bytes) == (len(gzip.compress(BODY)), len(BODY))
+
+
+def test_request_accept_encoding(gzip_server):
+    url, accept_encodings = gzip_server
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), http_compression="gzip")
+
+    request._http_session.get(url)
+
+    assert request.accept_encoding == "gzip"
+    assert request.http_headers[constants.HEADER_ACCEPT_ENCODING] == "gzip"
+    assert accept_encodings == ["gzip"]
+
+
+def test_request_without_compression():
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), http_compression=None)
+
+    assert request.http_headers[constants.HEADER_ACCEPT_ENCODING] == "identity"
+
+
+@pytest.mark.parametrize("streaming_decode", [False, True])
+def test_process_counts_bytes(streaming_decode):
+    body = {"id": "query_id", "infoUri": "info", "columns": [], "data": [[1]], "stats": {}}
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), streaming_decode=streaming_decode)
+    http_response = Mock(ok=True, status_code=200, headers={}, content=json.dumps(body).encode("utf-8"))
+    http_response.json.return_value = body
+    http_response.iter_content.return_value = [http_response.content]
+    http_response.raw.tell.return_value = 42
+
+    status = request.process(http_response)
+
+    assert status.wire_bytes == 42
+    assert status.decoded_bytes == len(http_response.content)
+
+
+def test_query_stats_accumulate_bytes():
+    query = TrinoQuery(Mock(_host="coordinator", accept_encoding="gzip"), "SELECT 1")
+    for _ in range(2):
+        query._update_state(TrinoStatus(
+            id="query_id", stats={"state": "RUNNING"}, warnings=[], info_uri="info", next_uri="next",
+            update_type=None, update_count=None, rows=[], columns=None, wire_bytes=10, decoded_bytes=100,
+        ))
+
+    assert query.stats["wireBytes"] == 20
+    assert query.stats["decodedBytes"] == 200
+    assert query.stats["state"] == "RUNNING"
+
+
+@mock.patch("requests.Session.get")
+def test_rest_handler_accept_encoding(mock_get):
+    handler = AvrioHTTPHandler("https://example.com", "token", accept_encoding="gzip,deflate")
+
+    handler._get("/endpoint", {})
+
+    assert mock_get.call_args.kwargs["headers"] == {"Authorization": "Bearer token", "Accept-Encoding": "gzip,deflate"}
@@ -0,0 +1,113 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+
+from pyavrio.client import RowMapperFactory, TrinoResult
+from pyavrio.dbapi import Connection, Cursor
+from pyavrio.exceptions import TrinoDataError
+
+pandas = pytest.importorskip("pandas")
+from pyavrio.dataframe import iter_dataframes, to_dataframe  # noqa: E402
+
+
+def _column(name, raw_type, arguments=()):
+    return {"name": name, "type": raw_type, "typeSignature": {"rawType": raw_type, "arguments": list(arguments)}}
+
+
+COLUMNS = [
+    _column("id", "bigint"),
+    _column("score", "double"),
+    _column("flag", "boolean"),
+    _column("day", "date"),
+    _column("amount", "decimal", [{"kind": "LONG", "value": 10}, {"kind": "LONG", "value": 2}]),
+    _column("created", "timestamp with time zone", [{"kind": "LONG", "value": 3}]),
+    _column("data", "varbinary"),
+]
+
+RAW_ROWS = [
+    [1, 1.5, True, "2024-01-31", "1.25", "2024-01-31 10:00:00.123 +01:00", "YWJj"],
+    [None, None, None, None, None, None, None],
+]
+
+
+def _mapped_rows():
+    return RowMapperFactory().create(COLUMNS, legacy_primitive_types=False).map([list(row) for row in RAW_ROWS])
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_to_dataframe(raw):
+    frame = to_dataframe(COLUMNS, RAW_ROWS if raw else _mapped_rows(), raw=raw)
+
+    assert list(frame.columns) == ["id", "score", "flag", "day", "amount", "created", "data"]
+    assert str(frame["id"].dtype) == "Int64"
+    assert frame["id"].tolist() == [1, pandas.NA]
+    assert frame["score"].dtype == "float64"
+    assert str(frame["flag"].dtype) == "boolean"
+    assert frame["day"][0] == pandas.Timestamp(date(2024, 1, 31))
+    assert pandas.isna(frame["day"][1])
+    assert frame["amount"].dtype == "float64"
+    assert frame["amount"][0] == 1.25
+    assert frame["created"][0] == pandas.Timestamp("2024-01-31 09:00:00.123", tz="UTC")
+    assert pandas.isna(frame["created"][1])
+    assert frame["data"].tolist() == [b"abc", None]
+
+
+def test_to_dataframe_without_coerce_float():
+    frame = to_dataframe(COLUMNS, RAW_ROWS, raw=True, coerce_float=False)
+
+    assert frame["amount"].tolist() == [Decimal("1.25"), None]
+
+
+def test_named_time_zones():
+    frame = to_dataframe(COLUMNS[5:6], [["2024-01-31 10:00:00.000 Europe/Paris"], ["2024-07-31 10:00:00.000 UTC"]],
+                         raw=True)
+
+    assert frame["created"].tolist() == [
+        pandas.Timestamp("2024-01-31 09:00:00", tz="UTC"),
+        pandas.Timestamp("2024-07-31 10:00:00", tz="UTC"),
+    ]
+
+
+@pytest.mark.parametrize("column, value", [
+    (COLUMNS[3], "not a date"),
+    (COLUMNS[4], "not a decimal"),
+    (COLUMNS[5], "not a timestamp +01:00"),
+])
+def test_raw_conversion_error(column, value):
+    with pytest.raises(TrinoDataError):
+        to_dataframe([column], [[value]], raw=True)
+
+
+def test_duplicate_column_names():
+    frame = to_dataframe([_column("a", "bigint"), _column("a", "varchar")], [[1, "x"]])
+
+    assert list(frame.columns) == ["a", "a"]
+
+
+def test_iter_dataframes_chunks():
+    pages = [[[1], [2], [3]], [], [[4], [5]]]
+
+    frames = list(iter_dataframes(COLUMNS[:1], pages, chunksize=2))
+
+    assert [frame["id"].tolist() for frame in frames] == [[1, 2], [3, 4], [5]]
+    with pytest.raises(ValueError):
+        list(iter_dataframes(COLUMNS[:1], pages, chunksize=0))
+
+
+def test_cursor_fetch_dataframe():
+    pages = [[[2]], [[3]]]
+    query = Mock()
+    query.columns = COLUMNS[:1]
+    query.fetch.side_effect = lambda: pages.pop(0)
+    type(query).finished = property(lambda self: not pages)
+    query._map_rows = False
+    query.result = TrinoResult(query, [[1]])
+    cursor = Cursor(Mock(spec=Connection), Mock(), legacy_primitive_types=True)
+    cursor._query = query
+
+    frame = cursor.fetch_dataframe()
+
+    assert frame["id"].tolist() == [1, 2, 3]
+    assert list(frame.index) == [0, 1, 2]
@@ -1,9 +1,12 @@
+import json
 import unittest
-from unittest.mock import MagicMock, patch, Mock, TestCase, mock
+from unittest import TestCase, mock
+from unittest.mock import MagicMock, patch, Mock
 from pyavrio.dbapi import (
     Connection,
     Cursor,
     TimeBoundLRUCache,
+    SizeBoundLRUCache,
     DBAPITypeObject,
     Binary,
     Date,
@@ -13,6 +16,7 @@ from pyavrio.dbapi import (
     IsolationLevel,
     DescribeOutput,
     ColumnDescription,
+    ProgrammingError,
     pyavrio,
     STRING, BINARY, NUMBER, DATETIME
 )
@@ -55,6 +59,14 @@ class TestTrinoDBAPIModule(unittest.TestCase):
                 access_token='mock_token_value'  # Ensure the correct token value is passed
             )
 
+    def test_json_decoder_defaults_to_response_json(self):
+        mock_auth = MagicMock()
+        mock_auth.token = 'mock_token_value'
+
+        self.assertIsNone(Connection(host='example.com', auth=mock_auth).json_decoder)
+        self.assertIs(Connection(host='example.com', auth=mock_auth, json_decoder="json").json_decoder, json.loads)
+        self.assertIsNotNone(Connection(host='example.com', auth=mock_auth, json_decoder="auto").json_decoder)
+
     @patch('pyavrio.dbapi.time')
     def test_cache_expiry(self, mock_time):
         # Test cache expiration
@@ -338,6 +350,57 @@ class TestTimeBoundLRUCache(unittest.TestCase):
         thread1.join()
         thread2.join()
 
+    def test_cache_hit_miss_counters(self):
+        cache = TimeBoundLRUCache(2, 60)
+        cache.put(1, 'a')
+
+        cache.get(1)
+        cache.get(2)
+
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1, "size": 1, "capacity": 2})
+
+    def test_cache_invalidate(self):
+        cache = TimeBoundLRUCache(3, 60)
+        cache.put(('user1', 'q1'), 'a')
+        cache.put(('user1', 'q2'), 'b')
+        cache.put(('user2', 'q1'), 'c')
+
+        self.assertTrue(cache.invalidate(('user1', 'q1')))
+        self.assertFalse(cache.invalidate(('user1', 'q1')))
+        self.assertEqual(cache.invalidate_where(lambda key: key[0] == 'user1'), 1)
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertIsNone(cache.get(('user2', 'q1')))
+
+
+class TestSizeBoundLRUCache(unittest.TestCase):
+    def test_cache_evicts_to_max_bytes(self):
+        cache = SizeBoundLRUCache(10, 60, max_bytes=10, sizeof=len)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'yyyy')
+        cache.put('c', 'zzzz')
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'yyyy')
+        self.assertEqual(cache.total_bytes, 8)
+
+    def test_cache_skips_oversized_values(self):
+        cache = SizeBoundLRUCache(10, 60, max_bytes=10, sizeof=len)
+        cache.put('a', 'x' * 11)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.total_bytes, 0)
+
+    def test_cache_invalidation_releases_bytes(self):
+        cache = SizeBoundLRUCache(10, 60, max_bytes=100)
+        cache.put(('user1', 'q'), [['row']])
+        cache.put(('user2', 'q'), [['row']])
+
+        cache.invalidate_where(lambda key: key[0] == 'user1')
+        self.assertEqual(cache.stats['size'], 1)
+        cache.clear()
+        self.assertEqual(cache.total_bytes, 0)
+
 
 class TestCursor(unittest.TestCase):
     def setUp(self):
@@ -381,6 +444,19 @@ class TestCursor(unittest.TestCase):
         self.assertIsNone(cursor._iterator)
         self.assertIsNone(cursor._query)
         self.assertFalse(cursor._legacy_primitive_types)
+        self.assertFalse(cursor._lazy_rows)
+
+    @patch('pyavrio.client.TrinoQuery')
+    def test_execute_with_lazy_rows(self, MockTrinoQuery):
+        mock_connection = Mock(spec=Connection)
+        mock_connection.modified_query_cache = None
+        mock_connection.metadata_query_cache = None
+        mock_connection.json_decoder = None
+        cursor = Cursor(mock_connection, Mock(), lazy_rows=True)
+
+        cursor.execute("SELECT 1")
+
+        self.assertTrue(MockTrinoQuery.call_args.kwargs["lazy_rows"])
 
     def test_init_with_invalid_connection(self):
         # Create a mock object that is not an instance of Connection
@@ -408,6 +484,109 @@ class TestCursor(unittest.TestCase):
         self.assertEqual(connection, self.mock_connection)
 
 
+class TestQueryTemplate(unittest.TestCase):
+    def setUp(self):
+        self.connection = Mock(spec=Connection)
+        self.connection.modified_query_cache = None
+        self.connection.json_decoder = None
+        self.request = Mock()
+        session = self.request._client_session
+        session.user = 'user'
+        session.catalog = 'catalog'
+        session.platform = 'data_sources'
+        self.cursor = Cursor(self.connection, self.request)
+        patcher = patch('pyavrio.client.TrinoQuery')
+        self.trino_query = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.trino_query.return_value.rewrite.return_value = "SELECT * FROM rewritten WHERE id = ? AND name = ?"
+        self.trino_query.return_value.execute.return_value = []
+
+    def test_rewrite_placeholders_and_bind_locally(self):
+        template = self.cursor.prepare_template("SELECT * FROM t WHERE id = ? AND name = ?")
+        template.execute([1, "a'b"])
+        self.cursor.execute_template(template, (2, None))
+
+        rewrite_call = self.trino_query.call_args_list[0]
+        self.assertEqual(rewrite_call.kwargs['query'], "SELECT * FROM t WHERE id = ? AND name = ?")
+        self.assertIs(rewrite_call.kwargs['modified_query_cache'], self.connection.modified_query_cache)
+        self.assertEqual(template.rewritten, "SELECT * FROM rewritten WHERE id = ? AND name = ?")
+        self.assertEqual(
+            self.trino_query.call_args.kwargs['modified_query'],
+            "SELECT * FROM rewritten WHERE id = 2 AND name = NULL",
+        )
+        first_call = self.trino_query.call_args_list[1]
+        self.assertEqual(first_call.kwargs['query'], "SELECT * FROM t WHERE id = 1 AND name = 'a''b'")
+        self.assertEqual(first_call.kwargs['modified_query'], "SELECT * FROM rewritten WHERE id = 1 AND name = 'a''b'")
+
+    def test_rewrite_again_after_catalog_change(self):
+        template = self.cursor.prepare_template("SELECT * FROM t WHERE id = ? AND name = ?")
+        template.execute([1, "a"])
+        self.request._client_session.catalog = 'other_catalog'
+        template.execute([1, "a"])
+
+        self.assertEqual(self.trino_query.return_value.rewrite.call_count, 2)
+
+    def test_metadata_query_falls_back_to_execute(self):
+        self.trino_query.return_value.rewrite.return_value = None
+        template = self.cursor.prepare_template("SHOW TABLES LIKE ?")
+        with patch.object(self.cursor, 'execute') as execute:
+            template.execute(["t%"])
+            template.execute(["u%"])
+
+        self.trino_query.return_value.rewrite.assert_called_once()
+        execute.assert_called_with("SHOW TABLES LIKE ?", ["u%"])
+
+    def test_parameter_count_mismatch(self):
+        template = self.cursor.prepare_template("SELECT * FROM t WHERE id = ?")
+        with self.assertRaises(ProgrammingError):
+            template.execute([1, 2])
+
+
+class TestQueryTemplateRewriteCache(unittest.TestCase):
+    def setUp(self):
+        self.request = Mock()
+        self.request._host = 'example.com'
+        session = self.request._client_session
+        session.user = 'user'
+        session.catalog = 'catalog'
+        session.platform = 'data_sources'
+        self.connection = Mock(spec=Connection)
+        self.connection.modified_query_cache = TimeBoundLRUCache(10, 60)
+        self.connection.json_decoder = None
+        self.connection._create_request.return_value = self.request
+        handler_patcher = patch('pyavrio.client.AvrioHTTPHandler')
+        self.handler = handler_patcher.start().return_value
+        self.addCleanup(handler_patcher.stop)
+        response = Mock(ok=True)
+        response.json.return_value = {
+            'isMetadataQuery': False, 'finalModifiedSQL': 'SELECT * FROM rewritten WHERE id = ?',
+        }
+        self.handler._get_modified_query.return_value = response
+        self.template = Cursor(self.connection, self.request).prepare_template("SELECT * FROM t WHERE id = ?")
+
+    def test_rewrite_is_looked_up_in_modified_query_cache(self):
+        for _ in range(2):
+            self.assertEqual(self.template._get_rewritten(self.request._client_session),
+                             'SELECT * FROM rewritten WHERE id = ?')
+
+        self.handler._get_modified_query.assert_called_once()
+        self.assertEqual(self.connection.modified_query_cache.stats['hits'], 1)
+
+    def test_rewrite_again_after_cache_invalidation(self):
+        self.template._get_rewritten(self.request._client_session)
+        self.connection.modified_query_cache.clear()
+        self.template._get_rewritten(self.request._client_session)
+
+        self.assertEqual(self.handler._get_modified_query.call_count, 2)
+
+    def test_rewrite_again_after_cache_expiry(self):
+        self.connection.modified_query_cache.ttl_seconds = -1
+        self.template._get_rewritten(self.request._client_session)
+        self.template._get_rewritten(self.request._client_session)
+
+        self.assertEqual(self.handler._get_modified_query.call_count, 2)
+
+
 class TestCursorFetchOne(TestCase):
     def test_fetchone_returns_row(self):
         # Mock the Connection class
@@ -0,0 +1,108 @@
+import json
+from unittest import mock
+
+import pytest
+
+from pyavrio.json_codec import decode_response, decode_streaming, get_decoder
+
+RESPONSE = {
+    "id": "query_id",
+    "infoUri": "http://coordinator/ui/query.html?query_id",
+    "nextUri": "http://coordinator/v1/statement/query_id/2",
+    "columns": [{"name": "id", "type": "bigint"}, {"name": "name", "type": "varchar"}],
+    "data": [[i, "name-%d ☃" % i, 1.5e10, None, {"k": [1, 2]}] for i in range(200)],
+    "stats": {"state": "RUNNING"},
+    "warnings": [],
+}
+
+
+def _chunks(document, size):
+    body = json.dumps(document).encode("utf-8")
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1024 * 1024])
+def test_decode_streaming_maps_rows(chunk_size):
+    seen_members = []
+
+    def row_mapping(members):
+        seen_members.append(dict(members))
+        return tuple
+
+    response, rows_mapped = decode_streaming(_chunks(RESPONSE, chunk_size), row_mapping)
+
+    assert rows_mapped
+    assert response["data"] == [tuple(row) for row in RESPONSE["data"]]
+    assert {key: value for key, value in response.items() if key != "data"} == \
+        {key: value for key, value in RESPONSE.items() if key != "data"}
+    # Members preceding data are available to create the row mapper
+    assert seen_members[0]["columns"] == RESPONSE["columns"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1024])
+def test_decode_streaming_without_mapping(chunk_size):
+    response, rows_mapped = decode_streaming(_chunks(RESPONSE, chunk_size), lambda members: None)
+
+    assert not rows_mapped
+    assert response == RESPONSE
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    ([b"{}"], {}),
+    ([b' { "a" : 12', b"34 }"], {"a": 1234}),  # Number split across chunks
+    ([b'{"data": []}'], {"data": []}),
+    ([b'{"data": null}'], {"data": None}),
+])
+def test_decode_streaming_documents(chunks, expected):
+    assert decode_streaming(chunks, lambda members: None)[0] == expected
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'{"a": 1'],
+    [b'{"a" 1}'],
+    [b'{"data": [[1] [2]]}'],
+])
+def test_decode_streaming_invalid_documents(chunks):
+    with pytest.raises(ValueError):
+        decode_streaming(chunks, lambda members: None)
+
+
+def test_get_decoder_auto():
+    decoder = get_decoder("auto")
+    assert decoder(b'{"a": [1, 2.5, null, "x"]}') == {"a": [1, 2.5, None, "x"]}
+
+
+def test_get_decoder_stdlib():
+    assert get_decoder("json") is json.loads
+
+
+def test_get_decoder_passthrough():
+    assert get_decoder(None) is None
+    assert get_decoder(json.loads) is json.loads
+
+
+def test_get_decoder_orjson():
+    orjson = pytest.importorskip("orjson")
+    assert get_decoder("orjson") is orjson.loads
+    assert get_decoder("auto") is orjson.loads
+
+
+def test_get_decoder_unknown():
+    with pytest.raises(ValueError):
+        get_decoder("yaml")
+
+
+def test_get_decoder_not_installed():
+    with mock.patch("pyavrio.json_codec.importlib.import_module", side_effect=ModuleNotFoundError):
+        with pytest.raises(ModuleNotFoundError, match="pysimdjson"):
+            get_decoder("simdjson")
+        assert get_decoder("auto") is json.loads
+
+
+def test_decode_response():
+    http_response = mock.Mock(content=b'{"a": 1}')
+    assert decode_response(http_response, json.loads) == {"a": 1}
+    http_response.json.assert_not_called()
+
+    http_response.json.return_value = {"b": 2}
+    assert decode_response(http_response) == {"b": 2}
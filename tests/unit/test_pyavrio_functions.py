@@ -41,6 +41,28 @@ class TestPyAvrioFunctions(unittest.TestCase):
         result = PyAvrioFunctions.execute_sql_query(self.engine, 'SELECT * FROM users')
         self.assertEqual(result.fetchall(), [(1, 'John'), (2, 'Doe')])
 
+    def test_read_dataframe(self):
+        connection = self.engine.raw_connection.return_value
+        cursor = connection.cursor.return_value
+        cursor.fetch_dataframe.return_value = 'frame'
+
+        frame = PyAvrioFunctions.read_dataframe(self.engine, 'SELECT * FROM users')
+
+        self.assertEqual(frame, 'frame')
+        connection.cursor.assert_called_once_with()
+        cursor.execute.assert_called_once_with('SELECT * FROM users')
+        connection.close.assert_called_once()
+
+    def test_read_dataframe_chunks(self):
+        connection = self.engine.raw_connection.return_value
+        connection.cursor.return_value.iter_dataframes.return_value = iter(['frame1', 'frame2'])
+
+        frames = PyAvrioFunctions.read_dataframe(self.engine, 'SELECT * FROM users', chunksize=10)
+
+        self.assertEqual(list(frames), ['frame1', 'frame2'])
+        connection.cursor.return_value.iter_dataframes.assert_called_once_with(chunksize=10, coerce_float=True)
+        connection.close.assert_called_once()
+
     
 
 if __name__ == '__main__':
@@ -34,3 +34,95 @@ class TestQueryParser:
     def test_remove_schema_from_query(self, query, platform, expected_query):
         result = QueryParser.remove_schema_from_query(query, platform)
         assert result == expected_query
+
+    # Tests for normalize_query method
+    @pytest.mark.parametrize(
+        "query, expected_query", [
+            ("  select *\n  from   t  ", "select * from t"),  # Whitespace is collapsed
+            ("select 'a   b' from t", "select 'a   b' from t"),  # String literals are preserved
+            ('select "a   b" from t', 'select "a   b" from t'),  # Quoted identifiers are preserved
+            ("select a -- x\nfrom t", "select a -- x\nfrom t"),  # Line comments keep their line break
+        ]
+    )
+    def test_normalize_query(self, query, expected_query):
+        assert QueryParser.normalize_query(query) == expected_query
+
+    # Tests for the single pass lexer
+    @pytest.mark.parametrize(
+        "query, expected_query", [
+            ('select * from "schema"."table"', 'select * from "table"'),  # Quoted parts are kept quoted
+            ("select s.t.a from s.t join s.u on s.t.id = s.u.id",
+             "select t.a from t join u on t.id = u.id"),  # Qualified column references
+            ("select * from s.t where x in (select y from s.u, s.v) and z = 1",
+             "select * from t where x in (select y from u, v) and z = 1"),  # Nested FROM lists
+            ("select * from s.t, (select 1) q, s.u", "select * from t, (select 1) q, u"),  # FROM list after a subquery
+            ("select 's.t' from s.t -- s.t\n", "select 's.t' from t -- s.t\n"),  # Literals and comments are untouched
+            ("select * from a.b.c", "select * from a.b.c"),  # Three part names are kept
+            ("select * from s.f(1)", "select * from s.f(1)"),  # Table functions are not tables
+        ]
+    )
+    def test_remove_schema_lexer(self, query, expected_query):
+        assert QueryParser.remove_schema_from_query(query, "data_products") == expected_query
+
+    @pytest.mark.parametrize(
+        "query, expected_result", [
+            ("select /* x */ 1", True),  # Comments are ignored
+            ("SELECT\n2", True),
+            ("select 1, 2", False),
+            ("select '1'", False),
+        ]
+    )
+    def test_parse_query_lexer(self, query, expected_result):
+        assert QueryParser.parse_query(query) == expected_result
+
+    @pytest.mark.parametrize(
+        "query, expected_result", [
+            ("SHOW CATALOGS", True),
+            ("show tables from s", True),
+            ("select 'show' from t", False),  # Keyword inside a literal
+            ("select a -- show\nfrom t", False),  # Keyword inside a comment
+            ("select show_id from t", False),
+        ]
+    )
+    def test_is_show_query(self, query, expected_result):
+        assert QueryParser.is_show_query(query) == expected_result
+
+    @pytest.mark.parametrize(
+        "query, expected_split", [
+            ("PREPARE st FROM SELECT * FROM t WHERE a = ?", ("PREPARE st FROM", " SELECT * FROM t WHERE a = ?")),
+            ("prepare st from\nselect 1", ("prepare st from", "\nselect 1")),
+            ("PREPARE st FROM INSERT INTO t VALUES (?)", (None, "PREPARE st FROM INSERT INTO t VALUES (?)")),
+            ("SELECT * FROM t", (None, "SELECT * FROM t")),
+        ]
+    )
+    def test_split_prepare_query(self, query, expected_split):
+        assert QueryParser.split_prepare_query(query) == expected_split
+
+    def test_analyze_tables(self):
+        statement = QueryParser.analyze('select * from s.t join "S"."T 2" on 1 = 1 , u')
+        assert statement.keyword == "select"
+        assert statement.tables == (("s", "t"), ("S", "T 2"), ("u",))
+
+    def test_analyze_large_in_list(self):
+        values = ", ".join(str(i) for i in range(50000))
+        query = f"select * from s.t where id in ({values})"
+        assert QueryParser.remove_schema_from_query(query, "data_products") == f"select * from t where id in ({values})"
+
+    def test_analyze_is_memoized(self):
+        query = "select * from s.memoized"
+        assert QueryParser.analyze(query) is QueryParser.analyze(query)
+
+    def test_analyze_large_statement_is_not_memoized(self):
+        values = ", ".join("'{}'".format(i) for i in range(20000))
+        query = f"select * from s.t where id in ({values})"
+        assert len(query) > 64 * 1024
+        statement = QueryParser.analyze(query)
+        assert statement.tables == (("s", "t"),)
+        assert QueryParser.analyze(query) is not statement
+
+    def test_bind_placeholders(self):
+        query = "select '?' from t where a = ? and b = ? -- ?\n"
+        assert QueryParser.count_placeholders(query) == 2
+        assert QueryParser.bind_placeholders(query, ["1", "'x'"]) == "select '?' from t where a = 1 and b = 'x' -- ?\n"
+        with pytest.raises(ValueError):
+            QueryParser.bind_placeholders(query, ["1"])
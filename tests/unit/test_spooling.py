@@ -0,0 +1,233 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import Mock
+
+import pytest
+
+from pyavrio import constants, exceptions
+from pyavrio.client import ClientSession, TrinoRequest
+from pyavrio.spooling import decode_segment, decode_segments, supported_encodings
+
+
+def _json(rows):
+    return json.dumps(rows).encode("utf-8")
+
+
+def _zstd(data):
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _lz4(data):
+    lz4_block = pytest.importorskip("lz4.block")
+    return lz4_block.compress(data, store_size=False)
+
+
+class _SegmentServer:
+    """Serves segment bodies by path and records the requests it receives."""
+
+    def __init__(self):
+        self.segments = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                if self.path.startswith("/ack/"):
+                    self.send_response(200)
+                    self.end_headers()
+                    return
+                body = server.segments.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return "http://127.0.0.1:{}{}".format(self.port, path)
+
+    def spooled(self, name, body, metadata=None, headers=None):
+        self.segments["/segments/" + name] = body
+        segment = {
+            "type": "spooled",
+            "uri": self.url("/segments/" + name),
+            "ackUri": self.url("/ack/" + name),
+            "metadata": metadata or {},
+        }
+        if headers is not None:
+            segment["headers"] = headers
+        return segment
+
+    @property
+    def acknowledged(self):
+        return sorted(path[len("/ack/"):] for path, _ in self.requests if path.startswith("/ack/"))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def segment_server():
+    with _SegmentServer() as server:
+        yield server
+
+
+def _http_response(data):
+    body = {"id": "query_id", "infoUri": "info", "columns": [], "data": data, "stats": {}}
+    http_response = Mock(ok=True, status_code=200, headers={})
+    http_response.json.return_value = body
+    http_response.content = _json(body)
+    return http_response
+
+
+def test_supported_encodings_auto():
+    encodings = supported_encodings("auto")
+
+    assert encodings[-1] == "json"
+    assert set(encodings) <= {"json+zstd", "json+lz4", "json"}
+
+
+def test_supported_encodings_explicit():
+    assert supported_encodings("json") == ["json"]
+    assert supported_encodings(["json", "json"]) == ["json", "json"]
+
+
+def test_supported_encodings_unknown():
+    with pytest.raises(ValueError, match="json\\+gzip"):
+        supported_encodings("json+gzip")
+
+
+def test_decode_segment_uncompressed():
+    assert decode_segment("json+zstd", _json([[1], [2]]), {"rowsCount": 2}) == [[1], [2]]
+
+
+@pytest.mark.parametrize("encoding, compress", [("json+zstd", _zstd), ("json+lz4", _lz4)])
+def test_decode_segment_compressed(encoding, compress):
+    data = _json([[1, "a"], [2, None]])
+
+    assert decode_segment(encoding, compress(data), {"uncompressedSize": len(data)}) == [[1, "a"], [2, None]]
+
+
+def test_decode_segments_inline():
+    data = {
+        "encoding": "json",
+        "segments": [
+            {"type": "inline", "data": base64.b64encode(_json([[1]])).decode(), "metadata": {}},
+            {"type": "inline", "data": base64.b64encode(_json([[2], [3]])).decode(), "metadata": {}},
+        ],
+    }
+    download = Mock()
+
+    assert decode_segments(data, download, Mock()) == [[1], [2], [3]]
+    download.assert_not_called()
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_decode_segments_keeps_order(segment_server, max_workers):
+    data = _json([[0]])
+    segments = [
+        {"type": "inline", "data": base64.b64encode(_zstd(data)).decode(), "metadata": {"uncompressedSize": len(data)}},
+    ]
+    for index in range(1, 6):
+        data = _json([[index], [index]])
+        segments.append(segment_server.spooled(str(index), _zstd(data), {"uncompressedSize": len(data)}))
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), encoding="json+zstd")
+
+    rows = decode_segments(
+        {"encoding": "json+zstd", "segments": segments},
+        request._download_segment,
+        request._acknowledge_segment,
+        max_workers=max_workers,
+    )
+
+    assert rows == [[0]] + [[index] for index in range(1, 6) for _ in range(2)]
+    assert segment_server.acknowledged == ["1", "2", "3", "4", "5"]
+
+
+def test_decode_segments_unknown_type():
+    with pytest.raises(ValueError, match="unknown"):
+        decode_segments({"encoding": "json", "segments": [{"type": "unknown"}]}, Mock(), Mock())
+
+
+def test_decode_segments_ignores_acknowledge_errors():
+    data = {"encoding": "json", "segments": [{"type": "spooled", "uri": "segment", "ackUri": "ack", "metadata": {}}]}
+    acknowledge = Mock(side_effect=exceptions.HttpError("error 500"))
+
+    assert decode_segments(data, Mock(return_value=_json([[1]])), acknowledge) == [[1]]
+    acknowledge.assert_called_once()
+
+
+def test_request_advertises_encodings():
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), encoding=["json+zstd", "json"])
+
+    assert request.http_headers[constants.HEADER_QUERY_DATA_ENCODING] == "json+zstd,json"
+
+
+def test_request_without_encoding():
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"))
+
+    assert constants.HEADER_QUERY_DATA_ENCODING not in request.http_headers
+
+
+def test_process_spooled_segments(segment_server):
+    data = _json([[1, "a"], [2, "b"]])
+    segment = segment_server.spooled(
+        "1", _lz4(data), {"uncompressedSize": len(data)}, headers={"x-amz-server-side-encryption": ["AES256"]},
+    )
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user", source="pyavrio-test"), encoding="json+lz4")
+
+    status = request.process(_http_response({"encoding": "json+lz4", "segments": [segment]}))
+
+    assert status.rows == [[1, "a"], [2, "b"]]
+    path, headers = segment_server.requests[0]
+    assert path == "/segments/1"
+    assert headers["x-amz-server-side-encryption"] == "AES256"
+    # Segments stored outside of the coordinator are downloaded without the client headers
+    assert constants.HEADER_SOURCE not in headers
+    assert segment_server.acknowledged == ["1"]
+    # Segments are acknowledged with the headers they were downloaded with
+    ack_path, ack_headers = segment_server.requests[1]
+    assert ack_path == "/ack/1"
+    assert ack_headers["x-amz-server-side-encryption"] == "AES256"
+
+
+def test_process_spooled_segments_from_coordinator(segment_server):
+    segment = segment_server.spooled("1", _json([[1]]))
+    request = TrinoRequest(
+        "127.0.0.1", segment_server.port, ClientSession(user="user", source="pyavrio-test"), encoding="json",
+    )
+
+    status = request.process(_http_response({"encoding": "json", "segments": [segment]}))
+
+    assert status.rows == [[1]]
+    _, headers = segment_server.requests[0]
+    assert headers[constants.HEADER_SOURCE] == "pyavrio-test"
+
+
+def test_process_missing_segment(segment_server):
+    segment = segment_server.spooled("1", _json([[1]]))
+    del segment_server.segments["/segments/1"]
+    request = TrinoRequest("coordinator", 8080, ClientSession(user="user"), encoding="json")
+
+    with pytest.raises(exceptions.HttpError):
+        request.process(_http_response({"encoding": "json", "segments": [segment]}))
+    assert segment_server.acknowledged == []